@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import os
+import gc
+import time
+import tempfile
+import tracemalloc
+
+script_dir = os.path.dirname(__file__)
+sys.path.append(os.path.join(script_dir, '..', 'src'))
+
+try:
+    from kitools import KiProject, KiProjectResource, DataType, DataTypeTemplate
+except Exception as ex:
+    print('WARNING: Failed to load kitools: {0}'.format(ex))
+
+
+class BenchmarkKiProject(object):
+    """The parts of a KiProject a KiProjectResource uses, without connecting to a remote project."""
+
+    find_data_type = KiProject.find_data_type
+    get_data_type_from_path = KiProject.get_data_type_from_path
+    get_data_types_from_paths = KiProject.get_data_types_from_paths
+    _get_data_type_trie = KiProject._get_data_type_trie
+
+    def __init__(self, local_path):
+        self.local_path = local_path
+        self.data_types = [DataType(local_path, p.name, p.rel_path) for p in DataTypeTemplate.default().paths]
+        self.resources = None
+        self._data_type_trie = None
+
+
+def mk_resources(kiproject, count):
+    data_type = kiproject.data_types[0]
+    resources = []
+    for i in range(count):
+        rel_path = os.path.join(data_type.rel_path, 'study_{0}'.format(i // 1000), 'file_{0}.csv'.format(i))
+        resources.append(KiProjectResource(kiproject,
+                                           remote_uri='syn:syn{0}'.format(10000000 + i),
+                                           local_path=rel_path,
+                                           name='file_{0}.csv'.format(i),
+                                           version='1'))
+    return resources
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the memory used by KiProjectResources.')
+    parser.add_argument('-c', '--count', help='How many resources to create.', type=int, default=1000000)
+    args = parser.parse_args()
+
+    kiproject = BenchmarkKiProject(tempfile.gettempdir())
+
+    gc.collect()
+    tracemalloc.start()
+    start_bytes, _ = tracemalloc.get_traced_memory()
+    start_time = time.time()
+
+    resources = mk_resources(kiproject, args.count)
+
+    elapsed = time.time() - start_time
+    gc.collect()
+    end_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start_time = time.time()
+    for resource in resources:
+        resource.to_json()
+    to_json_elapsed = time.time() - start_time
+
+    total_bytes = end_bytes - start_bytes
+    print('Resources: {0:,}'.format(len(resources)))
+    print('Total: {0:,.1f} MB'.format(total_bytes / 1024 / 1024))
+    print('Per resource: {0:,.0f} bytes (including its paths, name, and remote URI strings)'.format(
+        total_bytes / len(resources)))
+    print('Instance size: {0} bytes'.format(sys.getsizeof(resources[0])))
+    print('Create: {0:.2f}s, to_json: {1:.2f}s'.format(elapsed, to_json_elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import os
 from .ki_project import KiProject
 from .ki_project_resource import KiProjectResource
+from .ki_project_resource_list import KiProjectResourceList
 from .data_type import DataType
 from .data_type_template import DataTypeTemplate, DataTypeTemplatePath
 from .data_uri import DataUri
@@ -8,7 +9,8 @@ from .sys_path import SysPath
 from .utils import Utils
 from .env import Env
 from .data_adapters import SynapseAdapter
-from .exceptions import InvalidDataTypeError, NotADataTypePathError, DataTypeMismatchError, InvalidDataUriError
+from .exceptions import InvalidDataTypeError, NotADataTypePathError, DataTypeMismatchError, InvalidDataUriError, \
+    OfflineModeError
 
 name = 'kitools'
 
@@ -1,8 +1,14 @@
 import abc
+import asyncio
+import functools
 
 
 class BaseAdapter(object):
-    """Base class for data adapters."""
+    """Base class for data adapters.
+
+    Each operation also has a coroutine version (e.g., adata_pull) for running many operations on one event loop.
+    Blocking work is run in an executor, the KiProject and its resources are only changed on the event loop's thread.
+    """
 
     @abc.abstractmethod
     def name(self):
@@ -23,13 +29,14 @@ class BaseAdapter(object):
         raise NotImplementedError()
 
     @abc.abstractmethod
-    def get_entity(self, remote_id, version=None, local_path=None):
+    def get_entity(self, remote_id, version=None, local_path=None, metadata_cache=None):
         """Gets a remote entity (Project, Folder, File).
 
         Args:
             remote_id: The ID of the remote entity.
             version: The version to get, or None for the latest version.
             local_path: If getting a file then set the local path to download the file to.
+            metadata_cache: The KiProjectMetadataCache to get the entity's metadata from (and add it to).
 
         Returns:
             RemoteEntity
@@ -49,11 +56,12 @@ class BaseAdapter(object):
         raise NotImplementedError()
 
     @abc.abstractmethod
-    def data_pull(self, ki_project_resource):
+    def data_pull(self, ki_project_resource, max_workers=None):
         """Pulls a KiProjectResource.
 
         Args:
             ki_project_resource: The KiProjectResource to pull.
+            max_workers: The number of threads to pull the children with. Set to None to use the adapter's default.
 
         Returns:
             RemoteEntity
@@ -61,13 +69,138 @@ class BaseAdapter(object):
         raise NotImplementedError()
 
     @abc.abstractmethod
-    def data_push(self, ki_project_resource):
+    def data_push(self, ki_project_resource, max_workers=None):
         """Pushes a KiProjectResource.
 
         Args:
             ki_project_resource: The KiProjectResource to push.
+            max_workers: The number of threads to push the children with. Set to None to use the adapter's default.
+
+        Returns:
+            RemoteEntity
+        """
+        raise NotImplementedError()
+
+    def data_pull_many(self, ki_project_resources, max_workers=None):
+        """Pulls many KiProjectResources.
+
+        The default implementation pulls each resource with data_pull. Adapters that can pull resources together
+        (e.g., fetch their metadata or download their files in one pool of threads) override this.
+
+        Args:
+            ki_project_resources: The KiProjectResources to pull.
+            max_workers: The number of threads to pull with. Set to None to use the adapter's default.
+
+        Returns:
+            List of RemoteEntity (one for each resource).
+        """
+        return [self.data_pull(ki_project_resource, max_workers=max_workers)
+                for ki_project_resource in ki_project_resources]
+
+    def data_push_many(self, ki_project_resources, max_workers=None):
+        """Pushes many KiProjectResources.
+
+        The default implementation pushes each resource with data_push. Adapters that can push resources together
+        (e.g., upload their files in one pool of threads) override this.
+
+        Args:
+            ki_project_resources: The KiProjectResources to push.
+            max_workers: The number of threads to push with. Set to None to use the adapter's default.
+
+        Returns:
+            List of RemoteEntity (one for each resource).
+        """
+        return [self.data_push(ki_project_resource, max_workers=max_workers)
+                for ki_project_resource in ki_project_resources]
+
+    @abc.abstractmethod
+    def get_children(self, remote_id):
+        """Gets the children of a remote project or folder.
+
+        Args:
+            remote_id: The ID of the remote project or folder.
+
+        Returns:
+            List of RemoteEntity (the children are not downloaded).
+        """
+        raise NotImplementedError()
+
+    async def aget_entity(self, remote_id, version=None, local_path=None, metadata_cache=None, executor=None):
+        """Coroutine version of get_entity.
+
+        The default implementation runs get_entity in the executor.
+
+        Args:
+            remote_id: The ID of the remote entity.
+            version: The version to get, or None for the latest version.
+            local_path: If getting a file then set the local path to download the file to.
+            metadata_cache: The KiProjectMetadataCache to get the entity's metadata from (and add it to).
+            executor: The concurrent.futures.Executor to run blocking work in or None for the loop's default.
+
+        Returns:
+            RemoteEntity
+        """
+        return await self._run_in_executor(executor,
+                                           self.get_entity,
+                                           remote_id,
+                                           version=version,
+                                           local_path=local_path,
+                                           metadata_cache=metadata_cache)
+
+    async def aget_children(self, remote_id, executor=None):
+        """Coroutine version of get_children.
+
+        The default implementation runs get_children in the executor.
+
+        Args:
+            remote_id: The ID of the remote project or folder.
+            executor: The concurrent.futures.Executor to run blocking work in or None for the loop's default.
+
+        Returns:
+            List of RemoteEntity (the children are not downloaded).
+        """
+        return await self._run_in_executor(executor, self.get_children, remote_id)
+
+    @abc.abstractmethod
+    async def adata_pull(self, ki_project_resource, max_workers=None, executor=None):
+        """Coroutine version of data_pull.
+
+        Args:
+            ki_project_resource: The KiProjectResource to pull.
+            max_workers: The number of threads to list the children with. Set to None to use the adapter's default.
+            executor: The concurrent.futures.Executor to run blocking work in or None for the loop's default.
+
+        Returns:
+            RemoteEntity
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    async def adata_push(self, ki_project_resource, executor=None):
+        """Coroutine version of data_push.
+
+        There is no max_workers (unlike data_push and adata_pull): the executor's threads are the workers.
+
+        Args:
+            ki_project_resource: The KiProjectResource to push.
+            executor: The concurrent.futures.Executor to run blocking work in or None for the loop's default.
 
         Returns:
             RemoteEntity
         """
         raise NotImplementedError()
+
+    async def _run_in_executor(self, executor, function, *args, **kwargs):
+        """Runs a blocking function in an executor.
+
+        Args:
+            executor: The concurrent.futures.Executor to run the function in or None for the loop's default.
+            function: The function to run.
+            *args: The arguments for the function.
+            **kwargs: The keyword arguments for the function.
+
+        Returns:
+            The result of the function.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(executor, functools.partial(function, *args, **kwargs))
@@ -0,0 +1,304 @@
+import os
+import time
+import json
+import hashlib
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SegmentedDownload(object):
+    """Downloads a large file as byte ranges that are fetched concurrently from a (pre-signed) URL.
+
+    The file is written to "<path>.kipart", which is allocated at the full size before the download starts. Each
+    segment writes its bytes at its own offset (with os.pwrite where it is available). The progress of the
+    segments is saved to "<path>.kisegments" while they download, so an interrupted download resumes each segment
+    where it stopped. Once every segment is written the MD5 of the file is checked and the file is moved to path.
+
+    A URL that expires during the download (HTTP 403) is fetched again with get_url. Segments that fail with
+    a connection error are retried from where they stopped.
+    """
+
+    PART_SUFFIX = '.kipart'
+    STATE_SUFFIX = '.kisegments'
+
+    # The number of bytes read from a response (and written) at a time. A read that is cut off is lost, so this is
+    # kept small enough for a retried segment to resume close to where it stopped.
+    CHUNK_SIZE = 64 * 1024
+
+    # How often (in seconds) to save the progress of the segments.
+    SAVE_INTERVAL = 5
+
+    # The status codes that mean the URL has expired.
+    EXPIRED_STATUS_CODES = (403,)
+
+    RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError,
+                        requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError)
+
+    def __init__(self, get_url, path, size, md5, segment_count, max_retries=3, timeout=60, response_hook=None):
+        """Instantiates a new instance.
+
+        Args:
+            get_url: Function that returns the URL to download the file from (e.g., a new pre-signed URL).
+            path: The path to download the file to.
+            size: The size of the file in bytes.
+            md5: The MD5 of the file as a hex string.
+            segment_count: The number of segments to split the file into (and download at a time).
+            max_retries: How many times to fetch the URL again or retry the unfinished segments before giving up.
+            timeout: The seconds to wait for the server to respond or send more bytes.
+            response_hook: A requests response hook to add to the sessions the segments are fetched with.
+        """
+        if segment_count < 1:
+            raise ValueError('segment_count must be greater than 0.')
+
+        self._get_url = get_url
+        self._path = path
+        self._part_path = path + self.PART_SUFFIX
+        self._state_path = path + self.STATE_SUFFIX
+        self._size = size
+        self._md5 = md5
+        self._segment_count = segment_count
+        self._max_retries = max_retries
+        self._timeout = timeout
+        self._response_hook = response_hook
+
+        self._lock = threading.Lock()
+        # Lists: [start, end (exclusive), bytes written]
+        self._segments = None
+        self._fd = None
+        self._last_save = None
+        self.resumed_bytes = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def segments(self):
+        """Gets the segments of the file.
+
+        Returns:
+            List of tuples: (start, end (exclusive), bytes written)
+        """
+        with self._lock:
+            return [tuple(segment) for segment in self._segments or []]
+
+    def download(self):
+        """Downloads the file (resuming a previous download of it).
+
+        Returns:
+            The path of the downloaded file.
+
+        Raises:
+            Exception: Raised if the MD5 of the downloaded file does not match.
+        """
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._segments = self._load_state()
+        if self._segments is None:
+            self._segments = self._new_segments()
+            self._allocate()
+        else:
+            self.resumed_bytes = sum(segment[2] for segment in self._segments)
+
+        self._fd = os.open(self._part_path, os.O_WRONLY | getattr(os, 'O_BINARY', 0))
+        self._last_save = time.monotonic()
+        try:
+            self._download_segments()
+        finally:
+            try:
+                self._save_state()
+            finally:
+                os.close(self._fd)
+                self._fd = None
+
+        if self._hash_file(self._part_path) != self._md5:
+            self._remove(self._part_path, self._state_path)
+            raise Exception('The MD5 of the downloaded file does not match: {0}'.format(self._path))
+
+        os.replace(self._part_path, self._path)
+        self._remove(self._state_path)
+        return self._path
+
+    def _download_segments(self):
+        """Fetches the unfinished segments concurrently until all of them are written.
+
+        Returns:
+            None
+        """
+        url = self._get_url()
+        retries = 0
+
+        while True:
+            pending = [segment for segment in self._segments if segment[2] < segment[1] - segment[0]]
+            if not pending:
+                return
+
+            with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                futures = [executor.submit(self._fetch_segment, url, segment) for segment in pending]
+                errors = [future.exception() for future in futures if future.exception() is not None]
+
+            if not errors:
+                continue
+
+            expired = False
+            for error in errors:
+                if self._get_status_code(error) in self.EXPIRED_STATUS_CODES:
+                    expired = True
+                elif not isinstance(error, self.RETRY_EXCEPTIONS):
+                    raise error
+
+            retries += 1
+            if retries > self._max_retries:
+                raise errors[0]
+
+            if expired:
+                url = self._get_url()
+
+    def _fetch_segment(self, url, segment):
+        """Fetches the rest of a segment and writes it to the file.
+
+        Args:
+            url: The URL to fetch from.
+            segment: The segment: [start, end (exclusive), bytes written].
+
+        Returns:
+            None
+        """
+        start, end = segment[0], segment[1]
+        offset = start + segment[2]
+        file = None if hasattr(os, 'pwrite') else open(self._part_path, 'r+b', buffering=0)
+
+        try:
+            with requests.Session() as session:
+                if self._response_hook is not None:
+                    session.hooks['response'].append(self._response_hook)
+
+                response = session.get(url,
+                                       headers={'Range': 'bytes={0}-{1}'.format(offset, end - 1)},
+                                       stream=True,
+                                       timeout=self._timeout)
+                try:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise Exception('The server does not support ranged downloads: {0}'.format(self._path))
+
+                    for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                        self._write(file, chunk, offset)
+                        offset += len(chunk)
+                        with self._lock:
+                            segment[2] = offset - start
+                        self._save_state_if_due()
+                finally:
+                    response.close()
+        finally:
+            if file is not None:
+                file.close()
+
+        if offset < end:
+            raise requests.exceptions.ChunkedEncodingError(
+                'The response ended before the segment was complete: {0}-{1}'.format(start, end - 1))
+
+    def _write(self, file, data, offset):
+        """Writes bytes at an offset of the file.
+
+        Args:
+            file: The segment's own file object when os.pwrite is not available, otherwise None.
+            data: The bytes to write.
+            offset: The offset to write the bytes at.
+
+        Returns:
+            None
+        """
+        view = memoryview(data)
+        while view:
+            if file is None:
+                written = os.pwrite(self._fd, view, offset)
+            else:
+                file.seek(offset)
+                written = file.write(view)
+            view = view[written:]
+            offset += written
+
+    def _new_segments(self):
+        segment_size = -(-self._size // self._segment_count) or 1
+        return [[start, min(start + segment_size, self._size), 0] for start in range(0, self._size, segment_size)]
+
+    def _allocate(self):
+        """Creates the part file at the full size of the file.
+
+        Returns:
+            None
+        """
+        with open(self._part_path, 'wb') as f:
+            if hasattr(os, 'posix_fallocate') and self._size > 0:
+                try:
+                    os.posix_fallocate(f.fileno(), 0, self._size)
+                except OSError:
+                    # The file system does not support it.
+                    f.truncate(self._size)
+            else:
+                f.truncate(self._size)
+        self._save_state()
+
+    def _save_state_if_due(self):
+        if time.monotonic() - self._last_save >= self.SAVE_INTERVAL:
+            self._save_state()
+
+    def _save_state(self):
+        """Saves the progress of the segments (after the bytes they have written).
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+
+            # Keep the suffix so the temporary file is ignored like the state file.
+            tmp_path = self._path + '.tmp' + self.STATE_SUFFIX
+            with open(tmp_path, 'w') as f:
+                json.dump({'size': self._size, 'md5': self._md5, 'segments': self._segments}, f)
+            os.replace(tmp_path, self._state_path)
+            self._last_save = time.monotonic()
+
+    def _load_state(self):
+        """Loads the progress of a previous download of the same file.
+
+        Returns:
+            List of segments or None if there is nothing to resume.
+        """
+        if not os.path.isfile(self._state_path) or not os.path.isfile(self._part_path):
+            return None
+
+        try:
+            with open(self._state_path) as f:
+                state = json.load(f)
+        except ValueError:
+            print('WARNING: Ignoring invalid download state: {0}'.format(self._state_path))
+            return None
+
+        if state.get('size') != self._size or state.get('md5') != self._md5 or \
+                os.path.getsize(self._part_path) != self._size:
+            return None
+
+        return state.get('segments')
+
+    def _get_status_code(self, ex):
+        response = getattr(ex, 'response', None)
+        return getattr(response, 'status_code', None) if response is not None else None
+
+    def _hash_file(self, path):
+        md5 = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                md5.update(chunk)
+        return md5.hexdigest()
+
+    def _remove(self, *paths):
+        for path in paths:
+            if os.path.isfile(path):
+                os.remove(path)
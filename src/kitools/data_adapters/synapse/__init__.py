@@ -1,2 +1,6 @@
 from .synapse_adapter import SynapseAdapter
 from .synapse_remote_entity import SynapseRemoteEntity
+from .synapse_folder_cache import SynapseFolderCache
+from .synapse_entity_path_resolver import SynapseEntityPathResolver
+from .synapse_remote_tree import SynapseRemoteTree
+from .synapse_client_pool import SynapseClientPool
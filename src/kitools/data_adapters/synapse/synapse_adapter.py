@@ -1,30 +1,130 @@
 import os
 import synapseclient
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from ..base_adapter import BaseAdapter
+from synapseclient.exceptions import SynapseHTTPError
 from .synapse_remote_entity import SynapseRemoteEntity
+from .synapse_folder_cache import SynapseFolderCache
+from .synapse_entity_path_resolver import SynapseEntityPathResolver
+from .synapse_remote_tree import SynapseRemoteTree
+from .synapse_client_pool import SynapseClientPool
+from ..transfer_scheduler import TransferScheduler
+from ..segmented_download import SegmentedDownload
 from ...data_uri import DataUri
 from ...sys_path import SysPath
 from ...env import Env
 from ...utils import Utils
+from ...exceptions import OfflineModeError
+from ...ki_project_pull_index import KiProjectPullIndex
+from ...ki_project_transfer_journal import KiProjectTransferJournal
 
 
 class SynapseAdapter(BaseAdapter):
     """Data Adapter for Synapse."""
 
     DATA_URI_SCHEME = 'syn'
-    _client = None
+    _client_pool = None
+    _transfer_scheduler = None
+    _local_client = None
+
+    SYN_FOLDER_TYPE = 'org.sagebionetworks.repo.model.Folder'
+    SYN_FILE_TYPE = 'org.sagebionetworks.repo.model.FileEntity'
+
+    # The default number of threads to pull with.
+    DEFAULT_MAX_WORKERS = 16
+
+    # How many tasks to hand to each worker at a time when pulling or pushing concurrently.
+    TASKS_PER_WORKER = 2
+
+    # The number of threads to hash files and create entities/folders with when pushing concurrently.
+    # Files are uploaded with max_workers threads.
+    PUSH_HASH_WORKERS = 4
+    PUSH_ENTITY_WORKERS = 4
+
+    # The stages of the push pipeline (see _run_push_pipeline).
+    PUSH_STAGES = ['folder', 'hash', 'upload', 'entity']
+
+    # The file handles that support downloading byte ranges (see _is_segmented_download).
+    SEGMENTED_FILE_HANDLE_TYPES = ('org.sagebionetworks.repo.model.file.S3FileHandle',)
+
+    @classmethod
+    def client_pool(cls):
+        """Gets the pool of logged in Synapse clients shared by all instances.
+
+        Returns:
+            SynapseClientPool
+        """
+        if not cls._client_pool:
+            # The scheduler retries throttled calls (and sees the throttled responses of calls in nested slots).
+            cls._client_pool = SynapseClientPool(config_path=Env.SYNAPSE_CONFIG_PATH(),
+                                                 response_hook=cls.transfer_scheduler().observe_response,
+                                                 transfer_scheduler=cls.transfer_scheduler())
+        return cls._client_pool
+
+    @classmethod
+    def transfer_scheduler(cls):
+        """Gets the scheduler that limits how many Synapse calls all instances make at a time.
+
+        Returns:
+            TransferScheduler
+        """
+        if not cls._transfer_scheduler:
+            cls._transfer_scheduler = TransferScheduler(max_concurrency=SynapseClientPool.DEFAULT_MAX_SIZE)
+        return cls._transfer_scheduler
+
+    @classmethod
+    @contextmanager
+    def checkout_client(cls, kind='request'):
+        """Waits for the transfer scheduler to allow another call then checks out a logged in Synapse client
+        for the calling thread.
+
+        Each worker (e.g., a data_pull thread) uses its own client for as long as it has it checked out.
+
+        Examples:
+            >>> with SynapseAdapter.checkout_client() as client:
+            >>>     client.get('syn123', downloadFile=False)
+
+        Args:
+            kind: The kind of call for the scheduler to compare latencies of.
+                Set to None for file transfers (their latency depends on the file's size).
+
+        Returns:
+            Context manager that gives a synapseclient.Synapse.
+        """
+        with cls.transfer_scheduler().slot(kind=kind), cls.client_pool().checkout() as client:
+            yield client
 
     @classmethod
     def client(cls):
-        """Gets a new or cached instance of a logged in Synapse client.
+        """Gets the primary logged in Synapse client.
+
+        The client is shared with the workers of the client pool, only use it when no adapter methods are running
+        (adapter methods check out a client with checkout_client).
+
+        Returns:
+            synapseclient.Synapse
+        """
+        return cls.client_pool().primary()
+
+    @classmethod
+    def local_client(cls):
+        """Gets a Synapse client that is not logged in, for work that does not need the network
+        (e.g., creating entities from cached metadata).
 
         Returns:
             synapseclient.Synapse
         """
-        if not cls._client:
-            cls._client = synapseclient.Synapse(configPath=Env.SYNAPSE_CONFIG_PATH())
-            cls._client.login(silent=True)
-        return cls._client
+        if not cls._local_client:
+            cls._local_client = synapseclient.Synapse(configPath=Env.SYNAPSE_CONFIG_PATH(), skip_checks=True)
+        return cls._local_client
+
+    def __init__(self):
+        # The Synapse folders found or created by this instance.
+        self._folder_cache = SynapseFolderCache()
+        # The paths of the Synapse entities resolved by this instance.
+        self._path_resolver = SynapseEntityPathResolver()
 
     def name(self):
         """Gets the name of the data adapter.
@@ -41,35 +141,72 @@ class SynapseAdapter(BaseAdapter):
             True or False
         """
         try:
-            return SynapseAdapter.client()._loggedIn() is not False
+            with SynapseAdapter.checkout_client() as client:
+                return client._loggedIn() is not False
         except Exception as ex:
             # TODO: log this exception
             pass
         return False
 
-    def get_entity(self, remote_id, version=None, local_path=None):
+    def get_entity(self, remote_id, version=None, local_path=None, metadata_cache=None):
         """Gets an entity from Synapse.
 
         Args:
             remote_id: The id of the Synapse entity.
             version: The version of the entity to get. Set to None to get the latest version.
             local_path: Where to download the entity to (in the case of downloadable entities).
+            metadata_cache: The KiProjectMetadataCache to get the entity's metadata from (and add it to).
 
         Returns:
             SynapseRemoteEntity
+
+        Raises:
+            OfflineModeError: Raised in offline mode if the entity's metadata is not cached or it needs downloading.
         """
-        entity = SynapseAdapter.client().get(
-            remote_id,
-            downloadFile=local_path is not None,
-            downloadLocation=local_path,
-            ifcollision='overwrite.local',
-            version=version
-        )
+        if local_path is not None:
+            self._ensure_online(metadata_cache, 'download {0}'.format(remote_id))
+
+        if metadata_cache is None:
+            with SynapseAdapter.checkout_client(kind='request' if local_path is None else None) as client:
+                entity = client.get(
+                    remote_id,
+                    downloadFile=local_path is not None,
+                    downloadLocation=local_path,
+                    ifcollision='overwrite.local',
+                    version=version
+                )
+        else:
+            syn_bundle = self._get_syn_bundle(remote_id, version=version, metadata_cache=metadata_cache)
+            entity = self._get_syn_entity_from_bundle(syn_bundle, download_path=local_path)
 
         remote_entity = SynapseRemoteEntity(entity)
 
         return remote_entity
 
+    def get_children(self, remote_id):
+        """Gets the children of a Synapse project or folder.
+
+        Args:
+            remote_id: The id of the Synapse project or folder.
+
+        Returns:
+            List of SynapseRemoteEntity (the children are not downloaded).
+        """
+        results = []
+
+        with SynapseAdapter.checkout_client() as client:
+            syn_children = list(client.getChildren(remote_id))
+
+        for syn_child in syn_children:
+            syn_entity = synapseclient.Entity.create({'id': syn_child.get('id'),
+                                                      'name': syn_child.get('name'),
+                                                      'concreteType': syn_child.get('type'),
+                                                      'versionNumber': syn_child.get('versionNumber'),
+                                                      'parentId': remote_id})
+            results.append(SynapseRemoteEntity(syn_entity))
+
+        return results
+
     def create_project(self, name):
         """Creates a new project in Synapse.
 
@@ -82,83 +219,760 @@ class SynapseAdapter(BaseAdapter):
         Raises:
             Exception: Raised if a project with the same name already exists.
         """
-        # Check if the project already exists.
-        syn_project_id = SynapseAdapter.client().findEntityId(name=name)
-        if syn_project_id:
-            raise Exception('Synapse project already exists with name: {0}'.format(name))
+        with SynapseAdapter.checkout_client() as client:
+            # Check if the project already exists.
+            syn_project_id = client.findEntityId(name=name)
+            if syn_project_id:
+                raise Exception('Synapse project already exists with name: {0}'.format(name))
 
-        syn_project = SynapseAdapter.client().store(synapseclient.Project(name=name))
+            syn_project = client.store(synapseclient.Project(name=name))
         return SynapseRemoteEntity(syn_project)
 
-    def data_pull(self, ki_project_resource):
+    def data_pull(self, ki_project_resource, max_workers=None):
         """Downloads a resource and all of it's children.
 
+        The entity's metadata is fetched once and a file is downloaded from it without fetching it again.
+        The children of a folder are pulled from a snapshot of the folder's tree (one metadata request
+        per downloaded file).
+
         Args:
             ki_project_resource: The resource to download.
+            max_workers: The number of threads to list folders and download files with.
+                Set to None to use DEFAULT_MAX_WORKERS or 1 to pull the children one at a time.
 
         Returns:
             SynapseRemoteEntity
+
+        Raises:
+            OfflineModeError: Raised in offline mode unless the resource is a file that is current.
+        """
+        return self.data_pull_many([ki_project_resource], max_workers=max_workers)[0]
+
+    def data_pull_many(self, ki_project_resources, max_workers=None):
+        """Downloads many resources and all of their children.
+
+        The metadata of the resources is fetched concurrently, then the trees of the folders are listed and their
+        KiProjectResources are created, then the files that are not current (from all of the resources) are
+        downloaded by a single pool of threads. A file that more than one resource is pulled to is downloaded once.
+
+        Args:
+            ki_project_resources: The resources to download.
+            max_workers: The number of threads to fetch metadata, list folders and download files with.
+                Set to None to use DEFAULT_MAX_WORKERS or 1 to pull one file at a time.
+
+        Returns:
+            List of SynapseRemoteEntity (one for each resource).
+
+        Raises:
+            OfflineModeError: Raised in offline mode unless each resource is a file that is current.
+        """
+        ki_project_resources = list(ki_project_resources)
+
+        if max_workers is None:
+            max_workers = self.DEFAULT_MAX_WORKERS
+
+        syn_bundles = self._get_syn_bundles(ki_project_resources, max_workers)
+        remote_entities = []
+        # Tuples: (download function, args, KiProjectResource, download path)
+        downloads = []
+
+        for ki_project_resource, syn_bundle in zip(ki_project_resources, syn_bundles):
+            remote_entity, resource_downloads = self._plan_pull(ki_project_resource, syn_bundle, max_workers)
+            remote_entities.append(remote_entity)
+            downloads.extend(resource_downloads)
+
+        pulled = self._download_syn_files(downloads, max_workers)
+
+        # Files that needed downloading are pulled now.
+        return [remote_entity or pulled[ki_project_resource.id]
+                for ki_project_resource, remote_entity in zip(ki_project_resources, remote_entities)]
+
+    def _get_syn_bundles(self, ki_project_resources, max_workers):
+        """Fetches the metadata (entity bundles) of many resources concurrently.
+
+        Args:
+            ki_project_resources: The resources (each with a remote_uri).
+            max_workers: The number of threads to fetch with.
+
+        Returns:
+            List of dicts (one for each resource).
+        """
+        requests = [(DataUri.parse(ki_project_resource.remote_uri).id, ki_project_resource.kiproject._metadata_cache)
+                    for ki_project_resource in ki_project_resources]
+
+        if max_workers <= 1 or len(requests) <= 1:
+            return [self._get_syn_bundle(syn_id, metadata_cache=metadata_cache) for syn_id, metadata_cache in requests]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as executor:
+            futures = [executor.submit(self._get_syn_bundle, syn_id, metadata_cache=metadata_cache)
+                       for syn_id, metadata_cache in requests]
+            return [future.result() for future in futures]
+
+    def _plan_pull(self, ki_project_resource, syn_bundle, max_workers):
+        """Gets the files that need downloading to pull a resource.
+
+        A folder's tree is listed and the KiProjectResources and local directories are created for all of it.
+
+        Args:
+            ki_project_resource: The resource to pull.
+            syn_bundle: The entity bundle of the resource.
+            max_workers: The number of threads to list folders with.
+
+        Returns:
+            Tuple: (SynapseRemoteEntity or None when the resource is a file that needs downloading,
+                    list of tuples for the files to download: (download function, args, KiProjectResource,
+                    download path))
+
+        Raises:
+            OfflineModeError: Raised in offline mode unless the resource is a file that is current.
         """
         data_uri = DataUri.parse(ki_project_resource.remote_uri)
-        syn_entity = SynapseAdapter.client().get(data_uri.id, downloadFile=False)
+        metadata_cache = ki_project_resource.kiproject._metadata_cache
+        syn_entity = self._get_syn_entity_from_bundle(syn_bundle)
 
         if not ki_project_resource.abs_path:
+            self._ensure_online(metadata_cache, 'pull {0}'.format(ki_project_resource.remote_uri))
             # This is the first pull so figure out where it lives locally.
             self._set_abs_path_from_entity(ki_project_resource, syn_entity)
 
-        download_path = ki_project_resource.abs_path
-
         if self._is_file(syn_entity):
-            download_path = os.path.dirname(download_path)
+            if self._is_pulled_file_current(ki_project_resource,
+                                            syn_entity.id,
+                                            syn_entity.get('versionNumber'),
+                                            syn_entity._file_handle.get('contentMd5')):
+                return SynapseRemoteEntity(syn_entity, local_path=ki_project_resource.abs_path), []
+
+            self._ensure_online(metadata_cache, 'pull {0}'.format(ki_project_resource.remote_uri))
+
+            if ki_project_resource.version and str(ki_project_resource.version) != str(syn_entity.versionNumber):
+                # The resource is locked to an older version.
+                syn_bundle = self._get_syn_bundle(data_uri.id,
+                                                  version=ki_project_resource.version,
+                                                  metadata_cache=metadata_cache)
+                syn_entity = self._get_syn_entity_from_bundle(syn_bundle)
+
+            verify = self._is_unverified_pull(ki_project_resource)
+            ki_project_resource.kiproject._transfer_journal.plan('pull', [(ki_project_resource.abs_path,
+                                                                           syn_entity.id,
+                                                                           syn_entity.get('versionNumber'),
+                                                                           syn_entity._file_handle.get('contentMd5'),
+                                                                           syn_entity._file_handle.get('contentSize'))])
+
+            # Download from the bundle without fetching the entity again.
+            download_path = os.path.dirname(ki_project_resource.abs_path)
+            return None, [(self._get_syn_entity_from_bundle,
+                           (syn_bundle, download_path, verify),
+                           ki_project_resource,
+                           download_path)]
+
+        remote_entity = SynapseRemoteEntity(syn_entity, local_path=ki_project_resource.abs_path)
+        downloads = []
+
+        if remote_entity.is_directory:
+            self._ensure_online(metadata_cache, 'pull {0}'.format(ki_project_resource.remote_uri))
+            self._pulled_folder(ki_project_resource)
+            root_ki_project_resource = ki_project_resource.root_resource or ki_project_resource
+
+            syn_tree = SynapseRemoteTree.build(SynapseAdapter.checkout_client,
+                                               syn_entity.get('id'),
+                                               max_workers=max_workers)
+
+            for syn_child, child_resource, download_path, verify in self._plan_pull_children(
+                    root_ki_project_resource,
+                    syn_tree,
+                    ki_project_resource.abs_path):
+                downloads.append((self._download_syn_file,
+                                  (syn_child.get('id'), download_path, child_resource.version, verify),
+                                  child_resource,
+                                  download_path))
+
+        return remote_entity, downloads
+
+    def _get_syn_bundle(self, syn_id, version=None, metadata_cache=None):
+        """Fetches the metadata (entity bundle) of a Synapse entity.
+
+        Cached bundles are revalidated with the entity's etag once they are older than the cache's TTL.
+
+        Args:
+            syn_id: The ID of the Synapse entity.
+            version: The version of the entity or None for the latest version.
+            metadata_cache: The KiProjectMetadataCache to get the bundle from (and add it to).
+
+        Returns:
+            Dict
+
+        Raises:
+            OfflineModeError: Raised in offline mode if the bundle is not cached.
+        """
+        if metadata_cache is None:
+            with SynapseAdapter.checkout_client() as client:
+                return client._getEntityBundle(syn_id, version)
+
+        key = self._metadata_key(syn_id, version)
+        syn_bundle = metadata_cache.get(key, revalidate=lambda: self._get_syn_etag(syn_id, version))
+
+        if syn_bundle is None:
+            self._ensure_online(metadata_cache, 'get the metadata of {0} (it is not cached)'.format(syn_id))
+            with SynapseAdapter.checkout_client() as client:
+                syn_bundle = client._getEntityBundle(syn_id, version)
+            metadata_cache.put(key, syn_bundle, validator=syn_bundle['entity'].get('etag'))
+
+        return syn_bundle
+
+    def _ensure_online(self, metadata_cache, action):
+        """Raises an OfflineModeError if the KiProject is in offline mode.
+
+        Args:
+            metadata_cache: The KiProject's KiProjectMetadataCache.
+            action: What needs the network (e.g., 'pull syn:syn123').
+
+        Returns:
+            None
+
+        Raises:
+            OfflineModeError: Raised if the KiProject is in offline mode.
+        """
+        if metadata_cache is not None and metadata_cache.offline:
+            raise OfflineModeError('Cannot {0} in offline mode.'.format(action))
+
+    def _get_syn_etag(self, syn_id, version=None):
+        """Fetches the etag of a Synapse entity (which changes every time the entity changes).
+
+        Args:
+            syn_id: The ID of the Synapse entity.
+            version: The version of the entity or None for the latest version.
 
+        Returns:
+            String
+        """
+        uri = '/entity/{0}'.format(syn_id) if version is None else '/entity/{0}/version/{1}'.format(syn_id, version)
+        with SynapseAdapter.checkout_client() as client:
+            return client.restGET(uri).get('etag')
+
+    def _metadata_key(self, syn_id, version=None, kind='bundle'):
+        """Gets the key of a Synapse entity's metadata in the KiProjectMetadataCache.
+
+        Args:
+            syn_id: The ID of the Synapse entity.
+            version: The version of the entity or None for the latest version.
+            kind: The kind of metadata (e.g., 'bundle', 'path').
+
+        Returns:
+            String
+        """
+        return '{0}:{1}:{2}:{3}'.format(self.DATA_URI_SCHEME, kind, syn_id, version or 'latest')
+
+    def _get_syn_entity_from_bundle(self, syn_bundle, download_path=None, verify=False):
+        """Creates a Synapse entity from its bundle and downloads it (when a file) without fetching it again.
+
+        Args:
+            syn_bundle: The entity bundle from _get_syn_bundle.
+            download_path: The directory to download a file to or None to not download it.
+            verify: Whether to check if the local file is already the Synapse file before downloading it
+                (e.g., a download that an interrupted pull started).
+
+        Returns:
+            Synapse entity.
+        """
+        # Entities that are not downloaded are created locally from the bundle.
+        syn_entity = self._get_with_syn_bundle(SynapseAdapter.local_client(), syn_bundle, None)
+
+        if download_path is None:
+            return syn_entity
+
+        if verify and self._is_file(syn_entity):
+            path = self._get_download_file_path(syn_entity, download_path)
+            if self._is_local_file(syn_entity, path):
+                return self._set_local_file(syn_entity, path)
+
+        if self._is_segmented_download(syn_entity):
+            return self._download_segmented(syn_bundle, syn_entity, download_path)
+
+        with SynapseAdapter.checkout_client(kind=None) as client:
+            return self._get_with_syn_bundle(client, syn_bundle, download_path)
+
+    def _is_segmented_download(self, syn_entity):
+        """Gets if a Synapse file is large enough to download in segments (see KITOOLS_SEGMENTED_DOWNLOAD_THRESHOLD).
+
+        Only files stored in S3 (which supports byte ranges) with a known MD5 are downloaded in segments.
+
+        Args:
+            syn_entity: The Synapse entity.
+
+        Returns:
+            True or False
+        """
+        if not self._is_file(syn_entity) or Env.KITOOLS_DOWNLOAD_SEGMENTS() < 2:
+            return False
+
+        file_handle = getattr(syn_entity, '_file_handle', None) or {}
+        threshold = Env.KITOOLS_SEGMENTED_DOWNLOAD_THRESHOLD()
+
+        return threshold > 0 and \
+               file_handle.get('concreteType') in self.SEGMENTED_FILE_HANDLE_TYPES and \
+               file_handle.get('contentMd5') is not None and \
+               (file_handle.get('contentSize') or 0) >= threshold
+
+    def _download_segmented(self, syn_bundle, syn_entity, download_path):
+        """Downloads a large Synapse file in concurrent segments from its pre-signed URL.
+
+        An interrupted download of the file is resumed.
+
+        Args:
+            syn_bundle: The entity bundle of the file.
+            syn_entity: The Synapse file (created from the bundle).
+            download_path: The directory to download the file to.
+
+        Returns:
+            synapseclient.File
+        """
+        SynapseAdapter.local_client()._check_entity_restrictions(syn_bundle['restrictionInformation'],
+                                                                 syn_entity.id,
+                                                                 True)
+
+        def _get_url():
+            with SynapseAdapter.checkout_client() as client:
+                return client._getFileHandleDownload(syn_entity.dataFileHandleId, syn_entity.id)['preSignedURL']
+
+        file_handle = syn_entity._file_handle
+        path = self._get_download_file_path(syn_entity, download_path)
+
+        SegmentedDownload(_get_url,
+                          path,
+                          file_handle.get('contentSize'),
+                          file_handle.get('contentMd5'),
+                          Env.KITOOLS_DOWNLOAD_SEGMENTS(),
+                          response_hook=SynapseAdapter.transfer_scheduler().observe_response).download()
+
+        return self._set_local_file(syn_entity, path)
+
+    def _get_download_file_path(self, syn_entity, download_path):
+        """Gets the path a Synapse file is downloaded to.
+
+        Args:
+            syn_entity: The Synapse file.
+            download_path: The directory the file is downloaded to.
+
+        Returns:
+            String
+        """
+        return os.path.join(download_path, syn_entity._file_handle.get('fileName') or syn_entity.name)
+
+    def _is_local_file(self, syn_entity, path):
+        """Gets if a local file is the same as a Synapse file (its size and MD5 match).
+
+        Args:
+            syn_entity: The Synapse file.
+            path: The path of the local file.
+
+        Returns:
+            True or False
+        """
+        md5, size = syn_entity._file_handle.get('contentMd5'), syn_entity._file_handle.get('contentSize')
+
+        if md5 is None or not os.path.isfile(path) or (size is not None and os.path.getsize(path) != size):
+            return False
+
+        return self._hash_file(path) == md5
+
+    def _set_local_file(self, syn_entity, path):
+        """Sets the local file of a Synapse file that was not downloaded by the Synapse client.
+
+        Args:
+            syn_entity: The Synapse file.
+            path: The path of the local file.
+
+        Returns:
+            synapseclient.File
+        """
+        # Let the client know the local file matches the remote file.
+        with SynapseAdapter.checkout_client() as client:
+            client.cache.add(syn_entity.dataFileHandleId, path)
+
+        syn_entity.path = path
+        syn_entity.files = [os.path.basename(path)]
+        syn_entity.cacheDir = os.path.dirname(path)
+        return syn_entity
+
+    def _get_with_syn_bundle(self, client, syn_bundle, download_path):
+        """Creates a Synapse entity from its bundle with a client.
+
+        Args:
+            client: The synapseclient.Synapse to use.
+            syn_bundle: The entity bundle from _get_syn_bundle.
+            download_path: The directory to download a file to or None to not download it.
+
+        Returns:
+            Synapse entity.
+        """
+        client._check_entity_restrictions(syn_bundle['restrictionInformation'],
+                                          syn_bundle['entity']['id'],
+                                          download_path is not None)
+        return client._getWithEntityBundle(entityBundle=syn_bundle,
+                                           downloadFile=download_path is not None,
+                                           downloadLocation=download_path,
+                                           ifcollision='overwrite.local')
+
+    def _pulled_file(self, ki_project_resource, syn_entity, download_path):
+        """Checks and records a downloaded file.
+
+        Args:
+            ki_project_resource: The resource that was pulled.
+            syn_entity: The downloaded synapseclient.File.
+            download_path: The directory the file was downloaded to.
+
+        Returns:
+            SynapseRemoteEntity
+        """
+        remote_entity = SynapseRemoteEntity(syn_entity, local_path=download_path)
+
+        # Compare path parts until this is fixed: https://github.com/Sage-Bionetworks/synapsePythonClient/issues/678
+        assert SysPath(remote_entity.local_path).abs_path.lower() == \
+               SysPath(ki_project_resource.abs_path).abs_path.lower()
+
+        self._record_file(ki_project_resource, syn_entity)
+        return remote_entity
+
+    def _pulled_folder(self, ki_project_resource):
+        """Creates the local directory for a pulled folder.
+
+        Args:
+            ki_project_resource: The folder resource that was pulled.
+
+        Returns:
+            None
+        """
         # Make sure a version didn't get set on a folder.
         # Synapse will blow up when requesting a version on a folder.
-        if self._is_folder(syn_entity) and ki_project_resource.version:
+        if ki_project_resource.version:
             ki_project_resource.version = None
             ki_project_resource.kiproject.save()
 
-        entity = SynapseAdapter.client().get(
-            data_uri.id,
-            downloadFile=True,
-            downloadLocation=download_path,
-            ifcollision='overwrite.local',
-            version=ki_project_resource.version
-        )
+        SysPath(ki_project_resource.abs_path).ensure_dirs()
 
-        remote_entity = SynapseRemoteEntity(entity, local_path=download_path)
+    def _plan_pull_children(self, root_ki_project_resource, syn_tree, download_path):
+        """Creates the KiProjectResources and local directories for a snapshot of a Synapse folder's tree.
 
-        # Compare path parts until this is fixed: https://github.com/Sage-Bionetworks/synapsePythonClient/issues/678
-        assert SysPath(remote_entity.local_path).abs_path.lower() == \
-               SysPath(ki_project_resource.abs_path).abs_path.lower()
+        Args:
+            root_ki_project_resource: The root resource.
+            syn_tree: The SynapseRemoteTree of the folder.
+            download_path: The local path of the folder.
+
+        Returns:
+            List of tuples for the files that are not current: (Synapse child, KiProjectResource, download path,
+                whether to check the local file before downloading it (see _is_unverified_pull))
+        """
+        # The local path of each Synapse folder.
+        local_paths = {syn_tree.root_id: download_path}
+        # Tuples: (Synapse child, KiProjectResource, download path, verify)
+        downloads = []
+
+        for syn_parent_id, syn_children in syn_tree.iter_children():
+            parent_path = local_paths[syn_parent_id]
+
+            for syn_child, child_resource in self._find_or_add_children(root_ki_project_resource,
+                                                                        syn_children,
+                                                                        parent_path):
+                if syn_child.get('type') == self.SYN_FOLDER_TYPE:
+                    self._pulled_folder(child_resource)
+                    local_paths[syn_child.get('id')] = child_resource.abs_path
+                elif not self._is_pulled_file_current(child_resource,
+                                                      syn_child.get('id'),
+                                                      syn_child.get('versionNumber')):
+                    downloads.append((syn_child, child_resource, parent_path, self._is_unverified_pull(child_resource)))
+
+        root_ki_project_resource.kiproject._transfer_journal.plan('pull', [
+            (child_resource.abs_path,
+             syn_child.get('id'),
+             child_resource.version or syn_child.get('versionNumber'),
+             syn_child.get('md5'),
+             None) for syn_child, child_resource, _, _ in downloads])
+
+        return downloads
+
+    def _download_syn_files(self, downloads, max_workers):
+        """Downloads Synapse files.
+
+        The files are downloaded by worker threads (each with its own Synapse client) and checked and recorded
+        on the calling thread. At most max_workers * TASKS_PER_WORKER downloads are handed to the workers at a time.
+        Resources that are pulled to the same local path are downloaded once.
+
+        Args:
+            downloads: List of tuples: (download function, args, KiProjectResource, download path)
+            max_workers: The number of threads to download with.
+
+        Returns:
+            Dict of the SynapseRemoteEntity for each KiProjectResource ID.
+        """
+        # Local path -> (download function, args, list of tuples: (KiProjectResource, download path))
+        tasks = OrderedDict()
+        for function, args, ki_project_resource, download_path in downloads:
+            task = tasks.setdefault(ki_project_resource.abs_path, (function, args, []))
+            task[2].append((ki_project_resource, download_path))
+
+        tasks = deque(tasks.values())
+        pulled = {}
+
+        if max_workers <= 1 or len(tasks) <= 1:
+            for function, args, task_resources in tasks:
+                self._start_pull(task_resources[0][0])
+                syn_entity = self._run_scheduled(function, *args)
+                for ki_project_resource, download_path in task_resources:
+                    pulled[ki_project_resource.id] = self._pulled_file(ki_project_resource, syn_entity, download_path)
+            return pulled
+
+        max_running = max_workers * self.TASKS_PER_WORKER
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while tasks or running:
+                while tasks and len(running) < max_running:
+                    function, args, task_resources = tasks.popleft()
+                    self._start_pull(task_resources[0][0])
+                    running[executor.submit(self._run_scheduled, function, *args)] = task_resources
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    syn_entity = future.result()
+                    for ki_project_resource, download_path in running.pop(future):
+                        pulled[ki_project_resource.id] = self._pulled_file(ki_project_resource,
+                                                                           syn_entity,
+                                                                           download_path)
+
+        return pulled
+
+    async def adata_pull(self, ki_project_resource, max_workers=None, executor=None):
+        """Coroutine version of data_pull.
+
+        Requests and downloads run in the executor, the KiProjectResources are added and updated on the
+        event loop's thread. The files in a folder are downloaded concurrently (as many at a time as the
+        executor has threads).
+
+        Args:
+            ki_project_resource: The resource to download.
+            max_workers: The number of threads to list the folders under a folder with.
+                Set to None to use DEFAULT_MAX_WORKERS.
+            executor: The concurrent.futures.Executor to run blocking work in or None for the loop's default.
+
+        Returns:
+            SynapseRemoteEntity
+
+        Raises:
+            OfflineModeError: Raised in offline mode unless the resource is a file that is current.
+        """
+        data_uri = DataUri.parse(ki_project_resource.remote_uri)
+        metadata_cache = ki_project_resource.kiproject._metadata_cache
+        syn_bundle = await self._run_in_executor(executor,
+                                                 self._get_syn_bundle,
+                                                 data_uri.id,
+                                                 metadata_cache=metadata_cache)
+        syn_entity = self._get_syn_entity_from_bundle(syn_bundle)
+
+        if not ki_project_resource.abs_path:
+            self._ensure_online(metadata_cache, 'pull {0}'.format(ki_project_resource.remote_uri))
+            remote_path = await self._run_in_executor(executor, self._get_remote_path, syn_entity)
+            self._set_abs_path_from_entity(ki_project_resource, syn_entity, remote_path=remote_path)
+
+        if self._is_file(syn_entity):
+            if self._is_pulled_file_current(ki_project_resource,
+                                            syn_entity.id,
+                                            syn_entity.get('versionNumber'),
+                                            syn_entity._file_handle.get('contentMd5')):
+                return SynapseRemoteEntity(syn_entity, local_path=ki_project_resource.abs_path)
+
+            self._ensure_online(metadata_cache, 'pull {0}'.format(ki_project_resource.remote_uri))
+
+            if ki_project_resource.version and str(ki_project_resource.version) != str(syn_entity.versionNumber):
+                # The resource is locked to an older version.
+                syn_bundle = await self._run_in_executor(executor,
+                                                         self._get_syn_bundle,
+                                                         data_uri.id,
+                                                         version=ki_project_resource.version,
+                                                         metadata_cache=metadata_cache)
+                syn_entity = self._get_syn_entity_from_bundle(syn_bundle)
+
+            verify = self._is_unverified_pull(ki_project_resource)
+            ki_project_resource.kiproject._transfer_journal.start('pull',
+                                                                  ki_project_resource.abs_path,
+                                                                  remote_id=syn_entity.id,
+                                                                  version=syn_entity.get('versionNumber'),
+                                                                  md5=syn_entity._file_handle.get('contentMd5'),
+                                                                  size=syn_entity._file_handle.get('contentSize'))
+
+            download_path = os.path.dirname(ki_project_resource.abs_path)
+            syn_entity = await self._run_in_executor(executor,
+                                                     self._run_scheduled,
+                                                     self._get_syn_entity_from_bundle,
+                                                     syn_bundle,
+                                                     download_path=download_path,
+                                                     verify=verify)
+            return self._pulled_file(ki_project_resource, syn_entity, download_path)
+
+        remote_entity = SynapseRemoteEntity(syn_entity, local_path=ki_project_resource.abs_path)
 
         if remote_entity.is_directory:
-            # Create the local directory for the folder.
-            SysPath(remote_entity.local_path).ensure_dirs()
-            self._pull_children(ki_project_resource.root_resource or ki_project_resource,
-                                remote_entity.source,
-                                remote_entity.local_path)
+            self._ensure_online(metadata_cache, 'pull {0}'.format(ki_project_resource.remote_uri))
+            self._pulled_folder(ki_project_resource)
+            root_ki_project_resource = ki_project_resource.root_resource or ki_project_resource
+
+            syn_tree = await self._run_in_executor(executor,
+                                                   SynapseRemoteTree.build,
+                                                   SynapseAdapter.checkout_client,
+                                                   syn_entity.id,
+                                                   max_workers=max_workers or self.DEFAULT_MAX_WORKERS)
+            downloads = self._plan_pull_children(root_ki_project_resource, syn_tree, ki_project_resource.abs_path)
+            await Utils.await_all(self._adownload_syn_file(syn_child, child_resource, download_path, verify, executor)
+                                  for syn_child, child_resource, download_path, verify in downloads)
 
         return remote_entity
 
-    def _pull_children(self, root_ki_project_resource, syn_parent, download_path):
-        """Pulls all the children of a parent.
+    async def _adownload_syn_file(self, syn_child, child_resource, download_path, verify, executor):
+        """Downloads a Synapse file in the executor and updates its KiProjectResource.
 
         Args:
-            root_ki_project_resource: The root resource.
-            syn_parent: The Synapse parent entity.
-            download_path: Where to download the children.
+            syn_child: The Synapse child header of the file.
+            child_resource: The KiProjectResource of the file.
+            download_path: The directory to download the file to.
+            verify: Whether to check the local file before downloading it (see _is_unverified_pull).
+            executor: The concurrent.futures.Executor to download in or None for the loop's default.
+
+        Returns:
+            SynapseRemoteEntity
+        """
+        self._start_pull(child_resource)
+        syn_entity = await self._run_in_executor(executor,
+                                                 self._run_scheduled,
+                                                 self._download_syn_file,
+                                                 syn_child.get('id'),
+                                                 download_path,
+                                                 child_resource.version,
+                                                 verify)
+        return self._pulled_file(child_resource, syn_entity, download_path)
+
+    def _is_pulled_file_current(self, ki_project_resource, syn_id, syn_version, md5=None):
+        """Gets if a resource's local file is the same as the Synapse file, so it does not need to be downloaded.
+
+        Args:
+            ki_project_resource: The resource to check.
+            syn_id: The ID of the Synapse file.
+            syn_version: The latest version of the Synapse file.
+            md5: The MD5 of the latest version of the Synapse file (if known).
+
+        Returns:
+            True or False
+        """
+        if not ki_project_resource.abs_path:
+            return False
+
+        if ki_project_resource.version:
+            # The resource is locked to a version so the latest MD5 does not apply.
+            syn_version, md5 = ki_project_resource.version, None
+
+        kiproject = ki_project_resource.kiproject
+
+        # Nothing is downloaded in offline mode so a file that has to be hashed is hashed here instead of by its
+        # download task (see _is_unverified_pull).
+        return kiproject._pull_index.is_current(ki_project_resource.abs_path,
+                                                syn_id,
+                                                syn_version,
+                                                md5=md5,
+                                                verify=kiproject._metadata_cache.offline)
+
+    def _is_unverified_pull(self, ki_project_resource):
+        """Gets if a resource's local file may already be the Synapse file but has to be hashed to know.
+
+        This is the case for a file that an interrupted pull started (or finished) downloading and for a file whose
+        signature was read too close to its mtime to trust (see KiProjectPullIndex.is_racy). The local file is
+        checked against the Synapse file by the download task (see _get_syn_entity_from_bundle) instead of being
+        downloaded again. The check runs with the download (in a worker thread or the executor) since it hashes
+        the file.
+
+        Args:
+            ki_project_resource: The resource to check.
+
+        Returns:
+            True or False
+        """
+        kiproject = ki_project_resource.kiproject
+        abs_path = ki_project_resource.abs_path
+
+        if not os.path.isfile(abs_path):
+            return False
+
+        if kiproject._pull_index.is_racy(abs_path):
+            return True
+
+        entry = kiproject._transfer_journal.get_entry(abs_path)
+        if entry is None or entry['op'] != 'pull' or entry['state'] == KiProjectTransferJournal.PLANNED:
+            return False
+
+        kiproject._transfer_journal.resumes += 1
+        return True
+
+    def _start_pull(self, ki_project_resource):
+        """Records that a resource's file is being downloaded.
+
+        Args:
+            ki_project_resource: The resource.
 
         Returns:
             None
         """
+        ki_project_resource.kiproject._transfer_journal.start('pull', ki_project_resource.abs_path)
+
+    def _record_file(self, ki_project_resource, syn_entity, operation='pull', signed=None):
+        """Records the Synapse file a resource's local file was pulled from or pushed to.
+
+        A pushed file is not recorded if it changed after it was signed (it may not be the file that was uploaded)
+        so it is pushed again next time.
+
+        Args:
+            ki_project_resource: The resource.
+            syn_entity: The synapseclient.File.
+            operation: 'pull' or 'push'.
+            signed: The signature of the local file and when it was read (see KiProjectPullIndex.sign), read
+                before the file was hashed or uploaded. Read now if None.
+
+        Returns:
+            None
+        """
+        kiproject = ki_project_resource.kiproject
+
+        if signed is not None and KiProjectPullIndex.get_signature(ki_project_resource.abs_path) != signed[0]:
+            print('WARNING: {0} changed while it was being pushed. Push it again to upload the changes.'.format(
+                ki_project_resource.abs_path))
+            return
+
+        args = (ki_project_resource.abs_path,
+                syn_entity.id,
+                syn_entity.get('versionNumber'),
+                syn_entity._file_handle.get('contentMd5'),
+                syn_entity._file_handle.get('contentSize'))
+
+        kiproject._pull_index.record(*args, signed=signed)
+        kiproject._transfer_journal.complete(operation, *args, parent_id=syn_entity.get('parentId'), signed=signed)
+
+    def _find_or_add_children(self, root_ki_project_resource, syn_children, download_path):
+        """Finds or adds the KiProjectResources for the children of a Synapse parent.
+
+        Args:
+            root_ki_project_resource: The root resource.
+            syn_children: The children of the Synapse parent (from getChildren).
+            download_path: Where the children are downloaded to.
+
+        Returns:
+            List of tuples: (Synapse child, KiProjectResource).
+        """
         kiproject = root_ki_project_resource.kiproject
-        syn_children = SynapseAdapter.client().getChildren(syn_parent, includeTypes=['folder', 'file'])
+        child_local_paths = [os.path.join(download_path, syn_child.get('name')) for syn_child in syn_children]
+        child_data_types = kiproject.get_data_types_from_paths(child_local_paths)
+        results = []
 
-        for syn_child in syn_children:
+        for syn_child, child_local_path, child_data_type in zip(syn_children, child_local_paths, child_data_types):
             child_data_uri = DataUri(SynapseAdapter.DATA_URI_SCHEME, syn_child.get('id')).uri
             child_name = syn_child.get('name')
-            child_local_path = os.path.join(download_path, child_name)
-            child_data_type = kiproject.get_data_type_from_path(child_local_path).name
+            child_data_type = child_data_type.name
 
             child_resource = kiproject.find_project_resource_by(data_type=child_data_type,
                                                                 remote_uri=child_data_uri,
@@ -172,14 +986,47 @@ class SynapseAdapter(BaseAdapter):
                                                      name=child_name,
                                                      root_ki_project_resource=root_ki_project_resource)
 
-            self.data_pull(child_resource)
+            results.append((syn_child, child_resource))
 
-    def _set_abs_path_from_entity(self, ki_project_resource, syn_entity):
+        return results
+
+    def _download_syn_file(self, syn_id, download_path, version, verify=False):
+        """Downloads a Synapse file.
+
+        Args:
+            syn_id: The ID of the Synapse file.
+            download_path: The directory to download the file to.
+            version: The version of the file to download or None for the latest version.
+            verify: Whether to check if the local file is already the Synapse file before downloading it.
+
+        Returns:
+            synapseclient.File
+        """
+        # Fetch the bundle first so large files can be downloaded in segments.
+        return self._get_syn_entity_from_bundle(self._get_syn_bundle(syn_id, version=version),
+                                                download_path=download_path,
+                                                verify=verify)
+
+    def _run_scheduled(self, function, *args, **kwargs):
+        """Runs a remote call with the transfer scheduler so it is retried if it is throttled.
+
+        Args:
+            function: The function to call.
+            args: The function's arguments.
+            kwargs: The function's keyword arguments.
+
+        Returns:
+            The function's result.
+        """
+        return SynapseAdapter.transfer_scheduler().run(function, *args, **kwargs)
+
+    def _set_abs_path_from_entity(self, ki_project_resource, syn_entity, remote_path=None):
         """Tries to figure out where a file/folder lives with in a KiProject data directories.
 
         Args:
             ki_project_resource: The resource to set the path for.
             syn_entity: The synapse entity to get the path for.
+            remote_path: The remote path of the entity if it is already known.
 
         Returns:
             None
@@ -189,7 +1036,8 @@ class SynapseAdapter(BaseAdapter):
         """
         kiproject = ki_project_resource.kiproject
 
-        remote_path = self._get_remote_path(syn_entity)
+        if remote_path is None:
+            remote_path = self._get_remote_path(syn_entity)
 
         # Always use the resource's data_type if available.
         data_type = ki_project_resource.data_type or kiproject.get_data_type_from_path(remote_path)
@@ -214,16 +1062,93 @@ class SynapseAdapter(BaseAdapter):
 
         kiproject.save()
 
-    def data_push(self, ki_project_resource):
+    def data_push(self, ki_project_resource, max_workers=None):
         """Uploads a resource and all of it's children to Synapse.
 
         Args:
             ki_project_resource: The resource to upload.
+            max_workers: The number of threads to upload files with.
+                Set to None to use DEFAULT_MAX_WORKERS or 1 to push the children one at a time.
 
         Returns:
             SynapseRemoteEntity
+
+        Raises:
+            OfflineModeError: Raised in offline mode.
+        """
+        self._ensure_online(ki_project_resource.kiproject._metadata_cache,
+                            'push {0}'.format(ki_project_resource.abs_path))
+
+        syn_parent = self._get_push_parent(ki_project_resource)
+
+        if max_workers is None:
+            max_workers = self.DEFAULT_MAX_WORKERS
+
+        return self._data_push(ki_project_resource, syn_parent, max_workers=max_workers)
+
+    def data_push_many(self, ki_project_resources, max_workers=None):
+        """Uploads many resources and all of their children to Synapse.
+
+        All of the files (from all of the resources) go through a single push pipeline (see _run_push_pipeline)
+        instead of one pipeline per resource.
+
+        Args:
+            ki_project_resources: The resources to upload.
+            max_workers: The number of threads to upload files with.
+                Set to None to use DEFAULT_MAX_WORKERS or 1 to push one resource at a time.
+
+        Returns:
+            List of SynapseRemoteEntity (one for each resource).
+
+        Raises:
+            OfflineModeError: Raised in offline mode.
+        """
+        ki_project_resources = list(ki_project_resources)
+
+        if max_workers is None:
+            max_workers = self.DEFAULT_MAX_WORKERS
+
+        if max_workers <= 1:
+            return [self.data_push(ki_project_resource, max_workers=max_workers)
+                    for ki_project_resource in ki_project_resources]
+
+        for ki_project_resource in ki_project_resources:
+            self._ensure_online(ki_project_resource.kiproject._metadata_cache,
+                                'push {0}'.format(ki_project_resource.abs_path))
+
+        waiting = {stage: deque() for stage in self.PUSH_STAGES}
+        # Files that have not changed since they were pushed.
+        unchanged = {}
+
+        for ki_project_resource in ki_project_resources:
+            syn_parent = self._get_push_parent(ki_project_resource)
+            root_ki_project_resource = ki_project_resource.root_resource or ki_project_resource
+            remote_entity = self._queue_push_resource(root_ki_project_resource,
+                                                      ki_project_resource,
+                                                      syn_parent,
+                                                      waiting)
+            if remote_entity is not None:
+                unchanged[ki_project_resource.id] = remote_entity
+
+        pushed = self._run_push_pipeline(waiting, max_workers)
+        pushed.update(unchanged)
+
+        return [pushed[ki_project_resource.id] for ki_project_resource in ki_project_resources]
+
+    def _get_push_parent(self, ki_project_resource):
+        """Gets the Synapse parent to push a resource to.
+
+        Resources that belong to the KiProject's remote project are pushed to the same path as they have locally
+        (the folders are found or created). Other resources are pushed to their current parent.
+
+        Args:
+            ki_project_resource: The resource to push.
+
+        Returns:
+            synapseclient.Project or synapseclient.Folder
         """
         kiproject = ki_project_resource.kiproject
+        metadata_cache = kiproject._metadata_cache
 
         project_data_uri = DataUri.parse(kiproject.project_uri)
 
@@ -235,26 +1160,24 @@ class SynapseAdapter(BaseAdapter):
         if ki_project_resource.remote_uri is not None:
             resource_data_uri = DataUri.parse(ki_project_resource.remote_uri)
 
-            syn_entity = SynapseAdapter.client().get(resource_data_uri.id, downloadFile=False)
-
-            syn_parents = [syn_entity] if self._is_project(syn_entity) else list(SynapseParentIter(syn_entity))
-
-            # The last item will always be a Synapse Project.
-            resource_syn_project = syn_parents[-1]
-            assert self._is_project(resource_syn_project)
+            # The first item will always be the Synapse Project.
+            syn_path = self._get_syn_path(resource_data_uri.id, metadata_cache=metadata_cache)
+            resource_syn_project = syn_path[0]
+            assert resource_syn_project.get('type') == SynapseEntityPathResolver.PROJECT_TYPE
 
-            if resource_syn_project.id != project_data_uri.id:
+            if resource_syn_project.get('id') != project_data_uri.id:
                 # The resource does not belong to the same Synapse project so get its parent.
                 resource_belongs_to_ki_project = False
-                syn_parent = syn_parents[0]
+                syn_parent = self._syn_entity_from_path(syn_path[:-1] or syn_path)
             else:
-                syn_parent = resource_syn_project
+                syn_parent = self._syn_entity_from_path(syn_path[:1])
                 assert project_data_uri.id == syn_parent.id
 
         # If the resource belongs to the KiProject's remote project then get or create the remote folder structure.
         if resource_belongs_to_ki_project:
             if syn_parent is None:
-                syn_parent = SynapseAdapter.client().get(project_data_uri.id)
+                syn_parent = self._get_syn_entity_from_bundle(self._get_syn_bundle(project_data_uri.id,
+                                                                                   metadata_cache=metadata_cache))
 
             sys_path = SysPath(ki_project_resource.abs_path, rel_start=kiproject.local_path)
 
@@ -265,14 +1188,15 @@ class SynapseAdapter(BaseAdapter):
                     break
                 syn_parent = self._find_or_create_syn_folder(syn_parent, part)
 
-        return self._data_push(ki_project_resource, syn_parent)
+        return syn_parent
 
-    def _data_push(self, ki_project_resource, syn_parent):
+    def _data_push(self, ki_project_resource, syn_parent, max_workers=1):
         """Uploads a resource to Synapse parent entity.
 
         Args:
             ki_project_resource: The resource to upload.
             syn_parent: The Synapse parent entity.
+            max_workers: The number of threads to upload the children of a folder with.
 
         Returns:
             SynapseRemoteEntity
@@ -280,18 +1204,162 @@ class SynapseAdapter(BaseAdapter):
         kiproject = ki_project_resource.kiproject
         sys_path = SysPath(ki_project_resource.abs_path, rel_start=kiproject.local_path)
         syn_entity = None
+        signed = None
 
         if sys_path.is_dir:
             # Find or create the folder in Synapse.
             syn_entity = self._find_or_create_syn_folder(syn_parent, sys_path.basename)
 
             # Push the children
-            self._push_children(ki_project_resource.root_resource or ki_project_resource, syn_entity, sys_path.abs_path)
+            root_ki_project_resource = ki_project_resource.root_resource or ki_project_resource
+            if max_workers > 1:
+                self._push_children_concurrently(root_ki_project_resource, syn_entity, sys_path.abs_path, max_workers)
+            else:
+                self._push_children(root_ki_project_resource, syn_entity, sys_path.abs_path)
+        else:
+            syn_entity = self._get_unchanged_syn_file(ki_project_resource, synapseclient.utils.id_of(syn_parent))
+            if syn_entity is not None:
+                return self._update_pushed_resource(ki_project_resource, syn_entity, record=False)
+
+            # Upload the file (the client hashes it).
+            signed = KiProjectPullIndex.sign(sys_path.abs_path)
+            with SynapseAdapter.checkout_client(kind=None) as client:
+                syn_entity = client.store(synapseclient.File(path=sys_path.abs_path, parent=syn_parent),
+                                          forceVersion=False)
+
+        return self._update_pushed_resource(ki_project_resource, syn_entity, signed=signed)
+
+    async def adata_push(self, ki_project_resource, executor=None):
+        """Coroutine version of data_push.
+
+        Requests, hashing and uploads run in the executor, the KiProjectResources are added and updated on the
+        event loop's thread. The children of a folder are pushed concurrently (as many at a time as the
+        executor has threads) once the folder exists in Synapse.
+
+        Unlike adata_pull there is no max_workers: adata_pull uses it for the threads that list the remote
+        folders, a push has no such step so the executor alone sets how much runs at a time.
+
+        Args:
+            ki_project_resource: The resource to upload.
+            executor: The concurrent.futures.Executor to run blocking work in or None for the loop's default.
+
+        Returns:
+            SynapseRemoteEntity
+
+        Raises:
+            OfflineModeError: Raised in offline mode.
+        """
+        self._ensure_online(ki_project_resource.kiproject._metadata_cache,
+                            'push {0}'.format(ki_project_resource.abs_path))
+
+        syn_parent = await self._run_in_executor(executor, self._get_push_parent, ki_project_resource)
+        return await self._adata_push(ki_project_resource,
+                                      ki_project_resource.root_resource or ki_project_resource,
+                                      syn_parent,
+                                      executor)
+
+    async def _adata_push(self, ki_project_resource, root_ki_project_resource, syn_parent, executor):
+        """Uploads a resource (and its children) to a Synapse parent.
+
+        Args:
+            ki_project_resource: The resource to upload.
+            root_ki_project_resource: The root resource.
+            syn_parent: The Synapse parent entity.
+            executor: The concurrent.futures.Executor to run blocking work in or None for the loop's default.
+
+        Returns:
+            SynapseRemoteEntity
+        """
+        syn_parent_id = synapseclient.utils.id_of(syn_parent)
+
+        if os.path.isdir(ki_project_resource.abs_path):
+            syn_entity = await self._run_in_executor(executor,
+                                                     self._find_or_create_syn_folder,
+                                                     syn_parent,
+                                                     os.path.basename(ki_project_resource.abs_path))
+            remote_entity = self._update_pushed_resource(ki_project_resource, syn_entity)
+
+            children = self._find_or_add_local_children(root_ki_project_resource, ki_project_resource.abs_path)
+            await Utils.await_all(self._adata_push(child_resource, root_ki_project_resource, syn_entity, executor)
+                                  for _, child_resource in children)
+            return remote_entity
+
+        syn_entity = self._get_unchanged_syn_file(ki_project_resource, syn_parent_id)
+        if syn_entity is not None:
+            return self._update_pushed_resource(ki_project_resource, syn_entity, record=False)
+
+        md5, signed = self._get_started_push_hash(ki_project_resource, syn_parent_id)
+        if md5 is None:
+            md5, signed = await self._run_in_executor(executor, self._sign_and_hash_file, ki_project_resource.abs_path)
+            ki_project_resource.kiproject._transfer_journal.start('push',
+                                                                  ki_project_resource.abs_path,
+                                                                  md5=md5,
+                                                                  parent_id=syn_parent_id,
+                                                                  signed=signed)
+        syn_entity, file_handle = await self._run_in_executor(executor,
+                                                              self._run_scheduled,
+                                                              self._upload_syn_file,
+                                                              ki_project_resource.abs_path,
+                                                              syn_parent_id,
+                                                              md5)
+        if syn_entity is None:
+            syn_entity = await self._run_in_executor(executor,
+                                                     self._run_scheduled,
+                                                     self._store_syn_file,
+                                                     ki_project_resource.abs_path,
+                                                     syn_parent_id,
+                                                     file_handle)
+
+        return self._update_pushed_resource(ki_project_resource, syn_entity, signed=signed)
+
+    def _get_unchanged_syn_file(self, ki_project_resource, syn_parent_id):
+        """Gets the Synapse file for a resource if the local file has not changed since it was last pushed or pulled.
+
+        Args:
+            ki_project_resource: The resource to push.
+            syn_parent_id: The ID of the Synapse parent the file is pushed to.
+
+        Returns:
+            synapseclient.File (not fetched from Synapse) or None.
+        """
+        # A resource locked to a version is always pushed so it becomes the latest version.
+        if ki_project_resource.version:
+            return None
+
+        kiproject = ki_project_resource.kiproject
+
+        if ki_project_resource.remote_uri is not None:
+            syn_id = DataUri.parse(ki_project_resource.remote_uri).id
         else:
-            # Upload the file
-            syn_entity = SynapseAdapter.client().store(synapseclient.File(path=sys_path.abs_path, parent=syn_parent),
-                                                       forceVersion=False)
+            # The file may have been pushed by an interrupted push before the resource was saved.
+            journal_entry = kiproject._transfer_journal.get_completed(ki_project_resource.abs_path)
+            if journal_entry is None or journal_entry['op'] != 'push' or journal_entry['parent'] != syn_parent_id:
+                return None
+            syn_id = journal_entry['id']
+
+        entry = kiproject._pull_index.get_entry(ki_project_resource.abs_path)
+        if entry is None or entry['id'] != syn_id:
+            return None
+
+        return synapseclient.File(path=ki_project_resource.abs_path,
+                                  name=os.path.basename(ki_project_resource.abs_path),
+                                  id=entry['id'],
+                                  parent=syn_parent_id,
+                                  versionNumber=entry['version'])
+
+    def _update_pushed_resource(self, ki_project_resource, syn_entity, record=True, signed=None):
+        """Updates a KiProjectResource after it has been pushed.
 
+        Args:
+            ki_project_resource: The resource that was pushed.
+            syn_entity: The Synapse entity the resource was pushed to.
+            record: Whether to record the pushed file in the pull index.
+            signed: The signature of the pushed file from before it was hashed (see _record_file).
+
+        Returns:
+            SynapseRemoteEntity
+        """
+        kiproject = ki_project_resource.kiproject
         has_changes = False
 
         # If this is the first push then update the KiProjectResource.
@@ -307,12 +1375,20 @@ class SynapseAdapter(BaseAdapter):
         if has_changes:
             kiproject.save()
 
-        remote_entity = SynapseRemoteEntity(syn_entity, local_path=sys_path.abs_path)
+        if record:
+            # The entity changed so its cached metadata is stale.
+            kiproject._metadata_cache.remove(self._metadata_key(syn_entity.id))
+
+        remote_entity = SynapseRemoteEntity(syn_entity, local_path=ki_project_resource.abs_path)
 
         # Compare path parts until this is fixed: https://github.com/Sage-Bionetworks/synapsePythonClient/issues/678
         assert SysPath(remote_entity.local_path).abs_path.lower() == \
                SysPath(ki_project_resource.abs_path).abs_path.lower()
 
+        if remote_entity.is_file and record:
+            # The local file is the latest version so it does not need to be pulled.
+            self._record_file(ki_project_resource, syn_entity, operation='push', signed=signed)
+
         return remote_entity
 
     def _push_children(self, root_ki_project_resource, syn_parent, local_path):
@@ -324,15 +1400,211 @@ class SynapseAdapter(BaseAdapter):
             local_path: The local path if files and folders to upload.
 
         Returns:
-            SynapseRemoteEntity
+            None
+        """
+        for _, child_resource in self._find_or_add_local_children(root_ki_project_resource, local_path):
+            self._data_push(child_resource, syn_parent)
+
+    def _push_children_concurrently(self, root_ki_project_resource, syn_parent, local_path, max_workers):
+        """Uploads child objects to Synapse with the push pipeline (see _run_push_pipeline).
+
+        Args:
+            root_ki_project_resource: The root resource.
+            syn_parent: The Synapse folder to upload to.
+            local_path: The local path of the files and folders to upload.
+            max_workers: The number of threads to upload files with.
+
+        Returns:
+            None
+        """
+        waiting = {stage: deque() for stage in self.PUSH_STAGES}
+        self._queue_push_children(root_ki_project_resource, syn_parent, local_path, waiting)
+        self._run_push_pipeline(waiting, max_workers)
+
+    def _run_push_pipeline(self, waiting, max_workers):
+        """Uploads the queued resources to Synapse with a pipeline of worker threads.
+
+        Each file goes through three stages, each with its own pool of threads:
+            hash:   Calculates the MD5 of the file (and reads its signature first, see _sign_and_hash_file).
+            upload: Uploads the file unless the remote file has the same MD5.
+            entity: Creates or updates the Synapse File for the uploaded file.
+
+        Folders are found or created by the entity threads. The children of a folder are only queued after
+        the folder exists in Synapse. A stage is not handed more tasks while the next stage has a full queue
+        so only a bounded number of files are in the pipeline at a time.
+        The KiProjectResources are found, added and updated on the calling thread.
+
+        Args:
+            waiting: The dict of waiting tasks for each stage (see _queue_push_resource).
+            max_workers: The number of threads to upload files with.
+
+        Returns:
+            Dict of the SynapseRemoteEntity for each pushed KiProjectResource ID.
+        """
+        worker_counts = {
+            'hash': min(max_workers, self.PUSH_HASH_WORKERS),
+            'upload': max_workers,
+            'entity': min(max_workers, self.PUSH_ENTITY_WORKERS)
+        }
+        executors = {stage: ThreadPoolExecutor(max_workers=count) for stage, count in worker_counts.items()}
+        limits = {stage: count * self.TASKS_PER_WORKER for stage, count in worker_counts.items()}
+        next_stages = {'folder': 'hash', 'hash': 'upload', 'upload': 'entity', 'entity': None}
+        stage_executors = {'folder': 'entity', 'hash': 'hash', 'upload': 'upload', 'entity': 'entity'}
+
+        running = {}
+        running_counts = {stage: 0 for stage in executors}
+        pushed = {}
+
+        try:
+            while running or any(waiting.values()):
+                # Submit the later stages first so files leave the pipeline before more enter it.
+                for stage in ['entity', 'upload', 'hash', 'folder']:
+                    executor_name = stage_executors[stage]
+                    next_stage = next_stages[stage]
+
+                    while waiting[stage] and running_counts[executor_name] < limits[executor_name] and \
+                            (next_stage is None or len(waiting[next_stage]) < limits[stage_executors[next_stage]]):
+                        task = waiting[stage].popleft()
+                        function, args = task[0], task[1]
+                        if stage != 'hash':
+                            # Hashing is local, the other stages are remote calls.
+                            function, args = self._run_scheduled, (function,) + tuple(args)
+                        running[executors[executor_name].submit(function, *args)] = (stage, task)
+                        running_counts[executor_name] += 1
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    stage, (function, args, ki_project_resource, syn_parent_id, root_ki_project_resource, signed) = \
+                        running.pop(future)
+                    running_counts[stage_executors[stage]] -= 1
+                    result = future.result()
+
+                    if stage == 'folder':
+                        pushed[ki_project_resource.id] = self._update_pushed_resource(ki_project_resource, result)
+                        self._queue_push_children(root_ki_project_resource,
+                                                  result,
+                                                  ki_project_resource.abs_path,
+                                                  waiting)
+                    elif stage == 'hash':
+                        md5, signed = result
+                        ki_project_resource.kiproject._transfer_journal.start('push',
+                                                                              ki_project_resource.abs_path,
+                                                                              md5=md5,
+                                                                              parent_id=syn_parent_id,
+                                                                              signed=signed)
+                        waiting['upload'].append((self._upload_syn_file,
+                                                  (ki_project_resource.abs_path, syn_parent_id, md5),
+                                                  ki_project_resource,
+                                                  syn_parent_id,
+                                                  root_ki_project_resource,
+                                                  signed))
+                    elif stage == 'upload':
+                        syn_entity, file_handle = result
+                        if syn_entity is not None:
+                            # The file has not changed.
+                            pushed[ki_project_resource.id] = self._update_pushed_resource(ki_project_resource,
+                                                                                          syn_entity,
+                                                                                          signed=signed)
+                        else:
+                            waiting['entity'].append((self._store_syn_file,
+                                                      (ki_project_resource.abs_path, syn_parent_id, file_handle),
+                                                      ki_project_resource,
+                                                      syn_parent_id,
+                                                      root_ki_project_resource,
+                                                      signed))
+                    else:
+                        pushed[ki_project_resource.id] = self._update_pushed_resource(ki_project_resource,
+                                                                                      result,
+                                                                                      signed=signed)
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+
+        return pushed
+
+    def _queue_push_children(self, root_ki_project_resource, syn_parent, local_path, waiting):
+        """Queues the children of a local folder for _run_push_pipeline.
+
+        Args:
+            root_ki_project_resource: The root resource.
+            syn_parent: The Synapse folder the children are uploaded to.
+            local_path: The local folder.
+            waiting: The dict of waiting tasks for each stage.
+
+        Returns:
+            None
+        """
+        for _, child_resource in self._find_or_add_local_children(root_ki_project_resource, local_path):
+            self._queue_push_resource(root_ki_project_resource, child_resource, syn_parent, waiting)
+
+    def _queue_push_resource(self, root_ki_project_resource, ki_project_resource, syn_parent, waiting):
+        """Queues a resource for _run_push_pipeline.
+
+        Args:
+            root_ki_project_resource: The root resource of the resource (or the resource itself).
+            ki_project_resource: The resource to push.
+            syn_parent: The Synapse parent the resource is uploaded to.
+            waiting: The dict of waiting tasks for each stage.
+                Tasks: (function, args, KiProjectResource, Synapse parent ID, root KiProjectResource,
+                        signature of the local file from before it was hashed or None)
+
+        Returns:
+            SynapseRemoteEntity if the resource is a file that has not changed since it was pushed, otherwise None.
+        """
+        if os.path.isdir(ki_project_resource.abs_path):
+            waiting['folder'].append((self._find_or_create_syn_folder,
+                                      (syn_parent, os.path.basename(ki_project_resource.abs_path)),
+                                      ki_project_resource,
+                                      syn_parent.id,
+                                      root_ki_project_resource,
+                                      None))
+            return None
+
+        syn_entity = self._get_unchanged_syn_file(ki_project_resource, syn_parent.id)
+        if syn_entity is not None:
+            return self._update_pushed_resource(ki_project_resource, syn_entity, record=False)
+
+        md5, signed = self._get_started_push_hash(ki_project_resource, syn_parent.id)
+        if md5 is not None:
+            waiting['upload'].append((self._upload_syn_file,
+                                      (ki_project_resource.abs_path, syn_parent.id, md5),
+                                      ki_project_resource,
+                                      syn_parent.id,
+                                      root_ki_project_resource,
+                                      signed))
+            return None
+
+        ki_project_resource.kiproject._transfer_journal.plan('push',
+                                                             [(ki_project_resource.abs_path, None, None, None, None)])
+        waiting['hash'].append((self._sign_and_hash_file,
+                                (ki_project_resource.abs_path,),
+                                ki_project_resource,
+                                syn_parent.id,
+                                root_ki_project_resource,
+                                None))
+        return None
+
+    def _find_or_add_local_children(self, root_ki_project_resource, local_path):
+        """Finds or adds the KiProjectResources for the files and folders in a local folder.
+
+        Args:
+            root_ki_project_resource: The root resource.
+            local_path: The local folder.
+
+        Returns:
+            List of tuples: (os.DirEntry, KiProjectResource). Files are listed before folders.
         """
         kiproject = root_ki_project_resource.kiproject
 
         dirs, files = Utils.get_dirs_and_files(local_path)
+        entries = files + dirs
+        child_data_types = kiproject.get_data_types_from_paths(entry.path for entry in entries)
+        results = []
 
-        for entry in files + dirs:
+        for entry, child_data_type in zip(entries, child_data_types):
             sys_path = SysPath(entry.path)
-            child_data_type = kiproject.get_data_type_from_path(sys_path.abs_path).name
+            child_data_type = child_data_type.name
 
             child_resource = kiproject.find_project_resource_by(data_type=child_data_type,
                                                                 abs_path=sys_path.abs_path,
@@ -343,7 +1615,139 @@ class SynapseAdapter(BaseAdapter):
                                                      name=sys_path.basename,
                                                      root_ki_project_resource=root_ki_project_resource)
 
-            self._data_push(child_resource, syn_parent)
+            results.append((entry, child_resource))
+
+        return results
+
+    def _hash_file(self, path):
+        """Calculates the MD5 of a local file.
+
+        Args:
+            path: The path of the file.
+
+        Returns:
+            The MD5 as a hex string.
+        """
+        return synapseclient.utils.md5_for_file(path).hexdigest()
+
+    def _sign_and_hash_file(self, path):
+        """Calculates the MD5 of a local file to push.
+
+        The file's signature is read before it is hashed so a change made while the file is hashed or uploaded
+        is noticed before the pushed file is recorded (see _record_file).
+
+        Args:
+            path: The path of the file.
+
+        Returns:
+            Tuple: (MD5, signature of the file and when it was read (see KiProjectPullIndex.sign))
+        """
+        signed = KiProjectPullIndex.sign(path)
+        return self._hash_file(path), signed
+
+    def _get_started_push_hash(self, ki_project_resource, syn_parent_id):
+        """Gets the MD5 of a file that an interrupted push hashed, so it is not hashed again.
+
+        The upload is not started from scratch either, the remote file is checked for the MD5 before uploading
+        (and Synapse resumes a multipart upload of the same file).
+
+        Args:
+            ki_project_resource: The resource to push.
+            syn_parent_id: The ID of the Synapse parent the file is pushed to.
+
+        Returns:
+            Tuple: (MD5, signature of the file from before it was hashed) or (None, None) if the file was not hashed
+            by an interrupted push (or changed since).
+        """
+        journal = ki_project_resource.kiproject._transfer_journal
+        entry = journal.get_started('push', ki_project_resource.abs_path)
+        if entry is None or entry['parent'] != syn_parent_id or entry['md5'] is None:
+            return None, None
+
+        journal.resumes += 1
+        return entry['md5'], (entry['local'], entry['signed'])
+
+    def _upload_syn_file(self, path, syn_parent_id, md5):
+        """Uploads a local file to Synapse unless the Synapse File under the parent has the same MD5.
+
+        Args:
+            path: The path of the file.
+            syn_parent_id: The ID of the Synapse parent the file is pushed to.
+            md5: The MD5 of the file.
+
+        Returns:
+            Tuple: (synapseclient.File, None) if the file has not changed or (None, file handle) if it was uploaded.
+
+        Raises:
+            Exception: Raised if the name is taken by a Synapse entity that is not a File.
+        """
+        file_name = os.path.basename(path)
+
+        with SynapseAdapter.checkout_client(kind=None) as client:
+            syn_child = self._folder_cache.find(client, syn_parent_id, file_name)
+
+            if syn_child:
+                if syn_child.get('type') != self.SYN_FILE_TYPE:
+                    raise Exception(
+                        'Cannot upload file, name: {0} already taken by another entity: {1}'.format(
+                            file_name, syn_child.get('id')))
+
+                syn_entity = client.get(syn_child.get('id'), downloadFile=False)
+
+                if syn_entity._file_handle.get('contentMd5') == md5:
+                    # Let the client know the local file matches the remote file.
+                    client.cache.add(syn_entity.dataFileHandleId, path)
+                    syn_entity.path = path
+                    return syn_entity, None
+
+            return None, client.uploadFileHandle(path, syn_parent_id, md5=md5)
+
+    def _store_syn_file(self, path, syn_parent_id, file_handle):
+        """Creates or updates the Synapse File for an uploaded file.
+
+        Args:
+            path: The path of the file.
+            syn_parent_id: The ID of the Synapse parent.
+            file_handle: The file handle of the uploaded file.
+
+        Returns:
+            synapseclient.File
+        """
+        # The file has already been uploaded so don't give the client the path or it will upload it again.
+        with SynapseAdapter.checkout_client() as client:
+            syn_entity = client.store(synapseclient.File(name=os.path.basename(path),
+                                                         parent=syn_parent_id,
+                                                         dataFileHandleId=file_handle['id']),
+                                      forceVersion=False)
+        syn_entity.path = path
+        return syn_entity
+
+    def _get_syn_path(self, syn_id, metadata_cache=None):
+        """Gets the path of a Synapse entity from its Project down to the entity.
+
+        Cached paths are fetched again once they are older than the cache's TTL.
+
+        Args:
+            syn_id: The ID of the Synapse entity.
+            metadata_cache: The KiProjectMetadataCache to get the path from (and add it to).
+
+        Returns:
+            Tuple of entity headers (dicts with 'id', 'name', 'type'), the first is the Project and the last
+            is the entity.
+        """
+        if metadata_cache is None:
+            with SynapseAdapter.checkout_client() as client:
+                return self._path_resolver.get_path(client, syn_id)
+
+        key = self._metadata_key(syn_id, kind='path')
+        syn_path = metadata_cache.get(key)
+
+        if syn_path is None:
+            with SynapseAdapter.checkout_client() as client:
+                syn_path = self._path_resolver.get_path(client, syn_id)
+            metadata_cache.put(key, syn_path)
+
+        return tuple(syn_path)
 
     def _get_remote_path(self, syn_entity):
         """Gets the remote path for a Synapse Folder or File (e.g., folder1/folder2/file1.csv)
@@ -357,40 +1761,93 @@ class SynapseAdapter(BaseAdapter):
         if not (self._is_folder(syn_entity) or self._is_file(syn_entity)):
             return ''
 
-        path_parts = [syn_entity.name]
-
-        for e in SynapseParentIter(syn_entity):
-            if self._is_project(e):
-                break
-            path_parts.insert(0, e.name)
+        # Skip the Project.
+        with SynapseAdapter.checkout_client() as client:
+            syn_path = self._path_resolver.get_path(client, syn_entity)
+        path_parts = [header.get('name') for header in syn_path[1:]]
 
         # Return the path matching the OS's separator.
         return os.sep.join(path_parts)
 
+    def _syn_entity_from_path(self, syn_path):
+        """Creates a Synapse Project or Folder (without fetching it) for the last entity in a path.
+
+        Args:
+            syn_path: Tuple of entity headers from SynapseEntityPathResolver.get_path.
+
+        Returns:
+            synapseclient.Project or synapseclient.Folder
+        """
+        header = syn_path[-1]
+
+        if len(syn_path) == 1:
+            return synapseclient.Project(name=header.get('name'), id=header.get('id'))
+        else:
+            return synapseclient.Folder(name=header.get('name'), id=header.get('id'), parent=syn_path[-2].get('id'))
+
     def _find_or_create_syn_folder(self, syn_parent, folder_name):
         """Finds or creates a folder in Synapse.
 
+        The children of each parent are listed once and cached for the life of the adapter.
+
         Args:
             syn_parent: The Synapse entity to find or create the folder under.
             folder_name: The name of the folder to find or create.
 
         Returns:
             synapseclient.Folder
+
+        Raises:
+            Exception: Raised if the name is taken by a Synapse entity that is not a folder.
         """
+        syn_parent_id = synapseclient.utils.id_of(syn_parent)
+        syn_child = self._find_syn_child(syn_parent_id, folder_name)
+
+        if not syn_child:
+            try:
+                with SynapseAdapter.checkout_client() as client:
+                    syn_folder = client.store(synapseclient.Folder(name=folder_name, parent=syn_parent_id),
+                                              createOrUpdate=False)
+            except SynapseHTTPError as ex:
+                if ex.response is None or ex.response.status_code != 409:
+                    raise
+                # The name was taken after the parent was listed. Child listings are eventually consistent so the
+                # parent is only listed once more.
+                self._folder_cache.invalidate(syn_parent_id)
+                syn_child = self._find_syn_child(syn_parent_id, folder_name)
+                if not syn_child:
+                    raise
+            else:
+                self._folder_cache.add(syn_parent_id, syn_folder, self.SYN_FOLDER_TYPE)
+                self._folder_cache.add_empty(syn_folder.id)
+                return syn_folder
+
+        if syn_child.get('type') != self.SYN_FOLDER_TYPE:
+            raise Exception(
+                'Cannot create folder, name: {0} already taken by another entity: {1}'.format(folder_name,
+                                                                                              syn_child.get('id')))
+        return synapseclient.Folder(name=syn_child.get('name'), id=syn_child.get('id'), parent=syn_parent_id)
 
-        # TODO: can any of this be cached?
-        syn_entity_id = SynapseAdapter.client().findEntityId(folder_name, parent=syn_parent)
+    def _find_syn_child(self, syn_parent_id, name):
+        """Finds a child of a Synapse parent by name from the folder cache.
 
-        if syn_entity_id:
-            syn_entity = SynapseAdapter.client().get(syn_entity_id)
-            if self._is_folder(syn_entity):
-                return syn_entity
-            else:
-                raise Exception(
-                    'Cannot create folder, name: {0} already taken by another entity: {1}'.format(folder_name,
-                                                                                                  syn_entity.id))
+        A child that is not a folder is looked up again in case the cache is stale.
 
-        return SynapseAdapter.client().store(synapseclient.Folder(name=folder_name, parent=syn_parent))
+        Args:
+            syn_parent_id: The ID of the Synapse parent.
+            name: The name of the child.
+
+        Returns:
+            The child header (dict with 'id', 'name', 'type') or None.
+        """
+        with SynapseAdapter.checkout_client() as client:
+            syn_child = self._folder_cache.find(client, syn_parent_id, name)
+
+            if syn_child and syn_child.get('type') != self.SYN_FOLDER_TYPE:
+                self._folder_cache.invalidate(syn_parent_id)
+                syn_child = self._folder_cache.find(client, syn_parent_id, name)
+
+        return syn_child
 
     def _is_project(self, syn_entity):
         """Gets if the Synapse entity is a Project.
@@ -436,32 +1893,3 @@ class SynapseAdapter(BaseAdapter):
         """
         return self._is_project(syn_entity) or self._is_folder(syn_entity) or self._is_file(syn_entity)
 
-
-class SynapseParentIter:
-    """Iterator for traversing Synapse parents."""
-
-    def __init__(self, syn_entity):
-        """Instantiates a new instance.
-
-        Args:
-            syn_entity: The Synapse entity to start with.
-        """
-        self._current_entity = syn_entity
-
-    def __iter__(self):
-        return self
-
-    def __next__(self):
-        """Gets the next parent entity until the Project entity is found.
-
-        NOTE: There is a parent above a Synapse Project but it is not accessible.
-
-        Returns:
-            The next Synapse parent.
-        """
-        if isinstance(self._current_entity, synapseclient.Project):
-            raise StopIteration()
-
-        self._current_entity = SynapseAdapter.client().get(self._current_entity.get('parentId', None))
-
-        return self._current_entity
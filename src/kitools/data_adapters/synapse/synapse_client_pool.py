@@ -0,0 +1,221 @@
+import threading
+import functools
+import synapseclient
+from contextlib import contextmanager
+
+
+class SynapseClientPool(object):
+    """A pool of logged in Synapse clients for using Synapse from many threads.
+
+    A synapseclient.Synapse is not safe to use from more than one thread at a time so each worker checks out
+    a client (each with its own HTTP connection pool) and returns it when it is done. Clients are created as they
+    are needed, up to max_size, after that workers wait for a client to be returned.
+
+    Only the first (primary) client logs in. The other clients share its endpoints and credentials so they do not
+    log in or check the endpoints again. The primary client is handed out whenever it is free so work done on one
+    thread always uses the same client.
+
+    A thread that checks out a client while it already has one gets the same client back.
+
+    When the pool has a TransferScheduler the clients make their REST calls with it and leave throttled responses
+    to it: the synapseclient retries them on its own, ignoring Retry-After and holding the scheduler's slot.
+    """
+
+    # The default maximum number of clients.
+    DEFAULT_MAX_SIZE = 32
+
+    # REST methods of the clients that are made with the TransferScheduler.
+    SCHEDULED_METHODS = ('restGET', 'restPOST', 'restPUT', 'restDELETE')
+
+    # The messages of failed responses the synapseclient retries on that are sent with throttled responses.
+    THROTTLE_RETRY_ERRORS = ('slow down', 'slowdown', 'try again')
+
+    def __init__(self, config_path=None, max_size=None, response_hook=None, transfer_scheduler=None):
+        """Instantiates a new instance.
+
+        Args:
+            config_path: The path of the Synapse config file to log in with or None for the synapseclient's default.
+            max_size: The maximum number of clients. Set to None to use DEFAULT_MAX_SIZE.
+            response_hook: A requests response hook to add to each client (e.g., to see the responses that the
+                synapseclient retries on its own).
+            transfer_scheduler: The TransferScheduler that retries the clients' throttled REST calls or None to
+                leave them to the synapseclient.
+        """
+        if max_size is not None and max_size < 1:
+            raise ValueError('max_size must be greater than 0.')
+
+        self._config_path = config_path or synapseclient.client.CONFIG_FILE
+        self._max_size = max_size or self.DEFAULT_MAX_SIZE
+        self._response_hook = response_hook
+        self._transfer_scheduler = transfer_scheduler
+        self._primary = None
+        self._clients = []
+        # The free clients, the primary client is always last so it is handed out first.
+        self._available = []
+        # Thread ID -> [client, checkout depth]
+        self._checkouts = {}
+        self._condition = threading.Condition()
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @property
+    def size(self):
+        """Gets the number of clients that have been created."""
+        return len(self._clients)
+
+    @property
+    def available(self):
+        """Gets the number of clients that can be checked out without creating or waiting for a client."""
+        return len(self._available)
+
+    def primary(self):
+        """Gets the primary client (logging it in if needed).
+
+        The primary client may be checked out by a worker, only use it directly when no workers are running.
+
+        Returns:
+            synapseclient.Synapse
+        """
+        with self._condition:
+            if self._primary is None:
+                self._primary = self._add_hooks(self._new_primary_client())
+                self._clients.append(self._primary)
+                self._available.append(self._primary)
+            return self._primary
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Checks out a client for the calling thread.
+
+        Examples:
+            >>> with pool.checkout() as client:
+            >>>     client.get('syn123', downloadFile=False)
+
+        Args:
+            timeout: The number of seconds to wait for a client when all of them are checked out.
+                Set to None to wait until one is returned.
+
+        Returns:
+            Context manager that gives a synapseclient.Synapse.
+
+        Raises:
+            TimeoutError: Raised if no client was returned within the timeout.
+        """
+        client = self._acquire(timeout)
+        try:
+            yield client
+        finally:
+            self._release()
+
+    def close(self):
+        """Closes the HTTP connections of all the clients and removes them from the pool.
+
+        Returns:
+            None
+        """
+        with self._condition:
+            for client in self._clients:
+                client._requests_session.close()
+            self._primary = None
+            self._clients = []
+            self._available = []
+            self._checkouts = {}
+            self._condition.notify_all()
+
+    def _acquire(self, timeout):
+        thread_id = threading.get_ident()
+
+        with self._condition:
+            checkout = self._checkouts.get(thread_id)
+            if checkout is not None:
+                checkout[1] += 1
+                return checkout[0]
+
+            if self._primary is None:
+                self.primary()
+
+            if not self._available and len(self._clients) < self._max_size:
+                client = self._add_hooks(self._new_client(self._primary))
+                self._clients.append(client)
+                self._available.insert(0, client)
+
+            if not self._condition.wait_for(lambda: self._available, timeout=timeout):
+                raise TimeoutError('No Synapse client was returned to the pool within {0} seconds.'.format(timeout))
+
+            client = self._available.pop()
+            self._checkouts[thread_id] = [client, 1]
+            return client
+
+    def _release(self):
+        thread_id = threading.get_ident()
+
+        with self._condition:
+            checkout = self._checkouts.get(thread_id)
+            if checkout is None:
+                # The pool was closed.
+                return
+
+            checkout[1] -= 1
+            if checkout[1] > 0:
+                return
+
+            del self._checkouts[thread_id]
+            client = checkout[0]
+
+            if client is self._primary:
+                self._available.append(client)
+            else:
+                self._available.insert(0, client)
+            self._condition.notify()
+
+    def _add_hooks(self, client):
+        if self._response_hook is not None:
+            client._requests_session.hooks['response'].append(self._response_hook)
+        if self._transfer_scheduler is not None:
+            self._schedule_retries(client)
+        return client
+
+    def _schedule_retries(self, client):
+        """Makes a client's REST calls with the TransferScheduler and stops the client retrying throttled calls.
+
+        Args:
+            client: The synapseclient.Synapse.
+
+        Returns:
+            None
+        """
+        scheduler = self._transfer_scheduler
+        build_retry_policy = client._build_retry_policy
+
+        def _build_retry_policy(retryPolicy={}):
+            retry_policy = build_retry_policy(retryPolicy)
+            retry_policy['retry_status_codes'] = [status_code
+                                                  for status_code in retry_policy.get('retry_status_codes', [])
+                                                  if status_code not in scheduler.THROTTLE_STATUS_CODES]
+            retry_policy['retry_errors'] = [error
+                                            for error in retry_policy.get('retry_errors', [])
+                                            if error not in self.THROTTLE_RETRY_ERRORS]
+            return retry_policy
+
+        client._build_retry_policy = _build_retry_policy
+
+        for name in self.SCHEDULED_METHODS:
+            setattr(client, name, functools.partial(scheduler.run, getattr(client, name)))
+
+    def _new_primary_client(self):
+        client = synapseclient.Synapse(configPath=self._config_path)
+        client.login(silent=True)
+        return client
+
+    def _new_client(self, primary):
+        # Skip the version and endpoint checks, the primary client already did them.
+        client = synapseclient.Synapse(configPath=self._config_path, skip_checks=True)
+        client.setEndpoints(repoEndpoint=primary.repoEndpoint,
+                            authEndpoint=primary.authEndpoint,
+                            fileHandleEndpoint=primary.fileHandleEndpoint,
+                            portalEndpoint=primary.portalEndpoint,
+                            skip_checks=True)
+        client.credentials = primary.credentials
+        return client
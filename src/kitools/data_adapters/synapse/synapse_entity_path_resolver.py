@@ -0,0 +1,66 @@
+import threading
+
+
+class SynapseEntityPathResolver(object):
+    """Resolves the path of Synapse entities from their Project down to the entity.
+
+    Each path is fetched with one request (/entity/{id}/path) and the paths of all the ancestors are cached,
+    so entities whose parent has already been resolved do not need a request.
+    """
+
+    PROJECT_TYPE = 'org.sagebionetworks.repo.model.Project'
+
+    def __init__(self):
+        """Instantiates a new instance."""
+        # Entity ID -> tuple of entity headers (dicts with 'id', 'name', 'type') from the Project to the entity.
+        self._paths = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def get_path(self, client, syn_entity):
+        """Gets the path of a Synapse entity.
+
+        Args:
+            client: The synapseclient.Synapse to fetch the path with.
+            syn_entity: The Synapse entity or entity ID.
+
+        Returns:
+            Tuple of entity headers (dicts with 'id', 'name', 'type'), the first is the Project and the last
+            is the entity.
+        """
+        if isinstance(syn_entity, str):
+            syn_id, syn_parent_id = syn_entity, None
+        else:
+            syn_id, syn_parent_id = syn_entity.get('id'), syn_entity.get('parentId', None)
+
+        with self._lock:
+            path = self._paths.get(syn_id)
+            parent_path = self._paths.get(syn_parent_id) if syn_parent_id else None
+
+        if path is not None:
+            return path
+
+        if parent_path is not None:
+            header = {'id': syn_id, 'name': syn_entity.get('name'), 'type': syn_entity.get('concreteType')}
+            path = parent_path + (header,)
+            with self._lock:
+                self._paths[syn_id] = path
+            return path
+
+        headers = client.restGET('/entity/{0}/path'.format(syn_id)).get('path')
+
+        # Drop the root folder(s) above the Project, they are not accessible.
+        project_index = 0
+        for index, header in enumerate(headers):
+            if header.get('type') == self.PROJECT_TYPE:
+                project_index = index
+                break
+
+        path = tuple({'id': h.get('id'), 'name': h.get('name'), 'type': h.get('type')} for h in headers[project_index:])
+
+        with self._lock:
+            self.requests += 1
+            for index in range(1, len(path) + 1):
+                self._paths[path[index - 1]['id']] = path[:index]
+
+        return path
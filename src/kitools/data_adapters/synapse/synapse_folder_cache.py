@@ -0,0 +1,80 @@
+import threading
+
+
+class SynapseFolderCache(object):
+    """Caches the children of Synapse parents by name.
+
+    The children of a parent are listed once (with getChildren) the first time a name is looked up under it.
+    """
+
+    def __init__(self):
+        """Instantiates a new instance."""
+        # Parent ID -> {child name: child header (dict with 'id', 'name', 'type')}
+        self._children = {}
+        self._lock = threading.Lock()
+        self.listings = 0
+
+    def find(self, client, syn_parent_id, name):
+        """Finds a child of a Synapse parent by name.
+
+        Args:
+            client: The synapseclient.Synapse to list the parent with if it has not been listed.
+            syn_parent_id: The ID of the Synapse parent.
+            name: The name of the child.
+
+        Returns:
+            The child header (dict with 'id', 'name', 'type') or None.
+        """
+        with self._lock:
+            children = self._children.get(syn_parent_id)
+
+        if children is None:
+            children = {}
+            for syn_child in client.getChildren(syn_parent_id):
+                children[syn_child.get('name')] = syn_child
+
+            with self._lock:
+                self.listings += 1
+                self._children[syn_parent_id] = children
+
+        return children.get(name)
+
+    def add(self, syn_parent_id, syn_entity, syn_type):
+        """Adds a child that was created in Synapse to a parent that has been listed.
+
+        Args:
+            syn_parent_id: The ID of the Synapse parent.
+            syn_entity: The Synapse entity that was created.
+            syn_type: The Synapse type of the entity (e.g., 'org.sagebionetworks.repo.model.Folder').
+
+        Returns:
+            None
+        """
+        with self._lock:
+            children = self._children.get(syn_parent_id)
+            if children is not None:
+                children[syn_entity.name] = {'id': syn_entity.id, 'name': syn_entity.name, 'type': syn_type}
+
+    def add_empty(self, syn_parent_id):
+        """Caches a new Synapse parent that does not have any children yet.
+
+        Args:
+            syn_parent_id: The ID of the Synapse parent.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._children.setdefault(syn_parent_id, {})
+
+    def invalidate(self, syn_parent_id):
+        """Removes the cached children of a Synapse parent so they are listed again.
+
+        Args:
+            syn_parent_id: The ID of the Synapse parent.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._children.pop(syn_parent_id, None)
@@ -0,0 +1,158 @@
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import PurePosixPath
+
+
+class SynapseRemoteTree(object):
+    """A snapshot of the folders and files under a Synapse parent.
+
+    Each entity is a dict with the keys from the parent's listing ('id', 'name', 'type', 'versionNumber')
+    plus 'parentId', 'path' (the posix path relative to the parent) and, when file handles are included,
+    'md5' and 'size'.
+    """
+
+    FOLDER_TYPE = 'org.sagebionetworks.repo.model.Folder'
+    FILE_TYPE = 'org.sagebionetworks.repo.model.FileEntity'
+    PREVIEW_FILE_HANDLE_TYPE = 'org.sagebionetworks.repo.model.file.PreviewFileHandle'
+
+    # How many requests to hand to each worker at a time.
+    TASKS_PER_WORKER = 2
+
+    def __init__(self, root_id):
+        """Instantiates a new instance.
+
+        Args:
+            root_id: The ID of the Synapse parent.
+        """
+        self._root_id = root_id
+        # Parent ID -> list of children, in the order the parents were listed (parents before their children).
+        self._children = OrderedDict()
+        self._entities = {}
+
+    @property
+    def root_id(self):
+        return self._root_id
+
+    @property
+    def entities(self):
+        """Gets all the entities, each parent before its children.
+
+        Returns:
+            List of dicts.
+        """
+        return [syn_child for _, syn_children in self.iter_children() for syn_child in syn_children]
+
+    @property
+    def folders(self):
+        return [e for e in self.entities if e.get('type') == self.FOLDER_TYPE]
+
+    @property
+    def files(self):
+        return [e for e in self.entities if e.get('type') == self.FILE_TYPE]
+
+    def __len__(self):
+        return len(self._entities)
+
+    def get(self, syn_id):
+        """Gets an entity by ID.
+
+        Args:
+            syn_id: The ID of the entity.
+
+        Returns:
+            Dict or None.
+        """
+        return self._entities.get(syn_id)
+
+    def get_children(self, syn_parent_id):
+        """Gets the children of a parent in the tree.
+
+        Args:
+            syn_parent_id: The ID of the parent.
+
+        Returns:
+            List of dicts.
+        """
+        return self._children.get(syn_parent_id, [])
+
+    def iter_children(self):
+        """Iterates the children of each parent in the tree, each parent before its children.
+
+        Returns:
+            Iterator of tuples: (parent ID, list of children)
+        """
+        return iter(self._children.items())
+
+    @classmethod
+    def build(cls, checkout_client, root_id, max_workers=1, include_file_handles=False):
+        """Lists the folders (breadth-first) and files under a Synapse parent.
+
+        Args:
+            checkout_client: Function that returns a context manager that checks out a synapseclient.Synapse
+                for the calling thread (e.g., SynapseAdapter.checkout_client).
+            root_id: The ID of the Synapse parent.
+            max_workers: The number of threads to list folders (and get file handles) with.
+            include_file_handles: Whether to get the MD5 and size of each file (one request per file).
+
+        Returns:
+            SynapseRemoteTree
+        """
+        tree = cls(root_id)
+        max_running = max_workers * cls.TASKS_PER_WORKER
+        # Tasks: (function, args)
+        tasks = deque([(cls._list_children, (checkout_client, root_id))])
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while tasks or running:
+                while tasks and len(running) < max_running:
+                    function, args = tasks.popleft()
+                    running[executor.submit(function, *args)] = function
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    function = running.pop(future)
+                    result = future.result()
+
+                    if function == cls._list_children:
+                        syn_parent_id, syn_children = result
+                        tree._add_children(syn_parent_id, syn_children)
+
+                        for syn_child in syn_children:
+                            if syn_child.get('type') == cls.FOLDER_TYPE:
+                                tasks.append((cls._list_children, (checkout_client, syn_child.get('id'))))
+                            elif include_file_handles and syn_child.get('type') == cls.FILE_TYPE:
+                                tasks.append((cls._get_file_handle, (checkout_client, syn_child)))
+                    else:
+                        syn_child, file_handle = result
+                        syn_child['md5'] = file_handle.get('contentMd5') if file_handle else None
+                        syn_child['size'] = file_handle.get('contentSize') if file_handle else None
+
+        return tree
+
+    def _add_children(self, syn_parent_id, syn_children):
+        parent = self._entities.get(syn_parent_id)
+        parent_path = PurePosixPath(parent['path']) if parent else PurePosixPath()
+
+        for syn_child in syn_children:
+            syn_child['parentId'] = syn_parent_id
+            syn_child['path'] = (parent_path / syn_child.get('name')).as_posix()
+            self._entities[syn_child.get('id')] = syn_child
+
+        self._children[syn_parent_id] = syn_children
+
+    @staticmethod
+    def _list_children(checkout_client, syn_parent_id):
+        with checkout_client() as client:
+            syn_children = list(client.getChildren(syn_parent_id, includeTypes=['folder', 'file']))
+        return syn_parent_id, syn_children
+
+    @classmethod
+    def _get_file_handle(cls, checkout_client, syn_child):
+        uri = '/entity/{0}/version/{1}/filehandles'.format(syn_child.get('id'), syn_child.get('versionNumber'))
+        with checkout_client() as client:
+            file_handles = client.restGET(uri).get('list', [])
+        file_handle = next((fh for fh in file_handles if fh.get('concreteType') != cls.PREVIEW_FILE_HANDLE_TYPE),
+                           None)
+        return syn_child, file_handle
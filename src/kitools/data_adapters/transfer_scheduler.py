@@ -0,0 +1,381 @@
+import time
+import socket
+import threading
+import email.utils
+import requests
+from contextlib import contextmanager
+
+
+class TransferScheduler(object):
+    """Limits how many remote calls (requests, downloads and uploads) run at a time and adapts the limit to how
+    the remote service is coping (AIMD).
+
+    The limit grows by one after each window of successful calls that reached the limit (additive increase).
+    The limit is cut by decrease_factor (multiplicative decrease) when any of these happen:
+        - A call is throttled (HTTP 429 or 503).
+        - A call fails with a server or connection error.
+        - The average latency of a kind of call grows past latency_factor times its lowest recent latency.
+    The limit is cut at most once per window. Calls that started before the last cut do not cut it again, so
+    a burst of failures from the same overload only counts once.
+
+    A Retry-After on a throttled response pauses the start of new calls until it has passed. Throttled calls
+    made with run() are retried. The slot is given up while a call waits to be retried, unless the call runs in
+    a slot its thread already holds. In that case the call waits while it holds the slot. A run() inside
+    another run() on the same thread leaves the retries to the outer run().
+    """
+
+    THROTTLE_STATUS_CODES = (429, 503)
+
+    # The weight of the latest latency in the average latency.
+    LATENCY_SMOOTHING = 0.2
+    # How much the lowest latency drifts up with each call (so an old outlier is forgotten).
+    LATENCY_FLOOR_DRIFT = 0.001
+    # The number of calls of a kind before its latency is used.
+    LATENCY_MIN_SAMPLES = 5
+
+    def __init__(self, max_concurrency=16, min_concurrency=1, initial_concurrency=None, decrease_factor=0.5,
+                 latency_factor=3.0, max_retries=5, retry_wait=1.0, max_retry_wait=60.0):
+        """Instantiates a new instance.
+
+        Args:
+            max_concurrency: The most calls to run at a time.
+            min_concurrency: The fewest calls to allow at a time.
+            initial_concurrency: The limit to start with. Set to None to start at max_concurrency.
+            decrease_factor: What to multiply the limit by when it is cut.
+            latency_factor: How many times its lowest latency the average latency of a kind of call can grow to
+                before the limit is cut. Set to None to not use latency.
+            max_retries: How many times run() retries a throttled call.
+            retry_wait: The seconds to wait before the first retry of a throttled call without a Retry-After.
+                The wait doubles with each retry.
+            max_retry_wait: The most seconds to wait before a retry (or pause for a Retry-After).
+        """
+        if min_concurrency < 1 or max_concurrency < min_concurrency:
+            raise ValueError('Concurrency must be: 1 <= min_concurrency <= max_concurrency.')
+
+        if not 0 < decrease_factor < 1:
+            raise ValueError('decrease_factor must be between 0 and 1.')
+
+        self._max_concurrency = max_concurrency
+        self._min_concurrency = min_concurrency
+        self._concurrency = max_concurrency if initial_concurrency is None else \
+            min(max(initial_concurrency, min_concurrency), max_concurrency)
+        self._decrease_factor = decrease_factor
+        self._latency_factor = latency_factor
+        self._max_retries = max_retries
+        self._retry_wait = retry_wait
+        self._max_retry_wait = max_retry_wait
+
+        self._condition = threading.Condition()
+        self._running = 0
+        self._waiting = 0
+        # Thread ID -> slot depth
+        self._holders = {}
+        # Thread ID -> run() depth
+        self._runs = {}
+        # The time new calls can start (after a Retry-After).
+        self._paused_until = 0
+        # The time the limit was last changed.
+        self._changed_at = time.monotonic()
+        # The successful calls since the limit was last changed and if they reached the limit.
+        self._window_successes = 0
+        self._window_limited = False
+        # Kind -> [average latency since the limit changed, lowest latency, samples since the limit changed]
+        self._latencies = {}
+
+        self.successes = 0
+        self.throttles = 0
+        self.errors = 0
+        self.retries = 0
+
+    @property
+    def concurrency(self):
+        """Gets the current limit."""
+        return self._concurrency
+
+    @property
+    def max_concurrency(self):
+        return self._max_concurrency
+
+    @property
+    def min_concurrency(self):
+        return self._min_concurrency
+
+    @property
+    def running(self):
+        """Gets the number of calls that are running."""
+        return self._running
+
+    @property
+    def queue_depth(self):
+        """Gets the number of calls that are waiting to start."""
+        return self._waiting
+
+    def run(self, function, *args, kind=None, **kwargs):
+        """Runs a function when the limit allows, retrying it if it is throttled.
+
+        Args:
+            function: The function to call.
+            args: The function's arguments.
+            kind: The kind of call (see slot).
+            kwargs: The function's keyword arguments.
+
+        Returns:
+            The function's result.
+        """
+        thread_id = threading.get_ident()
+
+        with self._condition:
+            outer_runs = self._runs.get(thread_id, 0)
+            self._runs[thread_id] = outer_runs + 1
+            # A held slot is not given up (or paused) while the call waits to be retried.
+            holds_slot = thread_id in self._holders
+
+        try:
+            return self._run(function, args, kwargs, kind, outer_runs > 0, holds_slot)
+        finally:
+            with self._condition:
+                if outer_runs:
+                    self._runs[thread_id] = outer_runs
+                else:
+                    del self._runs[thread_id]
+
+    def _run(self, function, args, kwargs, kind, in_run, holds_slot):
+        """Runs a function in a slot, retrying it if it is throttled (see run).
+
+        Args:
+            function: The function to call.
+            args: The function's arguments.
+            kwargs: The function's keyword arguments.
+            kind: The kind of call (see slot).
+            in_run: Whether the call is inside another run() on the same thread, which retries it instead.
+            holds_slot: Whether the thread already holds a slot, so the call waits while it holds the slot.
+
+        Returns:
+            The function's result.
+        """
+        attempt = 0
+
+        while True:
+            try:
+                with self.slot(kind=kind):
+                    return function(*args, **kwargs)
+            except Exception as ex:
+                status_code, retry_after = self._get_status(ex)
+                if status_code not in self.THROTTLE_STATUS_CODES or attempt >= self._max_retries or in_run:
+                    raise
+
+                attempt += 1
+                with self._condition:
+                    self.retries += 1
+
+                if retry_after is None:
+                    # The scheduler is not paused so back off this call.
+                    time.sleep(min(self._retry_wait * (2 ** (attempt - 1)), self._max_retry_wait))
+                elif holds_slot:
+                    # A held slot does not wait for the pause.
+                    time.sleep(min(retry_after, self._max_retry_wait))
+
+    @contextmanager
+    def slot(self, kind=None):
+        """Waits until the limit allows another call, then holds a place for the call until the block exits.
+
+        An exception raised in the block is checked for throttling and errors. A thread that already holds
+        a slot does not wait for another.
+
+        Examples:
+            >>> with scheduler.slot(kind='metadata'):
+            >>>     client.restGET('/entity/syn123')
+
+        Args:
+            kind: The kind of call. The latency of calls of the same kind is compared to detect overload.
+                Set to None for calls whose latency varies (e.g., file transfers) so it is not used.
+
+        Returns:
+            Context manager.
+        """
+        thread_id = threading.get_ident()
+
+        with self._condition:
+            if thread_id in self._holders:
+                self._holders[thread_id] += 1
+                nested = True
+            else:
+                nested = False
+
+        if nested:
+            try:
+                yield
+            finally:
+                with self._condition:
+                    self._holders[thread_id] -= 1
+            return
+
+        started_at = self._acquire(thread_id)
+        try:
+            yield
+        except BaseException as ex:
+            self._release(thread_id)
+            self._on_error(ex, started_at)
+            raise
+        else:
+            self._release(thread_id)
+            self._on_success(kind, started_at)
+
+    def observe_response(self, response, *args, **kwargs):
+        """Checks a response for throttling.
+
+        Can be used as a requests response hook to see responses that a client retries on its own or that are
+        received in a slot the thread already holds (nested slots do not check exceptions).
+
+        Args:
+            response: The requests.Response.
+
+        Returns:
+            None
+        """
+        status_code = getattr(response, 'status_code', None)
+        if status_code in self.THROTTLE_STATUS_CODES:
+            # So the exception raised for the response is not counted again (see _on_error).
+            response.throttle_observed = True
+            elapsed = getattr(response, 'elapsed', None)
+            started_at = time.monotonic() - (elapsed.total_seconds() if elapsed is not None else 0)
+            self._on_throttled(started_at, self._get_retry_after(response))
+
+    def _acquire(self, thread_id):
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    pause = self._paused_until - time.monotonic()
+                    if pause > 0:
+                        self._condition.wait(pause)
+                    elif self._running < self._concurrency:
+                        break
+                    else:
+                        self._window_limited = True
+                        self._condition.wait()
+            finally:
+                self._waiting -= 1
+
+            self._running += 1
+            self._holders[thread_id] = 1
+            if self._running >= self._concurrency:
+                self._window_limited = True
+            return time.monotonic()
+
+    def _release(self, thread_id):
+        with self._condition:
+            self._running -= 1
+            del self._holders[thread_id]
+            self._condition.notify_all()
+
+    def _on_success(self, kind, started_at):
+        now = time.monotonic()
+
+        with self._condition:
+            self.successes += 1
+
+            if started_at < self._changed_at:
+                # The call started before the limit changed so it says nothing about the current limit.
+                return
+
+            if kind is not None and self._latency_factor is not None and self._is_overloaded(kind, now - started_at):
+                self._decrease(now)
+                return
+
+            self._window_successes += 1
+            if self._window_successes >= self._concurrency and self._window_limited and \
+                    self._concurrency < self._max_concurrency:
+                self._concurrency += 1
+                self._reset_window(now)
+                self._condition.notify_all()
+
+    def _on_error(self, ex, started_at):
+        status_code, retry_after = self._get_status(ex)
+
+        if status_code in self.THROTTLE_STATUS_CODES:
+            if not getattr(ex.response, 'throttle_observed', False):
+                self._on_throttled(started_at, retry_after)
+        elif (status_code is not None and status_code >= 500) or \
+                (status_code is None and isinstance(ex, (requests.exceptions.ConnectionError,
+                                                         requests.exceptions.Timeout,
+                                                         ConnectionError,
+                                                         socket.timeout))):
+            with self._condition:
+                self.errors += 1
+                if started_at >= self._changed_at:
+                    self._decrease(time.monotonic())
+
+    def _on_throttled(self, started_at, retry_after):
+        now = time.monotonic()
+
+        with self._condition:
+            self.throttles += 1
+
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, now + min(retry_after, self._max_retry_wait))
+
+            if started_at >= self._changed_at:
+                self._decrease(now)
+
+    def _decrease(self, now):
+        self._concurrency = max(self._min_concurrency, int(self._concurrency * self._decrease_factor))
+        self._reset_window(now)
+
+    def _reset_window(self, now):
+        self._changed_at = now
+        self._window_successes = 0
+        self._window_limited = self._running >= self._concurrency
+
+        # Start new averages for the new limit.
+        for latencies in self._latencies.values():
+            latencies[0] = None
+            latencies[2] = 0
+
+    def _is_overloaded(self, kind, latency):
+        average, lowest, samples = self._latencies.get(kind, [None, latency, 0])
+
+        average = latency if average is None else average + self.LATENCY_SMOOTHING * (latency - average)
+        lowest = min(latency, lowest * (1 + self.LATENCY_FLOOR_DRIFT))
+        samples += 1
+        self._latencies[kind] = [average, lowest, samples]
+
+        return samples >= self.LATENCY_MIN_SAMPLES and average > self._latency_factor * lowest
+
+    def _get_status(self, ex):
+        """Gets the HTTP status code and Retry-After of an exception's response.
+
+        Args:
+            ex: The exception.
+
+        Returns:
+            Tuple: (status code or None, seconds to wait or None)
+        """
+        response = getattr(ex, 'response', None)
+        if response is None:
+            return None, None
+        return getattr(response, 'status_code', None), self._get_retry_after(response)
+
+    def _get_retry_after(self, response):
+        """Gets the seconds to wait from a response's Retry-After header (seconds or an HTTP date).
+
+        Args:
+            response: The requests.Response.
+
+        Returns:
+            Float or None.
+        """
+        headers = getattr(response, 'headers', None) or {}
+        retry_after = headers.get('Retry-After')
+        if retry_after is None:
+            return None
+
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+
+        date = email.utils.parsedate_tz(retry_after)
+        if date is None:
+            return None
+        return max(0.0, email.utils.mktime_tz(date) - time.time())
@@ -0,0 +1,206 @@
+import os
+import re
+from collections import deque
+from pathlib import PurePath
+
+
+class DataIgnoreMatcher(object):
+    """Matches paths against a list of data ignore patterns.
+
+    The patterns follow .gitignore semantics:
+        - A pattern without a slash (e.g., "*.lnk") matches the name of a file or directory at any depth.
+        - A pattern with a slash (e.g., "raw/*.tmp") matches the path relative to the root directory.
+        - A pattern with a trailing slash (e.g., "$RECYCLE.BIN/") only matches directories.
+        - "**" matches any number of directories.
+        - An absolute path (optionally with wildcards) matches the absolute path.
+
+    All the patterns are compiled into a single regular expression for each kind of pattern
+    so a path is checked in a few regex matches no matter how many patterns there are.
+    """
+
+    def __init__(self, patterns):
+        """Instantiates a new instance.
+
+        Args:
+            patterns: List of glob patterns.
+        """
+        self._patterns = list(patterns)
+        self._flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+
+        # Regex sources keyed by (kind, dirs_only). Kind is one of: 'name', 'rel', 'abs'.
+        sources = {}
+
+        for pattern in self._patterns:
+            if not pattern or not pattern.strip():
+                continue
+
+            is_abs = os.path.isabs(pattern)
+            pattern = PurePath(pattern).as_posix() + ('/' if pattern.endswith(('/', os.sep)) else '')
+
+            dirs_only = pattern.endswith('/') and pattern != '/'
+            pattern = pattern.rstrip('/')
+
+            if is_abs:
+                kind = 'abs'
+            elif '/' in pattern:
+                kind = 'rel'
+                pattern = pattern.lstrip('/')
+            else:
+                kind = 'name'
+
+            sources.setdefault((kind, dirs_only), []).append(self._translate(pattern))
+
+        self._regexes = {}
+        for key, regex_sources in sources.items():
+            self._regexes[key] = re.compile('(?:{0})\\Z'.format('|'.join(regex_sources)), self._flags)
+
+    @property
+    def patterns(self):
+        return self._patterns
+
+    def matches(self, abs_path, rel_path, is_dir):
+        """Gets if a path matches any of the patterns.
+
+        Args:
+            abs_path: The absolute path.
+            rel_path: The path relative to the root directory the patterns apply to.
+            is_dir: Whether or not the path is a directory.
+
+        Returns:
+            True or False
+        """
+        for (kind, dirs_only), regex in self._regexes.items():
+            if dirs_only and not is_dir:
+                continue
+
+            if kind == 'name':
+                value = os.path.basename(abs_path)
+            elif kind == 'rel':
+                value = rel_path
+            else:
+                value = abs_path
+
+            if os.sep != '/':
+                value = value.replace(os.sep, '/')
+
+            if regex.match(value):
+                return True
+
+        return False
+
+    def walk(self, root_path, list_dir=None):
+        """Walks a directory breadth first and yields the entries that are not ignored.
+
+        Ignored directories are not descended into.
+
+        Args:
+            root_path: The directory to walk. Relative paths are matched relative to this directory.
+            list_dir: Optional function that gets the (name, is_dir) entries in a directory.
+                Defaults to reading the directory with os.scandir.
+
+        Returns:
+            Generator of tuples: (absolute path, is_dir).
+        """
+        list_dir = list_dir or self._list_dir
+        paths = deque([(root_path, '')])
+
+        while paths:
+            path, rel_path = paths.popleft()
+
+            dirs = []
+            files = []
+            for name, is_dir in list_dir(path):
+                entry_path = os.path.join(path, name)
+                entry_rel_path = rel_path + name
+
+                if self.matches(entry_path, entry_rel_path, is_dir):
+                    continue
+
+                (dirs if is_dir else files).append((name, entry_path, entry_rel_path))
+
+            dirs.sort()
+            files.sort()
+
+            for _, entry_path, entry_rel_path in dirs:
+                paths.append((entry_path, entry_rel_path + '/'))
+
+            for _, entry_path, _ in dirs:
+                yield entry_path, True
+
+            for _, entry_path, _ in files:
+                yield entry_path, False
+
+    @staticmethod
+    def _list_dir(path):
+        return [(entry.name, entry.is_dir(follow_symlinks=False)) for entry in os.scandir(path)]
+
+    @staticmethod
+    def _translate(pattern):
+        """Translates a glob pattern into a regular expression.
+
+        Args:
+            pattern: The glob pattern with "/" separators.
+
+        Returns:
+            String
+        """
+        parts = []
+        segments = pattern.split('/')
+
+        for index, segment in enumerate(segments):
+            is_last = index == len(segments) - 1
+
+            if segment == '**':
+                # Any number of directories (including none).
+                parts.append('.*' if is_last else '(?:.*/)?')
+                continue
+
+            parts.append(DataIgnoreMatcher._translate_segment(segment))
+            if not is_last:
+                parts.append('/')
+
+        return ''.join(parts)
+
+    @staticmethod
+    def _translate_segment(segment):
+        """Translates a glob pattern for a single path segment into a regular expression.
+
+        Args:
+            segment: The glob pattern without any separators.
+
+        Returns:
+            String
+        """
+        parts = []
+        i = 0
+        n = len(segment)
+
+        while i < n:
+            c = segment[i]
+            i += 1
+
+            if c == '*':
+                parts.append('[^/]*')
+            elif c == '?':
+                parts.append('[^/]')
+            elif c == '[':
+                start = i
+                if start < n and segment[start] in '!^':
+                    start += 1
+                if start < n and segment[start] == ']':
+                    # A "]" at the start of the set is part of the set.
+                    start += 1
+                end = segment.find(']', start)
+
+                if end == -1:
+                    parts.append('\\[')
+                else:
+                    chars = segment[i:end].replace('\\', '\\\\').replace('[', '\\[')
+                    if chars[0] in '!^':
+                        chars = '^' + chars[1:]
+                    parts.append('[{0}]'.format(chars))
+                    i = end + 1
+            else:
+                parts.append(re.escape(c))
+
+        return ''.join(parts)
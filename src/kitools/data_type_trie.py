@@ -0,0 +1,94 @@
+import os
+
+
+class DataTypeTrie(object):
+    """Finds the DataType for a path by the longest matching DataType directory.
+
+    The DataType directories are stored in a trie on their path components, so a lookup only
+    walks the components of the path and "data/core2" does not match a DataType at "data/core".
+    """
+
+    def __init__(self, data_types):
+        """Instantiates a new instance.
+
+        Args:
+            data_types: List of DataTypes.
+        """
+        self._data_types = list(data_types)
+        # Each node is a list: [DataType or None, dict of child path component to node].
+        self._root = [None, {}]
+
+        for data_type in self._data_types:
+            node = self._root
+            for part in self._split(data_type.abs_path):
+                node = node[1].setdefault(part, [None, {}])
+            node[0] = data_type
+
+    @property
+    def data_types(self):
+        return self._data_types
+
+    def find(self, abs_path):
+        """Finds the DataType for an absolute path.
+
+        Args:
+            abs_path: The absolute path.
+
+        Returns:
+            The DataType or None.
+        """
+        return self._walk(self._root, None, self._split(abs_path))[1]
+
+    def find_many(self, abs_paths):
+        """Finds the DataTypes for many absolute paths.
+
+        The directory of each path is only walked once.
+
+        Args:
+            abs_paths: Iterable of absolute paths.
+
+        Returns:
+            List of DataTypes (or None) in the same order as the paths.
+        """
+        results = []
+        # The (node, DataType) for each directory that has been walked.
+        walked_dirs = {}
+
+        for abs_path in abs_paths:
+            dir_path, name = os.path.split(abs_path)
+
+            walked = walked_dirs.get(dir_path)
+            if walked is None:
+                walked = walked_dirs[dir_path] = self._walk(self._root, None, self._split(dir_path))
+
+            node, data_type = walked
+            if name:
+                node, data_type = self._walk(node, data_type, [os.path.normcase(name)])
+            results.append(data_type)
+
+        return results
+
+    @staticmethod
+    def _walk(node, data_type, parts):
+        """Walks the trie down the path components.
+
+        Args:
+            node: The node to start from (or None if the path has left the trie).
+            data_type: The DataType found so far.
+            parts: The path components to walk.
+
+        Returns:
+            Tuple: (last node or None, DataType or None)
+        """
+        for part in parts:
+            if node is None:
+                break
+            node = node[1].get(part)
+            if node is not None and node[0] is not None:
+                data_type = node[0]
+        return node, data_type
+
+    @staticmethod
+    def _split(abs_path):
+        # Not PurePath(abs_path).parts, pathlib interns each part so every unique file name would stay in memory.
+        return [part for part in os.path.normcase(abs_path).split(os.sep) if part]
@@ -13,3 +13,48 @@ class Env:
             String
         """
         return os.environ.get('SYNAPSE_CONFIG_PATH', synapseclient.client.CONFIG_FILE)
+
+    @staticmethod
+    def KITOOLS_OFFLINE():
+        """Gets if KiProjects should be opened in offline mode.
+
+        Set KITOOLS_OFFLINE to 1, true or yes to enable offline mode.
+
+        Returns:
+            True or False
+        """
+        return os.environ.get('KITOOLS_OFFLINE', '').strip().lower() in ('1', 'true', 'yes')
+
+    @staticmethod
+    def KITOOLS_SEGMENTED_DOWNLOAD_THRESHOLD():
+        """Gets the size (in bytes) from which files are downloaded in concurrent segments (byte ranges).
+
+        Set KITOOLS_SEGMENTED_DOWNLOAD_THRESHOLD to 0 to never download files in segments. Defaults to 1 GiB.
+
+        Returns:
+            Integer
+        """
+        return Env._get_int('KITOOLS_SEGMENTED_DOWNLOAD_THRESHOLD', 1024 * 1024 * 1024)
+
+    @staticmethod
+    def KITOOLS_DOWNLOAD_SEGMENTS():
+        """Gets the number of segments to download a large file in (and how many are downloaded at a time).
+
+        Defaults to 8.
+
+        Returns:
+            Integer
+        """
+        return max(1, Env._get_int('KITOOLS_DOWNLOAD_SEGMENTS', 8))
+
+    @staticmethod
+    def _get_int(name, default):
+        value = os.environ.get(name, '').strip()
+        if not value:
+            return default
+
+        try:
+            return int(value)
+        except ValueError:
+            print('WARNING: Ignoring invalid {0}: {1}'.format(name, value))
+            return default
@@ -41,3 +41,8 @@ class InvalidDataUriError(ValueError):
 class KiProjectResourceNotFoundError(ValueError):
     """Raised when a KiProjectResource cannot be found."""
     pass
+
+
+class OfflineModeError(Exception):
+    """Raised when an operation needs the network while the KiProject is in offline mode."""
+    pass
@@ -1,14 +1,26 @@
 import os
 import json
-import glob
-from collections import deque
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from beautifultable import BeautifulTable
 from .ki_project_resource import KiProjectResource
+from .ki_project_resource_list import KiProjectResourceList
+from .ki_project_scan_cache import KiProjectScanCache
+from .ki_project_pull_index import KiProjectPullIndex
+from .ki_project_metadata_cache import KiProjectMetadataCache
+from .ki_project_transfer_journal import KiProjectTransferJournal
+from .manifests import JsonManifest, SqliteManifest
 from .data_type import DataType
+from .data_type_trie import DataTypeTrie
 from .data_type_template import DataTypeTemplate
 from .data_uri import DataUri
+from .data_adapters.segmented_download import SegmentedDownload
+from .data_ignore_matcher import DataIgnoreMatcher
 from .sys_path import SysPath
 from .utils import Utils
+from .env import Env
 from .exceptions import NotADataTypePathError, DataTypeMismatchError, KiProjectResourceNotFoundError, \
     InvalidDataTypeError
 
@@ -16,7 +28,23 @@ from .exceptions import NotADataTypePathError, DataTypeMismatchError, KiProjectR
 class KiProject(object):
     """Primary class for interacting with KI Projects."""
 
-    CONFIG_FILENAME = 'kiproject.json'
+    CONFIG_FILENAME = JsonManifest.FILENAME
+
+    MANIFESTS = {
+        JsonManifest.NAME: JsonManifest,
+        SqliteManifest.NAME: SqliteManifest
+    }
+
+    # How often (in seconds) to save the KiProject while data_pull/data_push are batching changes.
+    BATCH_SAVE_INTERVAL = 60
+
+    # The default number of threads adata_pull and adata_push run requests and transfers in.
+    ASYNC_MAX_WORKERS = 32
+
+    SCAN_FULL = 'full'
+    SCAN_INCREMENTAL = 'incremental'
+    SCAN_OFF = 'off'
+    SCAN_MODES = (SCAN_FULL, SCAN_INCREMENTAL, SCAN_OFF)
 
     DEFAULT_LINUX_DATA_IGNORES = frozenset([
         '*~',
@@ -53,9 +81,16 @@ class KiProject(object):
         '*.lnk'
     ])
 
+    # The partial files of segmented downloads.
+    DEFAULT_KITOOLS_DATA_IGNORES = frozenset([
+        '*' + SegmentedDownload.PART_SUFFIX,
+        '*' + SegmentedDownload.STATE_SUFFIX
+    ])
+
     DEFAULT_DATA_IGNORES = frozenset.union(DEFAULT_LINUX_DATA_IGNORES,
                                            DEFAULT_OSX_DATA_IGNORES,
-                                           DEFAULT_WINDOWS_DATA_IGNORES)
+                                           DEFAULT_WINDOWS_DATA_IGNORES,
+                                           DEFAULT_KITOOLS_DATA_IGNORES)
 
     def __init__(self, local_path, **kwargs):
         """Instantiates the KiProject.
@@ -73,6 +108,22 @@ class KiProject(object):
                 If this is set a new remote project will be created with this name.
             data_type_template: The name of the DataTypeTemplate to create the project with.
             no_prompt: Suppress all prompts during KiProject initialization.
+            journal: Record resource changes in an append-only journal next to the config file instead of
+                rewriting the config file on every save. The journal is compacted into the config file
+                periodically and with compact().
+            manifest: The name of the manifest to store the KiProject in. Must be one of: 'json', 'sqlite'.
+                Defaults to the existing manifest or 'json' for new KiProjects.
+                An existing KiProject is converted if a different manifest is specified.
+            scan: How to scan the data directories for resources that have not been added to the KiProject.
+                Must be one of: 'full', 'incremental', 'off'. Defaults to 'incremental'.
+                'incremental' skips reading directories that have not changed since the last scan.
+                'full' reads every directory. 'off' does not scan when the KiProject is opened.
+            metadata_ttl: The number of seconds the cached metadata of remote entities is used before it is
+                revalidated. Defaults to 60. Set to 0 to revalidate the metadata every time it is used.
+                Changes made to remote entities by others may not be seen until their metadata is revalidated.
+            offline: Open the KiProject without connecting to the remote project. Remote metadata is only read
+                from the metadata cache and pushing, or pulling anything that is not current, raises an
+                OfflineModeError. Defaults to the KITOOLS_OFFLINE environment variable.
         """
         if not local_path or local_path.strip() == '':
             raise ValueError('local_path is required.')
@@ -83,23 +134,57 @@ class KiProject(object):
         self.project_uri = None
         self.project_name = None
         self.data_types = []
-        self.resources = []
+        self.offline = kwargs.get('offline')
+        if self.offline is None:
+            self.offline = Env.KITOOLS_OFFLINE()
+        self._data_type_trie = None
+        self._resources = KiProjectResourceList()
 
         self._data_ignores = list(self.DEFAULT_DATA_IGNORES)
+        self._data_ignore_matcher = None
 
         self._config_path = os.path.join(self.local_path, self.CONFIG_FILENAME)
 
         self._loaded = False
 
+        self._batch_depth = 0
+        self._batch_flush_every = None
+        self._batch_flush_interval = None
+        self._batch_changes = 0
+        self._batch_last_save = None
+        # Data adapters shared by the operations in a batch() block, by scheme.
+        self._batch_data_adapters = {}
+
+        self._scan = kwargs.get('scan') or self.SCAN_INCREMENTAL
+        if self._scan not in self.SCAN_MODES:
+            raise ValueError('scan must be one of: {0}'.format(', '.join(self.SCAN_MODES)))
+        self._scan_cache = KiProjectScanCache(self.local_path)
+        # The remote files that were last pulled or pushed, so unchanged files are not downloaded again.
+        self._pull_index = KiProjectPullIndex(self.local_path)
+        # The transfers of the last data_pull or data_push, so an interrupted operation can resume.
+        self._transfer_journal = KiProjectTransferJournal(self.local_path)
+        # The metadata of remote entities, so entities looked at recently are not fetched again.
+        self._metadata_cache = KiProjectMetadataCache(self.local_path,
+                                                      ttl=kwargs.get('metadata_ttl'),
+                                                      offline=self.offline)
+
+        self._use_journal = kwargs.get('journal', False)
+        self._manifest_name = kwargs.get('manifest')
+        if self._manifest_name and self._manifest_name not in self.MANIFESTS:
+            raise ValueError('manifest must be one of: {0}'.format(', '.join(self.MANIFESTS.keys())))
+        self._manifest = self._find_manifest() or self._new_manifest(self._manifest_name)
+
         if self.load():
             self._ensure_project_structure()
             self._loaded = True
-            self.show_missing_resources()
+            if self._scan != self.SCAN_OFF:
+                self.show_missing_resources()
             print('KiProject successfully loaded and ready to use.')
         else:
             if self._init_project(**kwargs):
                 self._loaded = True
-                self.show_missing_resources()
+                if self._scan != self.SCAN_OFF:
+                    self.show_missing_resources()
                 print('KiProject initialized successfully and ready to use.')
             else:
                 print('KiProject initialization failed.')
@@ -129,20 +214,21 @@ class KiProject(object):
         """
         self._ensure_loaded()
 
-        if DataUri.is_uri(remote_uri_or_local_path):
-            return self._data_add(data_type=data_type,
-                                  remote_uri=remote_uri_or_local_path,
-                                  name=(name or remote_uri_or_local_path),
-                                  version=version)
-        else:
-            sys_local_path = SysPath(remote_uri_or_local_path, cwd=self.local_path)
-            if sys_local_path.exists:
+        with self.batch():
+            if DataUri.is_uri(remote_uri_or_local_path):
                 return self._data_add(data_type=data_type,
-                                      local_path=sys_local_path.abs_path,
-                                      name=(name or sys_local_path.basename),
+                                      remote_uri=remote_uri_or_local_path,
+                                      name=(name or remote_uri_or_local_path),
                                       version=version)
             else:
-                raise ValueError('Please specify a remote URI or a local file or folder path that exists.')
+                sys_local_path = SysPath(remote_uri_or_local_path, cwd=self.local_path)
+                if sys_local_path.exists:
+                    return self._data_add(data_type=data_type,
+                                          local_path=sys_local_path.abs_path,
+                                          name=(name or sys_local_path.basename),
+                                          version=version)
+                else:
+                    raise ValueError('Please specify a remote URI or a local file or folder path that exists.')
 
     def data_remove(self, resource_or_identifier):
         """Removes a resource from the KiProject.
@@ -192,73 +278,253 @@ class KiProject(object):
         self.save()
         return project_resource
 
-    def data_pull(self, resource_or_identifier=None):
+    def data_pull(self, resource_or_identifier=None, max_workers=None):
         """Downloads a specific resource or all resources in the KiProject.
 
         Args:
             resource_or_identifier: KiProjectResource object or a valid identifier (local path, remote URI, name).
+            max_workers: The number of threads to download the children of a folder with.
+                Set to None to use the data adapter's default or 1 to download one file at a time.
 
         Returns:
             The absolute path to the pulled resource or a list of absolute paths for all pulled resources.
         """
         self._ensure_loaded()
+        self._resume_transfers()
+
+        with self.batch(flush_interval=self.BATCH_SAVE_INTERVAL):
+            if resource_or_identifier:
+                project_resource = self._find_project_resource_by_value(resource_or_identifier)
+
+                if project_resource.remote_uri is None:
+                    print('Resource cannot be pulled until it has been pushed:{0}{1}'.format(os.linesep,
+                                                                                      project_resource))
+                    return None
+
+                data_uri = DataUri.parse(project_resource.remote_uri)
+                try:
+                    self._get_data_adapter(data_uri).data_pull(project_resource, max_workers=max_workers)
+                finally:
+                    self._save_transfer_state()
+                return project_resource
+            else:
+                results = []
+                # The resources for each data adapter so each adapter can pull its resources together.
+                adapter_resources = OrderedDict()
+
+                # Only pull the root resources. The root resource will handle pulling the child.
+                for project_resource in self.find_project_resources_by(root_id=None):
+                    if project_resource.remote_uri is None:
+                        print('Resource cannot be pulled until it has been pushed:{0}{1}'.format(os.linesep,
+                                                                                          project_resource))
+                        results.append(None)
+                        continue
 
-        if resource_or_identifier:
-            project_resource = self._find_project_resource_by_value(resource_or_identifier)
-
-            if project_resource.remote_uri is None:
-                print('Resource cannot be pulled until it has been pushed:{0}{1}'.format(os.linesep, project_resource))
-                return None
-
-            data_uri = DataUri.parse(project_resource.remote_uri)
-            data_uri.data_adapter().data_pull(project_resource)
-            return project_resource
-        else:
-            results = []
-            for project_resource in self.resources:
-                # Skip any non-root resources. The root resource will handle pulling the child.
-                if project_resource.root_id:
-                    continue
+                    data_adapter = self._get_data_adapter(DataUri.parse(project_resource.remote_uri))
+                    adapter_resources.setdefault(data_adapter, []).append(project_resource)
+                    results.append(project_resource)
 
-                results.append(self.data_pull(project_resource))
-            return results
+                try:
+                    for data_adapter, project_resources in adapter_resources.items():
+                        data_adapter.data_pull_many(project_resources, max_workers=max_workers)
+                finally:
+                    self._save_transfer_state()
+                return results
 
-    def data_push(self, resource_or_identifier=None):
+    def data_push(self, resource_or_identifier=None, max_workers=None):
         """Uploads a specific resource or all local non-pushed resources.
 
         Args:
             resource_or_identifier: KiProjectResource object or a valid identifier (local path, remote URI, name).
+            max_workers: The number of threads to upload the children of a folder with.
+                Set to None to use the data adapter's default or 1 to upload one file at a time.
 
         Returns:
             The absolute path to the pushed resource or a list of absolute paths for all pushed resources.
         """
         self._ensure_loaded()
+        self._resume_transfers()
+
+        with self.batch(flush_interval=self.BATCH_SAVE_INTERVAL):
+            if resource_or_identifier:
+                project_resource = self._find_project_resource_by_value(resource_or_identifier)
+
+                if project_resource.abs_path is None:
+                    print('Source cannot be pushed until it has been pulled:{0}{1}'.format(os.linesep,
+                                                                                    project_resource))
+                    return None
+
+                data_uri = DataUri.parse(project_resource.remote_uri or self.project_uri)
+                try:
+                    self._get_data_adapter(data_uri).data_push(project_resource, max_workers=max_workers)
+                finally:
+                    self._save_transfer_state()
+                return project_resource
+            else:
+                print('Pushing all resources that have not been pushed.')
+                results = []
+                # The resources for each data adapter so each adapter can push its resources together.
+                adapter_resources = OrderedDict()
+
+                for project_resource in self.find_project_resources_by(remote_uri=None):
+                    # Only push resources that have not been pushed yet.
+                    if project_resource.remote_uri:
+                        continue
+
+                    # Skip any non-root resources unless the root resource has already been pushed.
+                    # The root resource will handle pushing the child.
+                    if project_resource.root_id and project_resource.root_resource.remote_uri is None:
+                        continue
 
-        if resource_or_identifier:
-            project_resource = self._find_project_resource_by_value(resource_or_identifier)
+                    if project_resource.abs_path is None:
+                        print('Source cannot be pushed until it has been pulled:{0}{1}'.format(os.linesep,
+                                                                                        project_resource))
+                        results.append(None)
+                        continue
 
-            if project_resource.abs_path is None:
-                print('Source cannot be pushed until it has been pulled:{0}{1}'.format(os.linesep, project_resource))
-                return None
+                    data_adapter = self._get_data_adapter(DataUri.parse(self.project_uri))
+                    adapter_resources.setdefault(data_adapter, []).append(project_resource)
+                    results.append(project_resource)
 
-            data_uri = DataUri.parse(project_resource.remote_uri or self.project_uri)
-            data_uri.data_adapter().data_push(project_resource)
-            return project_resource
-        else:
-            print('Pushing all resources that have not been pushed.')
-            results = []
-            for project_resource in self.resources:
-                # Only push resources that have not been pushed yet.
-                if project_resource.remote_uri:
-                    continue
+                try:
+                    for data_adapter, project_resources in adapter_resources.items():
+                        data_adapter.data_push_many(project_resources, max_workers=max_workers)
+                finally:
+                    self._save_transfer_state()
+                return results
+
+    async def adata_pull(self, resource_or_identifier=None, max_workers=None):
+        """Coroutine version of data_pull.
+
+        The resources (and the files in their folders) are pulled concurrently on the running event loop.
+        Requests and downloads run in a pool of threads, the KiProject is only changed on the event loop's thread.
+
+        Examples:
+            >>> import asyncio
+            >>> import kitools
+            >>> kiproject = kitools.KiProject('/tmp/my_project')
+            >>> asyncio.get_event_loop().run_until_complete(kiproject.adata_pull())
+
+        Args:
+            resource_or_identifier: KiProjectResource object or a valid identifier (local path, remote URI, name).
+            max_workers: The number of threads to run requests and downloads in. Set to None to use ASYNC_MAX_WORKERS.
+
+        Returns:
+            The pulled resource or a list of all the pulled resources.
+        """
+        self._ensure_loaded()
+        self._resume_transfers()
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.ASYNC_MAX_WORKERS) as executor, \
+                self.batch(flush_interval=self.BATCH_SAVE_INTERVAL):
+            try:
+                if resource_or_identifier:
+                    project_resource = self._find_project_resource_by_value(resource_or_identifier)
+                    return await self._adata_pull(project_resource, max_workers, executor)
+                else:
+                    # Only pull the root resources. The root resource will handle pulling the child.
+                    return await Utils.await_all(self._adata_pull(project_resource, max_workers, executor)
+                                                 for project_resource in self.find_project_resources_by(root_id=None))
+            finally:
+                self._save_transfer_state()
+
+    async def _adata_pull(self, project_resource, max_workers, executor):
+        if project_resource.remote_uri is None:
+            print('Resource cannot be pulled until it has been pushed:{0}{1}'.format(os.linesep, project_resource))
+            return None
 
-                # Skip any non-root resources unless the root resource has already been pushed.
-                # The root resource will handle pushing the child.
-                if project_resource.root_id and project_resource.root_resource.remote_uri is None:
-                    continue
+        data_uri = DataUri.parse(project_resource.remote_uri)
+        await self._get_data_adapter(data_uri).adata_pull(project_resource, max_workers=max_workers, executor=executor)
+        return project_resource
+
+    async def adata_push(self, resource_or_identifier=None, max_workers=None):
+        """Coroutine version of data_push.
+
+        The resources (and the files in their folders) are pushed concurrently on the running event loop.
+        Requests, hashing and uploads run in a pool of threads, the KiProject is only changed on the event loop's
+        thread.
+
+        Examples:
+            >>> import asyncio
+            >>> import kitools
+            >>> kiproject = kitools.KiProject('/tmp/my_project')
+            >>> asyncio.get_event_loop().run_until_complete(kiproject.adata_push())
+
+        Args:
+            resource_or_identifier: KiProjectResource object or a valid identifier (local path, remote URI, name).
+            max_workers: The number of threads to run requests and uploads in. Set to None to use ASYNC_MAX_WORKERS.
+
+        Returns:
+            The pushed resource or a list of all the pushed resources.
+        """
+        self._ensure_loaded()
+        self._resume_transfers()
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.ASYNC_MAX_WORKERS) as executor, \
+                self.batch(flush_interval=self.BATCH_SAVE_INTERVAL):
+            try:
+                if resource_or_identifier:
+                    project_resource = self._find_project_resource_by_value(resource_or_identifier)
+                    return await self._adata_push(project_resource, executor)
+                else:
+                    print('Pushing all resources that have not been pushed.')
+                    project_resources = []
+                    for project_resource in self.find_project_resources_by(remote_uri=None):
+                        # Only push resources that have not been pushed yet.
+                        if project_resource.remote_uri:
+                            continue
+
+                        # Skip any non-root resources unless the root resource has already been pushed.
+                        # The root resource will handle pushing the child.
+                        if project_resource.root_id and project_resource.root_resource.remote_uri is None:
+                            continue
+
+                        project_resources.append(project_resource)
+
+                    return await Utils.await_all(self._adata_push(project_resource, executor)
+                                                 for project_resource in project_resources)
+            finally:
+                self._save_transfer_state()
+
+    async def _adata_push(self, project_resource, executor):
+        if project_resource.abs_path is None:
+            print('Source cannot be pushed until it has been pulled:{0}{1}'.format(os.linesep, project_resource))
+            return None
+
+        data_uri = DataUri.parse(project_resource.remote_uri or self.project_uri)
+        await self._get_data_adapter(data_uri).adata_push(project_resource, executor=executor)
+        return project_resource
 
-                results.append(self.data_push(project_resource))
-            return results
+    def _resume_transfers(self):
+        """Adds the files that an interrupted data_pull or data_push transferred to the pull index so they are
+        not transferred again.
+
+        Returns:
+            None
+        """
+        for abs_path, entry in self._transfer_journal.completed():
+            self._pull_index.record(abs_path,
+                                    entry['id'],
+                                    entry['version'],
+                                    entry['md5'],
+                                    entry['size'],
+                                    signed=(entry['local'], entry['signed']))
+
+        pending_count = self._transfer_journal.pending_count
+        if pending_count:
+            print('Resuming {0} interrupted transfer(s).'.format(pending_count))
+
+    def _save_transfer_state(self):
+        """Saves the pull index and metadata cache after a data_pull or data_push.
+
+        The transfers that were done are dropped from the transfer journal once they are in the saved pull index.
+
+        Returns:
+            None
+        """
+        if self._pull_index.save():
+            self._transfer_journal.compact()
+        self._metadata_cache.save()
 
     def data_list(self, all=False):
         """Prints out a table of all the resources in the KiProject.
@@ -336,6 +602,15 @@ class KiProject(object):
 
         print(table)
 
+    @property
+    def resources(self):
+        """Gets the KiProjectResources in the KiProject."""
+        return self._resources
+
+    @resources.setter
+    def resources(self, value):
+        self._resources = value if isinstance(value, KiProjectResourceList) else KiProjectResourceList(value)
+
     @property
     def data_ignores(self):
         """Ges the ignored data patterns."""
@@ -344,6 +619,8 @@ class KiProject(object):
     def add_data_ignore(self, pattern):
         """Add a glob pattern to ignore data files.
 
+        Patterns follow .gitignore semantics (see: DataIgnoreMatcher). Ignored directories are not searched.
+
         Args:
             pattern: A glob pattern to match files to be ignored.
 
@@ -384,29 +661,26 @@ class KiProject(object):
     def find_missing_resources(self):
         """Finds all local DataType directories and files that have not been added to the KiProject resources.
 
+        Unless the KiProject was opened with scan='full', directories that have not changed since the last scan
+        are not read again (see: KiProjectScanCache).
+
         Returns:
             List of paths
         """
         missing = []
 
-        paths = deque(self._root_data_paths())
-
-        ignored_paths = self._get_data_ignored_paths()
-
-        while paths:
-            path = paths.popleft()
-            dirs, files = Utils.get_dirs_and_files(path)
+        matcher = self._get_data_ignore_matcher()
 
-            for entry in (dirs + files):
-                if entry.path in ignored_paths:
-                    continue
+        if self._scan == self.SCAN_FULL:
+            self._scan_cache.clear()
 
-                resources = self.find_project_resources_by(abs_path=entry.path)
+        for root_path in self._root_data_paths():
+            for path, _ in matcher.walk(root_path, list_dir=self._scan_cache.list_dir):
+                resources = self.find_project_resources_by(abs_path=path)
                 if not resources:
-                    missing.append(entry.path)
+                    missing.append(path)
 
-                if entry.is_dir():
-                    paths.append(entry.path)
+        self._scan_cache.save()
 
         return missing
 
@@ -442,33 +716,14 @@ class KiProject(object):
         Raises:
             ValueError: Raised on invalid 'operator' or invalid KiProjectResources property.
         """
-        results = []
-
         if operator not in ['and', 'or']:
             raise ValueError('operator must be one of: "and", "or". ')
 
-        for resource in self.resources:
-            matches = []
-
-            for attribute, attribute_value in kwargs.items():
-                if not hasattr(resource, attribute):
-                    raise ValueError('{0} does not have attribute: {1}'.format(type(resource), attribute))
+        for attribute in kwargs.keys():
+            if not hasattr(KiProjectResource, attribute):
+                raise ValueError('{0} does not have attribute: {1}'.format(KiProjectResource, attribute))
 
-                resource_value = getattr(resource, attribute)
-
-                if resource_value == attribute_value:
-                    matches.append(attribute)
-                elif isinstance(resource_value, DataType) and isinstance(attribute_value, str):
-                    # Handle searching by DataType Name.
-                    if resource_value.name == attribute_value:
-                        matches.append(attribute)
-
-            if operator == 'and' and len(matches) == len(kwargs):
-                results.append(resource)
-            elif operator == 'or' and len(matches) > 0:
-                results.append(resource)
-
-        return results
+        return self.resources.find(operator=operator, **kwargs)
 
     def find_data_type(self, name_or_data_type, raise_on_missing=True):
         """Finds a DataType by it's name.
@@ -503,14 +758,32 @@ class KiProject(object):
         Returns:
             The DataType or None.
         """
-        sorted_data_types = sorted(self.data_types, reverse=True, key=lambda d: len(d.rel_path))
-        sys_path = SysPath(path, cwd=self.local_path, rel_start=self.local_path)
+        return self._get_data_type_trie().find(SysPath(path, cwd=self.local_path).abs_path)
 
-        for data_type in sorted_data_types:
-            if sys_path.rel_path.startswith(data_type.rel_path):
-                return data_type
+    def get_data_types_from_paths(self, paths):
+        """Gets the DataTypes for many paths.
 
-        return None
+        Args:
+            paths: Iterable of paths to get the DataTypes from.
+
+        Returns:
+            List of DataTypes (or None) in the same order as the paths.
+        """
+        return self._get_data_type_trie().find_many(SysPath(path, cwd=self.local_path).abs_path for path in paths)
+
+    def _get_data_type_trie(self):
+        """Gets the trie for finding DataTypes by path.
+
+        The trie is rebuilt when the data_types change.
+
+        Returns:
+            DataTypeTrie
+        """
+        trie = self._data_type_trie
+        if trie is None or len(trie.data_types) != len(self.data_types) or \
+                any(a is not b for a, b in zip(trie.data_types, self.data_types)):
+            trie = self._data_type_trie = DataTypeTrie(self.data_types)
+        return trie
 
     def is_data_type_path(self, local_path):
         """Gets if the local_path is in one of the DataType directories.
@@ -535,47 +808,200 @@ class KiProject(object):
         return False
 
     def load(self):
-        """Loads the KiProject from a config file.
+        """Loads the KiProject from its manifest.
+
+        Returns:
+            True if the manifest exists and was loaded.
+        """
+        if not self._manifest.exists:
+            return False
+
+        jconfig = self._manifest.load()
+        self.from_json(jconfig)
+
+        if 'resources' not in jconfig:
+            # Resources are loaded from the manifest as they are needed.
+            self.resources = KiProjectResourceList(
+                source=self._manifest,
+                materialize=lambda jresource: KiProjectResource.from_json(jresource, self))
+
+        self.resources.pop_changes()
+
+        if self._manifest_name and self._manifest_name != self._manifest.NAME:
+            self._convert_manifest(self._manifest_name)
+            # Reload so the resources are served by the new manifest.
+            return self.load()
+        elif self._manifest.needs_compact:
+            self.compact()
+
+        return True
+
+    @contextmanager
+    def batch(self, flush_every=None, flush_interval=None):
+        """Defers saving the KiProject until the end of the block.
+
+        Calls to save() within the block only mark the KiProject as changed.
+        The changes are written once when the outermost block exits, or sooner if
+        flush_every or flush_interval is reached. Blocks can be nested.
+
+        Examples:
+            >>> import kitools
+            >>> kiproject = kitools.KiProject('/tmp/my_project')
+            >>> with kiproject.batch():
+            >>>     kiproject.data_add('syn:syn123456')
+            >>>     kiproject.data_add('syn:syn123457')
+
+        Args:
+            flush_every: Save after this many changes.
+            flush_interval: Save when this many seconds have passed since the last save.
+
+        Returns:
+            None
+        """
+        is_outermost = self._batch_depth == 0
+
+        if is_outermost:
+            self._batch_changes = 0
+            self._batch_last_save = time.monotonic()
+            self._batch_flush_every = flush_every
+            self._batch_flush_interval = flush_interval
+
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if is_outermost:
+                if self._batch_changes > 0:
+                    self._save()
+                self._batch_flush_every = None
+                self._batch_flush_interval = None
+                self._batch_data_adapters = {}
+
+    def _get_data_adapter(self, data_uri):
+        """Gets the data adapter for a DataUri.
+
+        Within a batch() block the same adapter is returned for each scheme so anything it caches
+        (e.g., Synapse folders) is shared by the whole block.
+
+        Args:
+            data_uri: The DataUri to get the data adapter for.
 
         Returns:
-            True if the config file exists and was loaded.
+            Data adapter.
         """
-        loaded = False
-        if os.path.isfile(self._config_path):
-            with open(self._config_path) as f:
-                self.from_json(json.load(f))
-                loaded = True
+        if self._batch_depth == 0:
+            return data_uri.data_adapter()
 
-        return loaded
+        data_adapter = self._batch_data_adapters.get(data_uri.scheme)
+        if data_adapter is None:
+            data_adapter = self._batch_data_adapters[data_uri.scheme] = data_uri.data_adapter()
+        return data_adapter
 
     def save(self):
         """Saves the KiProject to a config file.
 
+        Manifests that save incrementally (journaling or SQLite) are saved immediately.
+        Otherwise, when called within a batch() block the save is deferred until the block exits.
+
+        Returns:
+            None
+        """
+        if self._batch_depth > 0 and not self._manifest.saves_incrementally:
+            self._batch_changes += 1
+
+            flush_every = self._batch_flush_every
+            flush_interval = self._batch_flush_interval
+
+            if (flush_every and self._batch_changes >= flush_every) or \
+                    (flush_interval and (time.monotonic() - self._batch_last_save) >= flush_interval):
+                self._save()
+        else:
+            self._save()
+
+    def compact(self):
+        """Writes the full KiProject to its manifest (and clears the journal if journaling).
+
         Returns:
             None
         """
-        # Sort the resources before saving.
-        self.resources.sort(
-            key=lambda r: r.rel_path or (r.data_type.name if r.data_type else None) or r.name or r.remote_uri or r.id)
+        self._manifest.compact(self)
+        self._batch_changes = 0
+        self._batch_last_save = time.monotonic()
+
+    def _save(self):
+        """Writes the KiProject changes to its manifest.
+
+        Returns:
+            None
+        """
+        self._manifest.save(self)
+        self._batch_changes = 0
+        self._batch_last_save = time.monotonic()
+
+    def _find_manifest(self):
+        """Finds the existing manifest for the KiProject.
+
+        Returns:
+            BaseManifest or None
+        """
+        for name in [SqliteManifest.NAME, JsonManifest.NAME]:
+            manifest = self._new_manifest(name)
+            if manifest.exists:
+                return manifest
+        return None
+
+    def _new_manifest(self, name):
+        """Creates a manifest for the KiProject.
+
+        Args:
+            name: The name of the manifest. Defaults to 'json'.
+
+        Returns:
+            BaseManifest
+        """
+        if name == SqliteManifest.NAME:
+            return SqliteManifest(self.local_path)
+        else:
+            return JsonManifest(self.local_path, journal=self._use_journal)
+
+    def _convert_manifest(self, name):
+        """Writes the KiProject to a different manifest and deletes the current manifest.
+
+        Args:
+            name: The name of the manifest to convert to.
 
-        with open(self._config_path, 'w') as f:
-            json.dump(self.to_json(), f, indent=2)
+        Returns:
+            None
+        """
+        old_manifest = self._manifest
+        self._manifest = self._new_manifest(name)
+        self.compact()
+        old_manifest.delete()
+        print('KiProject manifest converted from: {0} to: {1}'.format(old_manifest.NAME, self._manifest.NAME))
 
-    def to_json(self):
+    def to_json(self, include_resources=True):
         """Serializes the KiProject to JSON.
 
+        Args:
+            include_resources: Whether or not to serialize the resources.
+
         Returns:
             Hash
         """
-        return {
+        jconfig = {
             'title': self.title,
             'description': self.description,
             'project_uri': self.project_uri,
             'data_ignores': self.data_ignores,
-            'data_types': [item.to_json() for item in self.data_types],
-            'resources': [item.to_json() for item in self.resources]
+            'data_types': [item.to_json() for item in self.data_types]
         }
 
+        if include_resources:
+            jconfig['resources'] = self.resources.to_json()
+
+        return jconfig
+
     def from_json(self, json):
         """Deserializes JSON into the KiProject.
 
@@ -595,7 +1021,7 @@ class KiProject(object):
         for jdata_type in json.get('data_types'):
             self.data_types.append(DataType.from_json(jdata_type, self.local_path))
 
-        for jresource in json.get('resources'):
+        for jresource in json.get('resources', []):
             self.resources.append(KiProjectResource.from_json(jresource, self))
 
     def _ensure_loaded(self):
@@ -766,6 +1192,10 @@ class KiProject(object):
         Returns:
             True or False
         """
+        if self.offline:
+            print('A remote project cannot be created in offline mode.')
+            return False
+
         data_uri = DataUri(DataUri.default_scheme(), None)
 
         while not self.project_uri:
@@ -831,7 +1261,8 @@ class KiProject(object):
         remote_entity = None
         try:
             data_uri = DataUri.parse(project_uri)
-            remote_entity = data_uri.data_adapter().get_entity(data_uri.id)
+            remote_entity = data_uri.data_adapter().get_entity(data_uri.id, metadata_cache=self._metadata_cache)
+            self._metadata_cache.save()
         except Exception as ex:
             print('Invalid remote project URI: {0}'.format(ex))
 
@@ -1028,14 +1459,14 @@ class KiProject(object):
             paths.append(data_type.abs_path)
         return paths
 
-    def _get_data_ignored_paths(self):
-        """Gets the absolute paths of all files and directories to ignore.
+    def _get_data_ignore_matcher(self):
+        """Gets the matcher for the data_ignores patterns.
+
+        The matcher is cached until the patterns change.
 
         Returns:
-            List of absolute paths to ignore from the data directory.
+            DataIgnoreMatcher
         """
-        ignored = []
-        for pattern in self.data_ignores:
-            for data_type in self.data_types:
-                ignored += glob.glob(os.path.join(data_type.abs_path, '**', pattern), recursive=True)
-        return ignored
+        if self._data_ignore_matcher is None or self._data_ignore_matcher.patterns != self.data_ignores:
+            self._data_ignore_matcher = DataIgnoreMatcher(self.data_ignores)
+        return self._data_ignore_matcher
@@ -0,0 +1,137 @@
+import os
+import json
+from collections import OrderedDict
+from .utils import Utils
+
+
+class KiProjectJournal(object):
+    """Append-only log of KiProjectResource changes stored next to the KiProject's config file.
+
+    Each line is a JSON object with an "op" ('add', 'update', 'remove') and the serialized "resource".
+    The journal is replayed on top of the config file when the KiProject is loaded and folded
+    back into the config file (compacted) by the KiProject.
+    """
+
+    FILENAME = 'kiproject.journal'
+
+    def __init__(self, local_path):
+        """Instantiates a new instance.
+
+        Args:
+            local_path: The local path of the KiProject.
+        """
+        self._path = os.path.join(local_path, self.FILENAME)
+        self._entry_count = None
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def exists(self):
+        return os.path.isfile(self._path)
+
+    @property
+    def size(self):
+        """Gets the size of the journal file in bytes.
+
+        Returns:
+            Integer
+        """
+        return os.path.getsize(self._path) if self.exists else 0
+
+    @property
+    def entry_count(self):
+        """Gets the number of entries in the journal.
+
+        Returns:
+            Integer
+        """
+        if self._entry_count is None:
+            self._entry_count = len(self.read())
+        return self._entry_count
+
+    def append(self, changes):
+        """Appends changes to the journal.
+
+        Args:
+            changes: List of tuples: (operation, KiProjectResource).
+
+        Returns:
+            None
+        """
+        if not changes:
+            return
+
+        entry_count = self.entry_count
+
+        lines = []
+        for operation, resource in changes:
+            lines.append(json.dumps({'op': operation, 'resource': resource.to_json()}))
+
+        Utils.append_lines(self._path, lines, sync=True)
+
+        self._entry_count = entry_count + len(lines)
+
+    def read(self):
+        """Reads all the entries in the journal.
+
+        A partially written line (e.g., from a crash during a write) is skipped. Entries appended after it
+        start on a new line (see Utils.append_lines).
+
+        Returns:
+            List of journal entries.
+        """
+        entries = []
+
+        if self.exists:
+            with open(self._path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        print('WARNING: Skipping invalid journal entry in: {0}'.format(self._path))
+
+        self._entry_count = len(entries)
+        return entries
+
+    def replay(self, jresources):
+        """Applies the journal entries to a list of serialized KiProjectResources.
+
+        Args:
+            jresources: List of serialized KiProjectResources (from the config file).
+
+        Returns:
+            List of serialized KiProjectResources with the journal applied.
+        """
+        entries = self.read()
+        if not entries:
+            return jresources
+
+        by_id = OrderedDict()
+        for jresource in jresources:
+            by_id[jresource.get('id')] = jresource
+
+        for entry in entries:
+            jresource = entry.get('resource') or {}
+            resource_id = jresource.get('id')
+
+            if entry.get('op') == 'remove':
+                by_id.pop(resource_id, None)
+            else:
+                by_id[resource_id] = jresource
+
+        return list(by_id.values())
+
+    def clear(self):
+        """Deletes the journal.
+
+        Returns:
+            None
+        """
+        if self.exists:
+            os.remove(self._path)
+        self._entry_count = 0
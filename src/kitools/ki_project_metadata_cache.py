@@ -0,0 +1,190 @@
+import os
+import copy
+import json
+import time
+import threading
+
+
+class KiProjectMetadataCache(object):
+    """Caches the metadata of remote entities between KiProject operations (and sessions).
+
+    Each entry is keyed by the remote ID (and version) and stores the metadata, a validator (e.g., an etag)
+    and when it was cached. An entry is used as is until it is older than the TTL, after that it is revalidated
+    by asking for the current validator (a cheaper request than fetching the metadata again) and is dropped if the
+    validator has changed or the entry cannot be revalidated.
+
+    In offline mode entries are used regardless of their age and are never revalidated.
+
+    The cache is stored in the KiProject's hidden ".kiproject/cache" directory.
+    """
+
+    DIRNAME = os.path.join('.kiproject', 'cache')
+    FILENAME = 'metadata.json'
+    VERSION = 1
+
+    # The default number of seconds an entry is used before it is revalidated.
+    DEFAULT_TTL = 60
+
+    def __init__(self, local_path, ttl=None, offline=False):
+        """Instantiates a new instance.
+
+        Args:
+            local_path: The local path of the KiProject.
+            ttl: The number of seconds an entry is used before it is revalidated.
+                Set to None to use DEFAULT_TTL or 0 to revalidate every entry before it is used.
+            offline: Whether the KiProject is in offline mode.
+        """
+        if ttl is not None and ttl < 0:
+            raise ValueError('ttl must be greater than or equal to 0.')
+
+        self._path = os.path.join(local_path, self.DIRNAME, self.FILENAME)
+        self._ttl = self.DEFAULT_TTL if ttl is None else ttl
+        self._offline = offline
+        # Key -> {'value', 'validator', 'cached_at'}
+        self._entries = None
+        self._changed = False
+        # Entries are looked up and added by data adapter threads.
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def ttl(self):
+        return self._ttl
+
+    @property
+    def offline(self):
+        return self._offline
+
+    @property
+    def exists(self):
+        return os.path.isfile(self._path)
+
+    def get(self, key, revalidate=None):
+        """Gets the metadata for a key.
+
+        Args:
+            key: The key of the entry.
+            revalidate: Function that returns the current validator of the entry. Only called when the entry is
+                older than the TTL (and not in offline mode). Set to None to drop entries that are older than the TTL.
+
+        Returns:
+            A copy of the metadata or None.
+        """
+        with self._lock:
+            entry = self._get_entries().get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            is_stale = not self._offline and time.time() - entry['cached_at'] >= self._ttl
+            if not is_stale:
+                self.hits += 1
+                return copy.deepcopy(entry['value'])
+
+        # Revalidate without holding the lock (it may need a request).
+        validator = entry['validator']
+        is_valid = revalidate is not None and validator is not None and revalidate() == validator
+
+        with self._lock:
+            if not is_valid:
+                # Unless it was replaced while revalidating.
+                if self._get_entries().get(key) is entry:
+                    self.remove(key)
+                self.misses += 1
+                return None
+
+            entry['cached_at'] = time.time()
+            self._changed = True
+            self.revalidations += 1
+            return copy.deepcopy(entry['value'])
+
+    def put(self, key, value, validator=None):
+        """Caches the metadata for a key.
+
+        Args:
+            key: The key of the entry.
+            value: The metadata. Must be JSON serializable.
+            validator: The value that changes when the metadata changes (e.g., an etag).
+                Entries without a validator are dropped when they are older than the TTL.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._get_entries()[key] = {
+                'value': copy.deepcopy(value),
+                'validator': validator,
+                'cached_at': time.time()
+            }
+            self._changed = True
+
+    def remove(self, key):
+        """Removes the entry for a key.
+
+        Args:
+            key: The key of the entry.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._get_entries().pop(key, None) is not None:
+                self._changed = True
+
+    def save(self):
+        """Writes the cache if it has changed.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if not self._changed:
+                return
+
+            try:
+                os.makedirs(os.path.dirname(self._path), exist_ok=True)
+                # Replace the cache so an interrupted write leaves the previous cache intact.
+                tmp_path = self._path + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump({'version': self.VERSION, 'entries': self._entries}, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self._path)
+                self._changed = False
+            except (OSError, TypeError) as ex:
+                print('WARNING: Could not write the metadata cache: {0}'.format(ex))
+
+    def clear(self):
+        """Deletes the cache.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self.exists:
+                os.remove(self._path)
+            self._entries = {}
+            self._changed = False
+
+    def _get_entries(self):
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _read(self):
+        if self.exists:
+            try:
+                with open(self._path) as f:
+                    jcache = json.load(f)
+                if jcache.get('version') == self.VERSION:
+                    return jcache.get('entries') or {}
+            except ValueError:
+                print('WARNING: Ignoring invalid metadata cache: {0}'.format(self._path))
+        return {}
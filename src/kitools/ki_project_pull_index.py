@@ -0,0 +1,264 @@
+import os
+import json
+import time
+import hashlib
+from pathlib import PurePath
+from .ki_project_scan_cache import KiProjectScanCache
+
+
+class KiProjectPullIndex(object):
+    """Remembers the remote files that were last pulled (or pushed) to each local path.
+
+    Each entry is keyed on the file's path (relative to the KiProject) and stores the remote ID, version, MD5
+    and size along with the local file's size, mtime and inode right after it was written (and when they were
+    read). A file is current (and does not need to be downloaded again) as long as the remote version and the
+    local signature both match. A file whose local signature matches has not changed since it was pushed (so it
+    does not need to be hashed or uploaded again).
+
+    A signature that was read within RACY_SECONDS of the file's mtime is not trusted (see is_racy) since
+    another write within the filesystem's mtime resolution would not change it.
+
+    The index is stored in the KiProject's hidden ".kiproject" directory.
+    """
+
+    DIRNAME = '.kiproject'
+    FILENAME = 'pull_index.json'
+    VERSION = 1
+
+    RACY_SECONDS = KiProjectScanCache.RACY_SECONDS
+
+    def __init__(self, local_path):
+        """Instantiates a new instance.
+
+        Args:
+            local_path: The local path of the KiProject.
+        """
+        self._local_path = local_path
+        self._path = os.path.join(local_path, self.DIRNAME, self.FILENAME)
+        # The entries keyed by the posix path relative to the KiProject.
+        self._files = None
+        self._changed = False
+        self.skips = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def exists(self):
+        return os.path.isfile(self._path)
+
+    def is_current(self, abs_path, remote_id, version, md5=None, verify=False):
+        """Gets if a local file is the same as a remote file.
+
+        Args:
+            abs_path: The absolute path of the local file.
+            remote_id: The ID of the remote file.
+            version: The version of the remote file.
+            md5: The MD5 of the remote file (if known).
+            verify: Whether to hash a file whose signature is racy (see is_racy) instead of not trusting it.
+
+        Returns:
+            True or False
+        """
+        entry = self._get_files().get(self._rel_path(abs_path))
+
+        is_current = entry is not None and entry['id'] == remote_id and \
+                     entry['version'] == self._version_value(version) and (md5 is None or entry['md5'] == md5) and \
+                     (self.get_entry(abs_path) is not None or (verify and self._verify(abs_path, entry)))
+        if is_current:
+            self.skips += 1
+        return is_current
+
+    def get_entry(self, abs_path):
+        """Gets the entry for a local file if the file has not changed since it was recorded.
+
+        Args:
+            abs_path: The absolute path of the local file.
+
+        Returns:
+            Dict with the remote 'id', 'version', 'md5' and 'size' or None.
+        """
+        entry = self._get_files().get(self._rel_path(abs_path))
+        if not entry or not self.is_unchanged(abs_path, entry['local'], entry.get('signed')):
+            return None
+
+        return entry
+
+    def is_racy(self, abs_path):
+        """Gets if a local file's signature matches its entry but was read too close to the file's mtime to trust.
+
+        The file has to be hashed to know if it changed.
+
+        Args:
+            abs_path: The absolute path of the local file.
+
+        Returns:
+            True or False
+        """
+        entry = self._get_files().get(self._rel_path(abs_path))
+        return entry is not None and \
+               self.get_signature(abs_path) == entry['local'] and \
+               not self.is_unchanged(abs_path, entry['local'], entry.get('signed'))
+
+    def record(self, abs_path, remote_id, version, md5, size, signed=None):
+        """Records the remote file that a local file was written from.
+
+        Args:
+            abs_path: The absolute path of the local file.
+            remote_id: The ID of the remote file.
+            version: The version of the remote file.
+            md5: The MD5 of the remote file.
+            size: The size of the remote file.
+            signed: Tuple from sign() for the local file or None to read its signature now.
+
+        Returns:
+            None
+        """
+        signature, signed_at = signed or self.sign(abs_path)
+
+        self._get_files()[self._rel_path(abs_path)] = {
+            'id': remote_id,
+            'version': self._version_value(version),
+            'md5': md5,
+            'size': size,
+            'local': signature,
+            'signed': signed_at
+        }
+        self._changed = True
+
+    def save(self):
+        """Writes the index if it has changed.
+
+        Returns:
+            True if the index is up to date on disk, False if it could not be written.
+        """
+        if not self._changed:
+            return True
+
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            # Replace the index so an interrupted write leaves the previous index intact.
+            tmp_path = self._path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': self.VERSION, 'files': self._files}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path)
+            self._changed = False
+            return True
+        except OSError as ex:
+            print('WARNING: Could not write the pull index: {0}'.format(ex))
+            return False
+
+    def clear(self):
+        """Deletes the index.
+
+        Returns:
+            None
+        """
+        if self.exists:
+            os.remove(self._path)
+        self._files = {}
+        self._changed = False
+
+    @staticmethod
+    def sign(abs_path):
+        """Gets the signature of a local file and when it was read.
+
+        Args:
+            abs_path: The absolute path of the local file.
+
+        Returns:
+            Tuple: (signature (see get_signature), seconds since the epoch)
+        """
+        # Taken before the file is read so it is never later than the signature.
+        signed_at = time.time()
+        return KiProjectPullIndex.get_signature(abs_path), signed_at
+
+    @staticmethod
+    def is_unchanged(abs_path, signature, signed_at):
+        """Gets if a local file still has a signature and the signature can be trusted.
+
+        A signature that was read within RACY_SECONDS of the file's mtime is not trusted.
+
+        Args:
+            abs_path: The absolute path of the local file.
+            signature: The signature (see get_signature).
+            signed_at: When the signature was read (see sign) or None if it is not known.
+
+        Returns:
+            True or False
+        """
+        if signature is None or signed_at is None or KiProjectPullIndex.get_signature(abs_path) != signature:
+            return False
+        return (signed_at - signature[1] / 1e9) > KiProjectPullIndex.RACY_SECONDS
+
+    @staticmethod
+    def get_signature(abs_path):
+        """Gets the signature of a local file that changes when the file is written.
+
+        Args:
+            abs_path: The absolute path of the local file.
+
+        Returns:
+            List: [size, mtime in nanoseconds, inode] or None if the file does not exist.
+        """
+        try:
+            stat = os.stat(abs_path)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    @staticmethod
+    def _version_value(version):
+        # Versions are strings on KiProjectResources and numbers on remote entities.
+        return str(version) if version is not None else None
+
+    def _verify(self, abs_path, entry):
+        """Hashes a local file whose signature is racy and checks it against its entry.
+
+        The signature is read again so it is trusted once the file is old enough.
+
+        Args:
+            abs_path: The absolute path of the local file.
+            entry: The entry of the file.
+
+        Returns:
+            True if the file matches its entry, otherwise False.
+        """
+        signed = self.sign(abs_path)
+
+        if signed[0] is None or signed[0] != entry['local'] or \
+                self._hash_file(abs_path) != entry['md5'] or self.get_signature(abs_path) != signed[0]:
+            return False
+
+        entry['local'], entry['signed'] = signed
+        self._changed = True
+        return True
+
+    def _hash_file(self, abs_path):
+        md5 = hashlib.md5()
+        with open(abs_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                md5.update(chunk)
+        return md5.hexdigest()
+
+    def _rel_path(self, abs_path):
+        return PurePath(os.path.relpath(abs_path, start=self._local_path)).as_posix()
+
+    def _get_files(self):
+        if self._files is None:
+            self._files = self._read()
+        return self._files
+
+    def _read(self):
+        if self.exists:
+            try:
+                with open(self._path) as f:
+                    jindex = json.load(f)
+                if jindex.get('version') == self.VERSION:
+                    return jindex.get('files') or {}
+            except ValueError:
+                print('WARNING: Ignoring invalid pull index: {0}'.format(self._path))
+        return {}
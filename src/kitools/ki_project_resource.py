@@ -9,8 +9,14 @@ class KiProjectResource(object):
     """Defines a resource in a KiProject.
 
     A resource can be a directory or a file.
+
+    Resources use __slots__ since a KiProject can hold a large number of them. The path is stored
+    relative to the KiProject and the absolute and Posix forms are cached until the path changes.
     """
 
+    __slots__ = ('_id', '_root_id', '_kiproject', '_remote_uri', '_name', '_data_type',
+                 '_rel_path', '_abs_path', '_posix_rel_path', '_version')
+
     def __init__(self,
                  kiproject,
                  id=None,
@@ -42,7 +48,9 @@ class KiProjectResource(object):
         self._data_type = None
         self._set_data_type(data_type)
 
-        self._local_path = None
+        self._rel_path = None
+        self._abs_path = None
+        self._posix_rel_path = None
         self._set_local_path(local_path)
 
         self._version = None
@@ -56,21 +64,34 @@ class KiProjectResource(object):
             # Validate the value.
             value = self.kiproject.find_data_type(value)
         self._data_type = value
+        self._changed()
 
     def _set_local_path(self, value):
+        rel_path = None
         if value:
-            sys_path = SysPath(value, cwd=self.kiproject.local_path)
-            value = sys_path.abs_path
+            sys_path = SysPath(value, cwd=self.kiproject.local_path, rel_start=self.kiproject.local_path)
+            rel_path = sys_path.rel_path
 
-        self._local_path = value
+        self._rel_path = rel_path
+        # Cleared so they are rebuilt from the new rel_path when accessed.
+        self._abs_path = None
+        self._posix_rel_path = None
 
-        if self.abs_path:
-            data_type = self.kiproject.get_data_type_from_path(self.abs_path)
+        if rel_path:
+            data_type = self.kiproject.get_data_type_from_path(rel_path)
             self._set_data_type(data_type)
 
+        self._changed()
+
     def _set_version(self, value):
         self._version = str(value) if value else None
 
+    def _changed(self):
+        """Notifies the KiProject's resource list that an attribute has changed."""
+        resources = getattr(self.kiproject, 'resources', None)
+        if resources is not None and hasattr(resources, 'resource_changed'):
+            resources.resource_changed(self)
+
     @property
     def kiproject(self):
         return self._kiproject
@@ -86,6 +107,7 @@ class KiProjectResource(object):
     @root_id.setter
     def root_id(self, value):
         self._root_id = value
+        self._changed()
 
     @property
     def root_resource(self):
@@ -101,6 +123,7 @@ class KiProjectResource(object):
     @remote_uri.setter
     def remote_uri(self, value):
         self._remote_uri = value
+        self._changed()
 
     @property
     def name(self):
@@ -109,6 +132,7 @@ class KiProjectResource(object):
     @name.setter
     def name(self, value):
         self._name = value
+        self._changed()
 
     @property
     def version(self):
@@ -117,6 +141,7 @@ class KiProjectResource(object):
     @version.setter
     def version(self, value):
         self._version = value
+        self._changed()
 
     @property
     def data_type(self):
@@ -133,10 +158,9 @@ class KiProjectResource(object):
         Returns:
             String of the absolute path or None.
         """
-        if self.rel_path:
-            return os.path.join(self.kiproject.local_path, self.rel_path)
-        else:
-            return None
+        if self._abs_path is None and self._rel_path:
+            self._abs_path = os.path.join(self.kiproject.local_path, self._rel_path)
+        return self._abs_path
 
     @abs_path.setter
     def abs_path(self, value):
@@ -149,15 +173,25 @@ class KiProjectResource(object):
         Returns:
             String of the relative path or None.
         """
-        if self._local_path:
-            return SysPath(self._local_path, rel_start=self.kiproject.local_path).rel_path
-        else:
-            return None
+        return self._rel_path
 
     @rel_path.setter
     def rel_path(self, value):
         self._set_local_path(value)
 
+    @property
+    def posix_rel_path(self):
+        """Gets the path of the file relative to the KiProject's root directory in Posix format ("/" vs "\\").
+
+        Returns:
+            String of the relative path or None.
+        """
+        if self._posix_rel_path is None and self._rel_path:
+            posix_rel_path = PurePath(self._rel_path).as_posix()
+            # Share the rel_path string when it is already in Posix format.
+            self._posix_rel_path = self._rel_path if posix_rel_path == self._rel_path else posix_rel_path
+        return self._posix_rel_path
+
     def __str__(self):
         details = []
         details.append('Name: {0}'.format(self.name if self.name else '[not set]'))
@@ -182,7 +216,7 @@ class KiProjectResource(object):
             'data_type': self.data_type.name if self.data_type else None,
             'remote_uri': self.remote_uri,
             # Always store the path in Posix format ("/" vs "\").
-            'rel_path': PurePath(self.rel_path).as_posix() if self.rel_path else None,
+            'rel_path': self.posix_rel_path,
             'name': self.name,
             'version': self.version
         }
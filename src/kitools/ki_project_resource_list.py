@@ -0,0 +1,419 @@
+from collections import OrderedDict
+from collections.abc import MutableSequence
+from .data_type import DataType
+
+
+class KiProjectResourceList(MutableSequence):
+    """Ordered list of KiProjectResources with hash indexes on the commonly searched attributes.
+
+    The indexes are kept in sync when resources are added or removed from the list
+    and when an attribute changes on a resource in the list (see: KiProjectResource._changed).
+
+    The list also tracks which resources have been added, updated, or removed since the
+    last call to pop_changes() so the KiProject can journal them.
+
+    The list can be backed by a source of serialized resources (e.g., a SqliteManifest).
+    Resources are then only materialized from the source when they are found, or when the list
+    itself is accessed (iterated, indexed, sorted, etc.), at which point the whole source is loaded.
+    """
+
+    INDEXED_ATTRIBUTES = ('id', 'root_id', 'remote_uri', 'abs_path', 'name', 'data_type')
+
+    def __init__(self, resources=None, source=None, materialize=None):
+        """Instantiates a new instance.
+
+        Args:
+            resources: Optional iterable of KiProjectResources to populate the list with.
+            source: Optional source of serialized KiProjectResources. Must implement find_records() and
+                iter_records() (see: BaseManifest).
+            materialize: Function to create a KiProjectResource from a serialized KiProjectResource.
+                Required when source is set.
+        """
+        self._items = []
+        self._indexes = {attribute: {} for attribute in self.INDEXED_ATTRIBUTES}
+        # The index keys each resource is currently stored under (keyed by id(resource)).
+        self._index_keys = {}
+        # How many times each resource is in the list (keyed by id(resource)).
+        self._counts = {}
+        # Lazily built map of id(resource) to its position in the list.
+        self._positions = None
+        # Pending changes keyed by KiProjectResource.id.
+        self._changes = OrderedDict()
+        self._source = source
+        self._materialize = materialize
+        # Ids of source resources that have been removed from the list.
+        self._removed_ids = set()
+
+        if resources:
+            self.extend(resources)
+
+    def __len__(self):
+        self._load_source()
+        return len(self._items)
+
+    def __getitem__(self, index):
+        self._load_source()
+        return self._items[index]
+
+    def __setitem__(self, index, value):
+        self._load_source()
+        if isinstance(index, slice):
+            for resource in self._items[index]:
+                self._unindex(resource)
+            value = list(value)
+            self._items[index] = value
+            for resource in value:
+                self._index(resource)
+        else:
+            self._unindex(self._items[index])
+            self._items[index] = value
+            self._index(value)
+        self._positions = None
+
+    def __delitem__(self, index):
+        self._load_source()
+        removed = self._items[index] if isinstance(index, slice) else [self._items[index]]
+        del self._items[index]
+        for resource in removed:
+            self._unindex(resource)
+        self._positions = None
+
+    def __iter__(self):
+        self._load_source()
+        return iter(self._items)
+
+    def __contains__(self, resource):
+        return id(resource) in self._index_keys
+
+    def __eq__(self, other):
+        self._load_source()
+        if isinstance(other, KiProjectResourceList):
+            other._load_source()
+            return self._items == other._items
+        elif isinstance(other, list):
+            return self._items == other
+        return NotImplemented
+
+    def __repr__(self):
+        self._load_source()
+        return repr(self._items)
+
+    def insert(self, index, resource):
+        self._load_source()
+        self._items.insert(index, resource)
+        self._index(resource)
+        self._positions = None
+
+    def append(self, resource):
+        self._items.append(resource)
+        self._index(resource)
+        if self._positions is not None:
+            self._positions[id(resource)] = len(self._items) - 1
+
+    def remove(self, resource):
+        self._items.remove(resource)
+        self._unindex(resource)
+        self._positions = None
+        if self._source is not None:
+            self._removed_ids.add(resource.id)
+
+    def clear(self):
+        self._load_source()
+        for resource in self._items:
+            self._track_change('remove', resource)
+        self._items.clear()
+        self._indexes = {attribute: {} for attribute in self.INDEXED_ATTRIBUTES}
+        self._index_keys = {}
+        self._counts = {}
+        self._positions = None
+
+    def sort(self, key=None, reverse=False):
+        self._load_source()
+        self._items.sort(key=key, reverse=reverse)
+        self._positions = None
+
+    def reverse(self):
+        self._load_source()
+        self._items.reverse()
+        self._positions = None
+
+    @property
+    def loaded(self):
+        """Gets if all the resources have been materialized from the source (or there is no source).
+
+        Returns:
+            True or False
+        """
+        return self._source is None
+
+    def to_json(self):
+        """Serializes all the resources.
+
+        Resources that have not been materialized from the source are returned as-is from the source.
+
+        Returns:
+            List of serialized KiProjectResources.
+        """
+        if self._source is None:
+            return [resource.to_json() for resource in self._items]
+
+        jresources = []
+        id_index = self._indexes['id']
+        source_ids = set()
+
+        for record in self._source.iter_records():
+            record_id = record.get('id')
+            if record_id in self._removed_ids:
+                continue
+
+            source_ids.add(record_id)
+            existing = id_index.get(record_id)
+            if existing:
+                jresources.append(next(iter(existing.values())).to_json())
+            else:
+                jresources.append(record)
+
+        for resource in self._items:
+            if resource.id not in source_ids:
+                jresources.append(resource.to_json())
+
+        return jresources
+
+    def copy(self):
+        """Gets a shallow copy of the resources.
+
+        Returns:
+            List of KiProjectResources.
+        """
+        self._load_source()
+        return list(self._items)
+
+    def resource_changed(self, resource):
+        """Updates the indexes and tracks the change after one of a resource's attributes has changed.
+
+        Resources that are not in the list are ignored.
+
+        Args:
+            resource: The KiProjectResource that changed.
+
+        Returns:
+            None
+        """
+        if id(resource) in self._index_keys:
+            self._remove_from_indexes(resource)
+            self._add_to_indexes(resource)
+            self._track_change('update', resource)
+
+    def pop_changes(self):
+        """Gets and clears the changes made since the last call.
+
+        Returns:
+            List of tuples: (operation, KiProjectResource). Operation is one of: 'add', 'update', 'remove'.
+        """
+        changes = list(self._changes.values())
+        self._changes = OrderedDict()
+        return changes
+
+    def _track_change(self, operation, resource):
+        pending = self._changes.get(resource.id)
+        if operation == 'update' and pending is not None and pending[0] == 'add':
+            # Still an add until the change has been popped.
+            return
+        self._changes[resource.id] = (operation, resource)
+
+    def find(self, operator='and', **kwargs):
+        """Finds all resources matching the attributes and values.
+
+        Indexed attributes are looked up in their hash index, all other attributes fall back to a scan.
+        Multiple attributes are intersected ('and') or unioned ('or').
+
+        Args:
+            operator: The operator to use when finding by more than one attribute. Must be one of: 'and', 'or'.
+            **kwargs: KiProjectResource attributes and values to find by.
+
+        Returns:
+            List of KiProjectResources in list order or an empty list.
+        """
+        if self._source is not None:
+            records = self._source.find_records(operator=operator, **kwargs)
+            if records is None:
+                self._load_source()
+            else:
+                self._add_source_records(records)
+
+        if not kwargs:
+            return list(self._items) if operator == 'and' else []
+
+        candidate_sets = [self._lookup(attribute, value) for attribute, value in kwargs.items()]
+
+        if operator == 'and':
+            candidate_sets.sort(key=len)
+            matches = candidate_sets[0]
+            for candidates in candidate_sets[1:]:
+                if not matches:
+                    break
+                matches = {key: resource for key, resource in matches.items() if key in candidates}
+        else:
+            matches = {}
+            for candidates in candidate_sets:
+                matches.update(candidates)
+
+        results = list(matches.values())
+
+        if len(results) > 1:
+            positions = self._get_positions()
+            results.sort(key=lambda r: positions[id(r)])
+
+        return results
+
+    def _load_source(self):
+        """Materializes all the resources from the source.
+
+        The resources keep the order of the source followed by any resources added to the list.
+
+        Returns:
+            None
+        """
+        if self._source is None:
+            return
+
+        id_index = self._indexes['id']
+        loaded = []
+
+        for record in self._source.iter_records():
+            record_id = record.get('id')
+            if record_id in self._removed_ids:
+                continue
+
+            existing = id_index.get(record_id)
+            if existing:
+                loaded.append(next(iter(existing.values())))
+            else:
+                resource = self._materialize(record)
+                self._index(resource, track=False)
+                loaded.append(resource)
+
+        loaded_ids = set(id(r) for r in loaded)
+        self._items = loaded + [r for r in self._items if id(r) not in loaded_ids]
+        self._positions = None
+        self._source = None
+        self._removed_ids = set()
+
+    def _add_source_records(self, records):
+        """Materializes the serialized resources that are not already in the list.
+
+        Args:
+            records: Iterable of serialized KiProjectResources.
+
+        Returns:
+            None
+        """
+        id_index = self._indexes['id']
+
+        for record in records:
+            record_id = record.get('id')
+            if record_id in self._removed_ids or record_id in id_index:
+                continue
+
+            resource = self._materialize(record)
+            self._items.append(resource)
+            self._index(resource, track=False)
+
+        self._positions = None
+
+    def _lookup(self, attribute, value):
+        """Gets the resources where the attribute matches the value.
+
+        Args:
+            attribute: The KiProjectResource attribute.
+            value: The value to match.
+
+        Returns:
+            Dict of id(resource) to KiProjectResource.
+        """
+        index = self._indexes.get(attribute)
+
+        if index is None:
+            return {id(r): r for r in self._items if self._matches(getattr(r, attribute), value)}
+
+        candidates = index.get(self._index_key(attribute, value), {})
+
+        if attribute == 'data_type' and isinstance(value, DataType):
+            # The index is keyed on the DataType name, make sure the rest of the DataType matches.
+            candidates = {key: r for key, r in candidates.items() if r.data_type == value}
+
+        return candidates
+
+    @staticmethod
+    def _matches(resource_value, value):
+        """Gets if a resource's attribute value matches a search value.
+
+        Args:
+            resource_value: The value from the KiProjectResource.
+            value: The value being searched for.
+
+        Returns:
+            True or False
+        """
+        if resource_value == value:
+            return True
+        elif isinstance(resource_value, DataType) and isinstance(value, str):
+            # Handle searching by DataType Name.
+            return resource_value.name == value
+        return False
+
+    @staticmethod
+    def _index_key(attribute, value):
+        """Gets the key to index a value under.
+
+        DataTypes are indexed by name so they can be found by either the DataType or its name.
+
+        Args:
+            attribute: The KiProjectResource attribute.
+            value: The attribute value.
+
+        Returns:
+            The index key.
+        """
+        if attribute == 'data_type' and isinstance(value, DataType):
+            return value.name
+        return value
+
+    def _index(self, resource, track=True):
+        count = self._counts.get(id(resource), 0)
+        self._counts[id(resource)] = count + 1
+        if count == 0:
+            self._add_to_indexes(resource)
+            if track:
+                self._track_change('add', resource)
+
+    def _unindex(self, resource):
+        count = self._counts.get(id(resource), 0)
+        if count > 1:
+            self._counts[id(resource)] = count - 1
+        elif count == 1:
+            del self._counts[id(resource)]
+            self._remove_from_indexes(resource)
+            self._track_change('remove', resource)
+
+    def _add_to_indexes(self, resource):
+        keys = {}
+        for attribute in self.INDEXED_ATTRIBUTES:
+            key = self._index_key(attribute, getattr(resource, attribute))
+            self._indexes[attribute].setdefault(key, {})[id(resource)] = resource
+            keys[attribute] = key
+        self._index_keys[id(resource)] = keys
+
+    def _remove_from_indexes(self, resource):
+        keys = self._index_keys.pop(id(resource))
+        for attribute, key in keys.items():
+            bucket = self._indexes[attribute].get(key)
+            if bucket is not None:
+                bucket.pop(id(resource), None)
+                if not bucket:
+                    del self._indexes[attribute][key]
+
+    def _get_positions(self):
+        if self._positions is None:
+            self._positions = {id(r): i for i, r in enumerate(self._items)}
+        return self._positions
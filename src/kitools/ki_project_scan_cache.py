@@ -0,0 +1,117 @@
+import os
+import json
+import time
+from pathlib import PurePath
+
+
+class KiProjectScanCache(object):
+    """Caches the directory listings of the KiProject's data directories between scans.
+
+    Each listing is keyed on the directory's path (relative to the KiProject) and stored with the directory's
+    mtime and inode. A directory's mtime changes whenever an entry is added, removed, or renamed in it, so
+    the cached listing is used (and the directory is not read) as long as both still match.
+
+    The cache is stored in the KiProject's hidden ".kiproject" directory.
+    """
+
+    DIRNAME = '.kiproject'
+    FILENAME = 'scan_cache.json'
+    VERSION = 1
+
+    # Directories modified this recently (in seconds) are not cached since another change
+    # within the filesystem's mtime resolution would not change the mtime.
+    RACY_SECONDS = 2
+
+    def __init__(self, local_path):
+        """Instantiates a new instance.
+
+        Args:
+            local_path: The local path of the KiProject.
+        """
+        self._local_path = local_path
+        self._path = os.path.join(local_path, self.DIRNAME, self.FILENAME)
+        # The cached listings from the last scan keyed by the posix path relative to the KiProject.
+        self._dirs = None
+        # The listings from the current scan.
+        self._scanned_dirs = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def exists(self):
+        return os.path.isfile(self._path)
+
+    def list_dir(self, path):
+        """Gets the entries in a directory from the cache or by reading the directory.
+
+        Args:
+            path: The absolute path of the directory.
+
+        Returns:
+            List of tuples: (name, is_dir).
+        """
+        if self._dirs is None:
+            self._dirs = self._read()
+
+        rel_path = PurePath(os.path.relpath(path, start=self._local_path)).as_posix()
+        stat = os.stat(path)
+        cached = self._dirs.get(rel_path)
+
+        if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['ino'] == stat.st_ino:
+            entries = [tuple(entry) for entry in cached['entries']]
+            self.hits += 1
+        else:
+            entries = [(entry.name, entry.is_dir(follow_symlinks=False)) for entry in os.scandir(path)]
+            self.misses += 1
+
+        if (time.time() - stat.st_mtime) > self.RACY_SECONDS:
+            self._scanned_dirs[rel_path] = {'mtime_ns': stat.st_mtime_ns, 'ino': stat.st_ino, 'entries': entries}
+
+        return entries
+
+    def save(self):
+        """Writes the listings from the current scan and drops the directories that were not scanned.
+
+        Returns:
+            None
+        """
+        self._dirs = self._scanned_dirs
+        self._scanned_dirs = {}
+
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            # Replace the cache so an interrupted write leaves the previous cache intact.
+            tmp_path = self._path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': self.VERSION, 'dirs': self._dirs}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path)
+        except OSError as ex:
+            print('WARNING: Could not write the scan cache: {0}'.format(ex))
+
+    def clear(self):
+        """Deletes the cache.
+
+        Returns:
+            None
+        """
+        if self.exists:
+            os.remove(self._path)
+        self._dirs = {}
+        self._scanned_dirs = {}
+
+    def _read(self):
+        if self.exists:
+            try:
+                with open(self._path) as f:
+                    jcache = json.load(f)
+                if jcache.get('version') == self.VERSION:
+                    return jcache.get('dirs') or {}
+            except ValueError:
+                print('WARNING: Ignoring invalid scan cache: {0}'.format(self._path))
+        return {}
@@ -0,0 +1,292 @@
+import os
+import json
+from pathlib import PurePath
+from .ki_project_pull_index import KiProjectPullIndex
+from .utils import Utils
+
+
+class KiProjectTransferJournal(object):
+    """Append-only log of the file transfers of data_pull and data_push so an interrupted operation can resume.
+
+    Each line is a JSON object with the "state" of a transfer, the "op" ('pull' or 'push'), the file's "path"
+    (relative to the KiProject) and what is known about the remote file: "id", "version", "md5", "size" and
+    "parent" (the ID of the remote parent). The states are:
+        planned: The file is going to be transferred.
+        started: The file is being transferred (a push also records the file's MD5 and local signature).
+        done:    The file was transferred. The local file's signature (and when it was read) is recorded
+                 (see KiProjectPullIndex).
+
+    The last entry for a path is its current state. The completed transfers are folded into the pull index
+    when the next operation starts and dropped from the journal (compacted) once the pull index is saved, so
+    the journal only keeps the transfers that an interrupted operation did not finish.
+
+    The journal is stored in the KiProject's hidden ".kiproject" directory.
+    """
+
+    DIRNAME = KiProjectPullIndex.DIRNAME
+    FILENAME = 'transfers.journal'
+
+    PLANNED = 'planned'
+    STARTED = 'started'
+    DONE = 'done'
+
+    def __init__(self, local_path):
+        """Instantiates a new instance.
+
+        Args:
+            local_path: The local path of the KiProject.
+        """
+        self._local_path = local_path
+        self._path = os.path.join(local_path, self.DIRNAME, self.FILENAME)
+        # The last entry for each posix path relative to the KiProject.
+        self._entries = None
+        # The number of started transfers that were picked up again.
+        self.resumes = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def exists(self):
+        return os.path.isfile(self._path)
+
+    @property
+    def pending_count(self):
+        """Gets the number of transfers that were planned or started but not done.
+
+        Returns:
+            Integer
+        """
+        return sum(1 for entry in self._get_entries().values() if entry['state'] != self.DONE)
+
+    def plan(self, operation, transfers):
+        """Records the files that are going to be transferred.
+
+        Args:
+            operation: 'pull' or 'push'.
+            transfers: List of tuples: (absolute path of the local file, remote ID, version, MD5, size).
+                The remote details are None when they are not known.
+
+        Returns:
+            None
+        """
+        self._append([self._new_entry(self.PLANNED, operation, abs_path, remote_id, version, md5, size)
+                      for abs_path, remote_id, version, md5, size in transfers])
+
+    def start(self, operation, abs_path, remote_id=None, version=None, md5=None, size=None, parent_id=None,
+              signed=None):
+        """Records that a file is being transferred.
+
+        Details that are not given are taken from the planned entry of the file.
+
+        Args:
+            operation: 'pull' or 'push'.
+            abs_path: The absolute path of the local file.
+            remote_id: The ID of the remote file.
+            version: The version of the remote file.
+            md5: The MD5 of the file.
+            size: The size of the file.
+            parent_id: The ID of the remote parent.
+            signed: The signature of the local file and when it was read (see KiProjectPullIndex.sign), read
+                before the file was hashed. Read now if None.
+
+        Returns:
+            None
+        """
+        entry = self._new_entry(self.STARTED, operation, abs_path, remote_id, version, md5, size, parent_id)
+
+        planned = self.get_entry(abs_path)
+        if planned is not None and planned['state'] == self.PLANNED and planned['op'] == operation:
+            for key in ['id', 'version', 'md5', 'size', 'parent']:
+                if entry[key] is None:
+                    entry[key] = planned[key]
+
+        if operation == 'push':
+            # The file's MD5 is only reused if the file has not changed.
+            entry['local'], entry['signed'] = signed or KiProjectPullIndex.sign(abs_path)
+
+        self._append([entry])
+
+    def complete(self, operation, abs_path, remote_id, version, md5, size, parent_id=None, signed=None):
+        """Records that a file was transferred.
+
+        Args:
+            operation: 'pull' or 'push'.
+            abs_path: The absolute path of the local file.
+            remote_id: The ID of the remote file.
+            version: The version of the remote file.
+            md5: The MD5 of the remote file.
+            size: The size of the remote file.
+            parent_id: The ID of the remote parent.
+            signed: The signature of the local file and when it was read (see KiProjectPullIndex.sign). Read now
+                if None.
+
+        Returns:
+            None
+        """
+        entry = self._new_entry(self.DONE, operation, abs_path, remote_id, version, md5, size, parent_id)
+        entry['local'], entry['signed'] = signed or KiProjectPullIndex.sign(abs_path)
+        self._append([entry])
+
+    def get_entry(self, abs_path):
+        """Gets the last entry for a local file.
+
+        Args:
+            abs_path: The absolute path of the local file.
+
+        Returns:
+            Dict or None.
+        """
+        return self._get_entries().get(self._rel_path(abs_path))
+
+    def get_completed(self, abs_path):
+        """Gets the entry for a local file if its transfer was done and the file has not changed since.
+
+        Args:
+            abs_path: The absolute path of the local file.
+
+        Returns:
+            Dict or None.
+        """
+        entry = self.get_entry(abs_path)
+        if entry is None or entry['state'] != self.DONE or not self._is_unchanged(abs_path, entry):
+            return None
+        return entry
+
+    def get_started(self, operation, abs_path):
+        """Gets the entry for a local file if its transfer was started but not done.
+
+        The entry of a push is only returned if the file has not changed since it was hashed.
+
+        Args:
+            operation: 'pull' or 'push'.
+            abs_path: The absolute path of the local file.
+
+        Returns:
+            Dict or None.
+        """
+        entry = self.get_entry(abs_path)
+        if entry is None or entry['state'] != self.STARTED or entry['op'] != operation:
+            return None
+        if operation == 'push' and not self._is_unchanged(abs_path, entry):
+            return None
+        return entry
+
+    def completed(self):
+        """Gets the transfers that were done whose local files have not changed since.
+
+        Returns:
+            List of tuples: (absolute path of the local file, entry)
+        """
+        results = []
+        for rel_path, entry in self._get_entries().items():
+            if entry['state'] == self.DONE:
+                abs_path = os.path.join(self._local_path, *PurePath(rel_path).parts)
+                if self._is_unchanged(abs_path, entry):
+                    results.append((abs_path, entry))
+        return results
+
+    def compact(self):
+        """Drops the entries of the transfers that were done (they are in the pull index).
+
+        The journal is deleted when no transfers are left.
+
+        Returns:
+            None
+        """
+        if not self.exists:
+            return
+
+        entries = self._get_entries()
+        pending = [entry for entry in entries.values() if entry['state'] != self.DONE]
+
+        if len(pending) == len(entries):
+            return
+
+        if not pending:
+            self.clear()
+            return
+
+        tmp_path = self._path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(''.join(json.dumps(entry) + '\n' for entry in pending))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path)
+
+        self._entries = {entry['path']: entry for entry in pending}
+
+    def clear(self):
+        """Deletes the journal.
+
+        Returns:
+            None
+        """
+        if self.exists:
+            os.remove(self._path)
+        self._entries = {}
+
+    def _new_entry(self, state, operation, abs_path, remote_id, version, md5, size, parent_id=None):
+        return {
+            'state': state,
+            'op': operation,
+            'path': self._rel_path(abs_path),
+            'id': remote_id,
+            # Versions are strings on KiProjectResources and numbers on remote entities.
+            'version': str(version) if version is not None else None,
+            'md5': md5,
+            'size': size,
+            'parent': parent_id
+        }
+
+    def _append(self, entries):
+        if not entries:
+            return
+
+        entries_by_path = self._get_entries()
+
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        # Entries are flushed (not synced) so they survive the process being killed without slowing down
+        # transfers of many small files.
+        Utils.append_lines(self._path, [json.dumps(entry) for entry in entries])
+
+        for entry in entries:
+            entries_by_path[entry['path']] = entry
+
+    def _is_unchanged(self, abs_path, entry):
+        return KiProjectPullIndex.is_unchanged(abs_path, entry.get('local'), entry.get('signed'))
+
+    def _rel_path(self, abs_path):
+        return PurePath(os.path.relpath(abs_path, start=self._local_path)).as_posix()
+
+    def _get_entries(self):
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _read(self):
+        """Reads the last entry for each path.
+
+        A partially written line (e.g., from the process being killed during a write) is skipped. Entries
+        appended after it start on a new line (see Utils.append_lines).
+
+        Returns:
+            Dict
+        """
+        entries = {}
+
+        if self.exists:
+            with open(self._path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        print('WARNING: Skipping invalid transfer journal entry in: {0}'.format(self._path))
+                        continue
+                    entries[entry.get('path')] = entry
+
+        return entries
@@ -0,0 +1,3 @@
+from .base_manifest import BaseManifest
+from .json_manifest import JsonManifest
+from .sqlite_manifest import SqliteManifest
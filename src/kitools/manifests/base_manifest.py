@@ -0,0 +1,163 @@
+import os
+import abc
+from pathlib import PurePath
+from ..data_type import DataType
+
+
+class BaseManifest(object):
+    """Base class for the stores that persist a KiProject's configuration and resources."""
+
+    # The name used to select the manifest (e.g., KiProject(..., manifest='json')).
+    NAME = None
+
+    # The keys of a serialized KiProjectResource (see: KiProjectResource.to_json).
+    RECORD_KEYS = ('id', 'root_id', 'data_type', 'remote_uri', 'rel_path', 'name', 'version')
+
+    def __init__(self, local_path):
+        """Instantiates a new instance.
+
+        Args:
+            local_path: The local path of the KiProject.
+        """
+        self._local_path = local_path
+
+    @property
+    @abc.abstractmethod
+    def path(self):
+        """Gets the path to the manifest file.
+
+        Returns:
+            String
+        """
+        raise NotImplementedError()
+
+    @property
+    def exists(self):
+        """Gets if the manifest has been created.
+
+        Returns:
+            True or False
+        """
+        raise NotImplementedError()
+
+    @property
+    def saves_incrementally(self):
+        """Gets if save() only writes the changes since the last save.
+
+        Manifests that save incrementally are saved on every change, even within KiProject.batch().
+
+        Returns:
+            True or False
+        """
+        return False
+
+    @property
+    def needs_compact(self):
+        """Gets if the manifest should be compacted after it is loaded.
+
+        Returns:
+            True or False
+        """
+        return False
+
+    @abc.abstractmethod
+    def load(self):
+        """Loads the serialized KiProject.
+
+        Returns:
+            Hash of the serialized KiProject. The 'resources' key is omitted when the
+            resources are served on demand through find_records() and iter_records().
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def save(self, kiproject):
+        """Saves the changes made to a KiProject since the last save.
+
+        Args:
+            kiproject: The KiProject to save.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def compact(self, kiproject):
+        """Writes the full KiProject to the manifest.
+
+        Args:
+            kiproject: The KiProject to write.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def delete(self):
+        """Deletes the manifest.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError()
+
+    def find_records(self, operator='and', **kwargs):
+        """Finds the serialized KiProjectResources matching the attributes and values.
+
+        Args:
+            operator: The operator to use when finding by more than one attribute. Must be one of: 'and', 'or'.
+            **kwargs: KiProjectResource attributes and values to find by.
+
+        Returns:
+            List of serialized KiProjectResources, or None if the manifest cannot search by the attributes.
+        """
+        return None
+
+    def iter_records(self):
+        """Iterates over all the serialized KiProjectResources.
+
+        Returns:
+            Iterator of serialized KiProjectResources.
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def sort_key(jresource):
+        """Gets the key the resources are ordered by in the manifest.
+
+        Args:
+            jresource: The serialized KiProjectResource.
+
+        Returns:
+            String
+        """
+        return jresource.get('rel_path') or jresource.get('data_type') or jresource.get('name') or \
+               jresource.get('remote_uri') or jresource.get('id')
+
+    def _to_record_value(self, attribute, value):
+        """Converts a KiProjectResource attribute and value to the key and value in a serialized KiProjectResource.
+
+        Args:
+            attribute: The KiProjectResource attribute.
+            value: The attribute value.
+
+        Returns:
+            Tuple: (key, value). Key is None if the attribute is not serialized.
+        """
+        if attribute == 'abs_path':
+            attribute = 'rel_path'
+            if value is not None:
+                value = os.path.relpath(value, start=self._local_path)
+
+        if attribute == 'rel_path' and value is not None:
+            # Paths are always stored in Posix format.
+            value = PurePath(value).as_posix()
+        elif attribute == 'data_type' and isinstance(value, DataType):
+            value = value.name
+
+        if attribute not in self.RECORD_KEYS:
+            return None, None
+
+        return attribute, value
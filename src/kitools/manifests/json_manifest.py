@@ -0,0 +1,194 @@
+import os
+import json
+from .base_manifest import BaseManifest
+from ..ki_project_journal import KiProjectJournal
+
+
+class JsonManifest(BaseManifest):
+    """Stores the KiProject in a JSON file (kiproject.json) with an optional append-only journal.
+
+    The serialized resources are kept in memory and served by find_records() and iter_records()
+    so KiProjectResources are only created for the resources that are used.
+    """
+
+    NAME = 'json'
+    FILENAME = 'kiproject.json'
+
+    # When journaling, fold the journal into the JSON file once it reaches this many entries or bytes.
+    JOURNAL_COMPACT_ENTRIES = 10000
+    JOURNAL_COMPACT_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, local_path, journal=False):
+        """Instantiates a new instance.
+
+        Args:
+            local_path: The local path of the KiProject.
+            journal: Whether or not to append resource changes to a journal instead of rewriting the JSON file.
+        """
+        super().__init__(local_path)
+        self._path = os.path.join(local_path, self.FILENAME)
+        self._use_journal = journal
+        self._journal = KiProjectJournal(local_path)
+        # The project level (non-resource) JSON last written to the JSON file.
+        self._saved_config_json = None
+        # The serialized resources from the last load.
+        self._records = []
+        # Lazily built indexes on the serialized resources: key -> value -> list of records.
+        self._record_indexes = None
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def exists(self):
+        return os.path.isfile(self._path)
+
+    @property
+    def journal(self):
+        return self._journal
+
+    @property
+    def saves_incrementally(self):
+        return self._use_journal
+
+    @property
+    def needs_compact(self):
+        # Fold the journal back in if it will not be appended to.
+        return self._journal.exists and not self._use_journal
+
+    def load(self):
+        """Loads the JSON file and replays any journaled changes on top of it.
+
+        The resources are not loaded, they are served by find_records() and iter_records().
+
+        Returns:
+            Hash
+        """
+        with open(self._path) as f:
+            jconfig = json.load(f)
+
+        self._saved_config_json = self._config_json(jconfig)
+
+        records = jconfig.pop('resources', None) or []
+        if self._journal.exists:
+            records = self._journal.replay(records)
+
+        self._records = records
+        self._record_indexes = None
+
+        return jconfig
+
+    def find_records(self, operator='and', **kwargs):
+        """Finds the serialized KiProjectResources matching the attributes and values.
+
+        Args:
+            operator: The operator to use when finding by more than one attribute. Must be one of: 'and', 'or'.
+            **kwargs: KiProjectResource attributes and values to find by.
+
+        Returns:
+            List of serialized KiProjectResources, or None if an attribute is not serialized.
+        """
+        if self._record_indexes is None:
+            self._record_indexes = {key: {} for key in self.RECORD_KEYS}
+            for record in self._records:
+                for key in self.RECORD_KEYS:
+                    self._record_indexes[key].setdefault(self._index_value(key, record.get(key)), []).append(record)
+
+        matches = None
+
+        for attribute, value in kwargs.items():
+            key, value = self._to_record_value(attribute, value)
+            if key is None:
+                return None
+
+            found = self._record_indexes[key].get(self._index_value(key, value), [])
+
+            if matches is None:
+                matches = list(found)
+            elif operator == 'and':
+                found_ids = set(id(r) for r in found)
+                matches = [r for r in matches if id(r) in found_ids]
+            else:
+                match_ids = set(id(r) for r in matches)
+                matches += [r for r in found if id(r) not in match_ids]
+
+        if matches is None:
+            return list(self._records) if operator == 'and' else []
+
+        return matches
+
+    def iter_records(self):
+        return iter(self._records)
+
+    @staticmethod
+    def _index_value(key, value):
+        # Versions are always strings on KiProjectResources but may not be in the JSON.
+        return str(value) if key == 'version' and value is not None else value
+
+    def save(self, kiproject):
+        """Appends the resource changes to the journal or rewrites the JSON file.
+
+        Args:
+            kiproject: The KiProject to save.
+
+        Returns:
+            None
+        """
+        can_journal = self._use_journal and \
+                      self._saved_config_json is not None and \
+                      self._saved_config_json == self._config_json(kiproject.to_json(include_resources=False))
+
+        if can_journal:
+            self._journal.append(kiproject.resources.pop_changes())
+
+            if self._journal.entry_count >= self.JOURNAL_COMPACT_ENTRIES or \
+                    self._journal.size >= self.JOURNAL_COMPACT_BYTES:
+                self.compact(kiproject)
+        else:
+            self.compact(kiproject)
+
+    def compact(self, kiproject):
+        """Writes the full KiProject to the JSON file and clears the journal.
+
+        Args:
+            kiproject: The KiProject to write.
+
+        Returns:
+            None
+        """
+        if kiproject.resources.loaded:
+            # Sort the resources before saving.
+            kiproject.resources.sort(
+                key=lambda r: r.rel_path or (r.data_type.name if r.data_type else None) or r.name or r.remote_uri or r.id)
+
+        jconfig = kiproject.to_json()
+        jconfig['resources'].sort(key=self.sort_key)
+
+        # Replace the file so a crash while writing leaves the previous file (and the journal) intact.
+        tmp_path = self._path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(jconfig, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path)
+
+        self._journal.clear()
+        kiproject.resources.pop_changes()
+        self._saved_config_json = self._config_json(jconfig)
+
+    def delete(self):
+        if self.exists:
+            os.remove(self._path)
+        self._journal.clear()
+
+    def _config_json(self, jconfig):
+        """Gets the project level (non-resource) values from the serialized KiProject.
+
+        Args:
+            jconfig: The serialized KiProject.
+
+        Returns:
+            String of the project level values as JSON.
+        """
+        return json.dumps({key: value for key, value in jconfig.items() if key != 'resources'}, sort_keys=True)
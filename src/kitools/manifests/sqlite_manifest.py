@@ -0,0 +1,210 @@
+import os
+import json
+import sqlite3
+from .base_manifest import BaseManifest
+
+
+class SqliteManifest(BaseManifest):
+    """Stores the KiProject in a SQLite database (kiproject.db).
+
+    Each resource is a row with indexed columns so resources can be found and saved
+    individually without loading the whole manifest into memory.
+    """
+
+    NAME = 'sqlite'
+    FILENAME = 'kiproject.db'
+
+    RESOURCE_COLUMNS = BaseManifest.RECORD_KEYS
+    INDEXED_COLUMNS = ('root_id', 'data_type', 'remote_uri', 'rel_path', 'name')
+
+    # The project level values stored in the "project" table.
+    PROJECT_KEYS = ('title', 'description', 'project_uri', 'data_ignores', 'data_types')
+
+    def __init__(self, local_path):
+        """Instantiates a new instance.
+
+        Args:
+            local_path: The local path of the KiProject.
+        """
+        super().__init__(local_path)
+        self._path = os.path.join(local_path, self.FILENAME)
+        self._connection = None
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def exists(self):
+        return os.path.isfile(self._path)
+
+    @property
+    def saves_incrementally(self):
+        return True
+
+    def load(self):
+        """Loads the project level values.
+
+        The resources are not loaded, they are served by find_records() and iter_records().
+
+        Returns:
+            Hash
+        """
+        jconfig = {}
+        for key, value in self._db().execute('SELECT key, value FROM project'):
+            jconfig[key] = json.loads(value)
+        return jconfig
+
+    def save(self, kiproject):
+        """Writes the project level values and the changed resources.
+
+        Args:
+            kiproject: The KiProject to save.
+
+        Returns:
+            None
+        """
+        db = self._db()
+        with db:
+            self._write_project(db, kiproject.to_json(include_resources=False))
+
+            for operation, resource in kiproject.resources.pop_changes():
+                if operation == 'remove':
+                    db.execute('DELETE FROM resources WHERE id = ?', (resource.id,))
+                else:
+                    self._write_resources(db, [resource.to_json()])
+
+    def compact(self, kiproject):
+        """Rewrites the full KiProject.
+
+        Args:
+            kiproject: The KiProject to write.
+
+        Returns:
+            None
+        """
+        jconfig = kiproject.to_json()
+
+        db = self._db()
+        with db:
+            self._write_project(db, jconfig)
+            db.execute('DELETE FROM resources')
+            self._write_resources(db, jconfig['resources'])
+        kiproject.resources.pop_changes()
+
+    def delete(self):
+        self.close()
+        if self.exists:
+            os.remove(self._path)
+
+    def close(self):
+        """Closes the database connection.
+
+        Returns:
+            None
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def find_records(self, operator='and', **kwargs):
+        """Finds the serialized KiProjectResources matching the attributes and values.
+
+        Args:
+            operator: The operator to use when finding by more than one attribute. Must be one of: 'and', 'or'.
+            **kwargs: KiProjectResource attributes and values to find by.
+
+        Returns:
+            List of serialized KiProjectResources, or None if an attribute is not a column.
+        """
+        clauses = []
+        params = []
+
+        for attribute, value in kwargs.items():
+            column, value = self._to_record_value(attribute, value)
+            if column is None:
+                return None
+
+            if value is None:
+                clauses.append('{0} IS NULL'.format(column))
+            else:
+                clauses.append('{0} = ?'.format(column))
+                params.append(value)
+
+        sql = 'SELECT {0} FROM resources'.format(', '.join(self.RESOURCE_COLUMNS))
+        if clauses:
+            sql += ' WHERE ' + ' {0} '.format(operator.upper()).join(clauses)
+        elif operator == 'or':
+            return []
+
+        return [self._to_record(row) for row in self._db().execute(sql, params)]
+
+    def iter_records(self):
+        sql = 'SELECT {0} FROM resources ORDER BY COALESCE(rel_path, data_type, name, remote_uri, id)'.format(
+            ', '.join(self.RESOURCE_COLUMNS))
+        for row in self._db().execute(sql):
+            yield self._to_record(row)
+
+    def import_json(self, json_path):
+        """Imports a KiProject JSON file (kiproject.json) into the database.
+
+        The resources are copied directly from the JSON, they are not loaded into KiProjectResources.
+
+        Args:
+            json_path: The path to the JSON file.
+
+        Returns:
+            None
+        """
+        with open(json_path) as f:
+            jconfig = json.load(f)
+
+        db = self._db()
+        with db:
+            self._write_project(db, jconfig)
+            db.execute('DELETE FROM resources')
+            self._write_resources(db, jconfig.get('resources') or [])
+
+    def export_json(self, json_path):
+        """Exports the database to a KiProject JSON file (kiproject.json).
+
+        Args:
+            json_path: The path to the JSON file to write.
+
+        Returns:
+            None
+        """
+        jconfig = self.load()
+        jconfig['resources'] = list(self.iter_records())
+
+        with open(json_path, 'w') as f:
+            json.dump(jconfig, f, indent=2)
+
+    def _db(self):
+        """Gets the open database connection and creates the schema if needed.
+
+        Returns:
+            sqlite3.Connection
+        """
+        if self._connection is None:
+            self._connection = sqlite3.connect(self._path)
+            with self._connection as db:
+                db.execute('CREATE TABLE IF NOT EXISTS project (key TEXT PRIMARY KEY, value TEXT)')
+                db.execute('CREATE TABLE IF NOT EXISTS resources ({0})'.format(
+                    ', '.join('{0} TEXT{1}'.format(c, ' PRIMARY KEY' if c == 'id' else '')
+                              for c in self.RESOURCE_COLUMNS)))
+                for column in self.INDEXED_COLUMNS:
+                    db.execute('CREATE INDEX IF NOT EXISTS ix_resources_{0} ON resources ({0})'.format(column))
+        return self._connection
+
+    def _write_project(self, db, jconfig):
+        db.executemany('INSERT OR REPLACE INTO project (key, value) VALUES (?, ?)',
+                       [(key, json.dumps(jconfig.get(key))) for key in self.PROJECT_KEYS])
+
+    def _write_resources(self, db, jresources):
+        db.executemany('INSERT OR REPLACE INTO resources ({0}) VALUES ({1})'.format(
+            ', '.join(self.RESOURCE_COLUMNS), ', '.join('?' for _ in self.RESOURCE_COLUMNS)),
+            (tuple(jresource.get(c) for c in self.RESOURCE_COLUMNS) for jresource in jresources))
+
+    def _to_record(self, row):
+        return dict(zip(self.RESOURCE_COLUMNS, row))
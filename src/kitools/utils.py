@@ -1,5 +1,6 @@
 import os
 import uuid
+import asyncio
 
 
 class Utils:
@@ -45,3 +46,58 @@ class Utils:
         files.sort(key=lambda f: f.name)
 
         return dirs, files
+
+    @staticmethod
+    async def await_all(coroutines):
+        """Runs coroutines concurrently and waits for all of them.
+
+        When one fails the others are cancelled (and waited for) before the error is raised.
+
+        Args:
+            coroutines: The coroutines to run.
+
+        Returns:
+            List of the results (in the same order as the coroutines).
+        """
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        if not tasks:
+            return []
+
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    @staticmethod
+    def append_lines(path, lines, sync=False):
+        """Appends lines to a file (e.g., a journal).
+
+        A partially written last line (e.g., from a crash during a write) is ended first so the new lines are
+        not joined onto it.
+
+        Args:
+            path: The path of the file.
+            lines: List of strings (without line endings).
+            sync: Whether to sync the file to disk after writing.
+
+        Returns:
+            None
+        """
+        if not lines:
+            return
+
+        data = ''.join(line + '\n' for line in lines).encode('utf-8')
+
+        with open(path, 'a+b') as f:
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    data = b'\n' + data
+
+            f.write(data)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
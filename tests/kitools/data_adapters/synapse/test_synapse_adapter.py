@@ -1,5 +1,7 @@
 import pytest
+import asyncio
 import responses
+from concurrent.futures import ThreadPoolExecutor
 from src.kitools.data_adapters import SynapseAdapter
 import synapseclient
 
@@ -20,6 +22,40 @@ def test_client():
     assert client2._loggedIn() is not False
 
 
+def test_checkout_client():
+    client = SynapseAdapter.client()
+
+    # The primary client is checked out when it is free.
+    with SynapseAdapter.checkout_client() as checked_out_client:
+        assert checked_out_client == client
+
+        # The same thread gets the same client.
+        with SynapseAdapter.checkout_client() as nested_client:
+            assert nested_client == client
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with SynapseAdapter.checkout_client():
+            # Other threads get their own client while the primary client is checked out.
+            def _checkout():
+                with SynapseAdapter.checkout_client() as thread_client:
+                    return thread_client
+
+            thread_client = executor.submit(_checkout).result()
+            assert thread_client != client
+            assert thread_client._loggedIn() is not False
+
+
+def test_checkout_client_is_scheduled():
+    scheduler = SynapseAdapter.transfer_scheduler()
+    assert scheduler == SynapseAdapter.transfer_scheduler()
+
+    with SynapseAdapter.checkout_client() as client:
+        assert scheduler.running == 1
+        assert scheduler.observe_response in client._requests_session.hooks['response']
+
+    assert scheduler.running == 0
+
+
 def test_connected():
     assert SynapseAdapter().connected() is True
 
@@ -32,4 +68,32 @@ def test_connected():
         rsps.replace(responses.GET, 'https://repo-prod.prod.sagebase.org/repo/v1/userProfile', status=418)
         assert SynapseAdapter().connected() is False
 
+
+def test_get_children(syn_client, new_syn_project, mk_tempfile):
+    syn_folder = syn_client.store(synapseclient.Folder(name='folder1', parent=new_syn_project))
+    syn_file = syn_client.store(synapseclient.File(path=mk_tempfile(), name='file1', parent=new_syn_project))
+
+    children = SynapseAdapter().get_children(new_syn_project.id)
+    assert sorted(c.id for c in children) == sorted([syn_folder.id, syn_file.id])
+
+    folder = next(c for c in children if c.id == syn_folder.id)
+    assert folder.name == 'folder1'
+    assert folder.is_directory
+
+    file = next(c for c in children if c.id == syn_file.id)
+    assert file.is_file
+    assert file.version == str(syn_file.versionNumber)
+
+
+def test_aget_entity_and_children(syn_client, new_syn_project):
+    syn_folder = syn_client.store(synapseclient.Folder(name='folder1', parent=new_syn_project))
+    adapter = SynapseAdapter()
+    loop = asyncio.get_event_loop()
+
+    remote_entity = loop.run_until_complete(adapter.aget_entity(new_syn_project.id))
+    assert remote_entity.is_project
+
+    children = loop.run_until_complete(adapter.aget_children(new_syn_project.id))
+    assert [c.id for c in children] == [syn_folder.id]
+
 # TODO: add remaining tests.
@@ -0,0 +1,200 @@
+import pytest
+import time
+import threading
+import synapseclient
+from concurrent.futures import ThreadPoolExecutor
+from synapseclient.exceptions import SynapseHTTPError
+from src.kitools.data_adapters.synapse import SynapseClientPool
+from src.kitools.data_adapters.transfer_scheduler import TransferScheduler
+from tests.kitools.data_adapters.test_transfer_scheduler import mk_fake_server, _get
+
+
+@pytest.fixture
+def pool(mocker):
+    def _new_primary_client(self):
+        # Don't log in.
+        client = synapseclient.Synapse(configPath=self._config_path, skip_checks=True)
+        client.credentials = object()
+        return client
+
+    mocker.patch.object(SynapseClientPool, '_new_primary_client', _new_primary_client)
+    pool = SynapseClientPool(max_size=3)
+    yield pool
+    pool.close()
+
+
+def test_it_validates_the_max_size():
+    with pytest.raises(ValueError):
+        SynapseClientPool(max_size=0)
+
+
+def test_it_creates_clients_lazily(pool):
+    assert pool.size == 0
+
+    with pool.checkout() as client:
+        assert client == pool.primary()
+        assert pool.size == 1
+
+    assert pool.available == 1
+
+
+def test_it_gives_the_same_client_to_the_same_thread(pool):
+    with pool.checkout() as client:
+        with pool.checkout() as nested_client:
+            assert nested_client == client
+        assert pool.available == 0
+
+    assert pool.available == 1
+
+
+def test_it_gives_each_thread_its_own_client(pool):
+    barrier = threading.Barrier(3)
+
+    def _checkout(_):
+        with pool.checkout() as client:
+            barrier.wait(timeout=5)
+            return client
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        clients = list(executor.map(_checkout, range(3)))
+
+    assert len(set(clients)) == 3
+    assert pool.size == 3
+
+    # The clients share the primary client's credentials and endpoints but not its connections.
+    primary = pool.primary()
+    for client in clients:
+        assert client.credentials is primary.credentials
+        assert client.repoEndpoint == primary.repoEndpoint
+        if client is not primary:
+            assert client._requests_session is not primary._requests_session
+
+
+def test_it_hands_out_the_primary_client_first(pool):
+    def _checkout():
+        with pool.checkout() as client:
+            return client
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Another thread gets a second client while the primary client is checked out.
+        with pool.checkout() as primary:
+            assert executor.submit(_checkout).result() != primary
+        assert pool.size == 2
+
+        # The primary client is free so it is used.
+        assert executor.submit(_checkout).result() == primary
+
+
+def test_it_waits_for_a_client_when_all_are_checked_out(pool):
+    checked_out = threading.Barrier(4)
+    release = threading.Event()
+
+    def _hold(_):
+        with pool.checkout():
+            checked_out.wait(timeout=5)
+            release.wait(timeout=5)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(_hold, n) for n in range(3)]
+        checked_out.wait(timeout=5)
+
+        with pytest.raises(TimeoutError):
+            with pool.checkout(timeout=0.05):
+                pass
+
+        release.set()
+        for future in futures:
+            future.result()
+
+    with pool.checkout(timeout=1) as client:
+        assert client
+    assert pool.size == 3
+
+
+def test_it_adds_the_response_hook_to_each_client(mocker):
+    mocker.patch.object(SynapseClientPool,
+                        '_new_primary_client',
+                        lambda self: synapseclient.Synapse(configPath=self._config_path, skip_checks=True))
+
+    def _hook(response, *args, **kwargs):
+        pass
+
+    pool = SynapseClientPool(max_size=2, response_hook=_hook)
+    try:
+        def _checkout():
+            with pool.checkout() as client:
+                return client
+
+        with pool.checkout() as primary:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                client = executor.submit(_checkout).result()
+
+        assert client is not primary
+        for client in [primary, client]:
+            assert _hook in client._requests_session.hooks['response']
+    finally:
+        pool.close()
+
+
+@pytest.fixture
+def mk_scheduled_pool(mocker):
+    pools = []
+
+    def _new_primary_client(self):
+        # Don't log in.
+        return synapseclient.Synapse(configPath=self._config_path, skip_checks=True)
+
+    mocker.patch.object(SynapseClientPool, '_new_primary_client', _new_primary_client)
+
+    def _mk(scheduler):
+        pool = SynapseClientPool(max_size=2,
+                                 response_hook=scheduler.observe_response,
+                                 transfer_scheduler=scheduler)
+        pools.append(pool)
+        return pool
+
+    yield _mk
+
+    for pool in pools:
+        pool.close()
+
+
+def test_it_leaves_throttled_calls_to_the_transfer_scheduler(mk_fake_server, mk_scheduled_pool):
+    server = mk_fake_server(0, 0)
+    scheduler = TransferScheduler(max_retries=2, retry_wait=0.01)
+    pool = mk_scheduled_pool(scheduler)
+
+    with pool.checkout() as client:
+        # The client does not retry the throttled calls on its own (it would retry them 60 times).
+        with pytest.raises(SynapseHTTPError):
+            client.restGET(server.url, headers={})
+
+        retry_policy = client._build_retry_policy()
+        assert not set(retry_policy['retry_status_codes']) & set(TransferScheduler.THROTTLE_STATUS_CODES)
+        assert 500 in retry_policy['retry_status_codes']
+
+    assert server.throttled == 3
+    assert scheduler.retries == 2
+    assert scheduler.throttles == 3
+
+
+def test_it_retries_throttled_calls_after_the_retry_after(mk_fake_server, mk_scheduled_pool):
+    server = mk_fake_server(1, 0.3, retry_after=1)
+    scheduler = TransferScheduler(max_concurrency=2)
+    pool = mk_scheduled_pool(scheduler)
+
+    holder = threading.Thread(target=_get, args=(server.url,))
+    holder.start()
+    time.sleep(0.1)
+
+    started_at = time.monotonic()
+    with scheduler.slot(), pool.checkout() as client:
+        client.restGET(server.url, headers={})
+    assert time.monotonic() - started_at >= 1
+
+    assert server.throttled == 1
+    assert server.served == 2
+    assert scheduler.retries == 1
+    assert scheduler.throttles == 1
+
+    holder.join()
@@ -0,0 +1,53 @@
+import pytest
+import os
+from src.kitools.data_adapters import SynapseAdapter
+from src.kitools.data_adapters.synapse import SynapseEntityPathResolver
+import synapseclient
+
+
+@pytest.fixture()
+def syn_tree(syn_client, new_syn_project, mk_tempfile):
+    syn_folder1 = syn_client.store(synapseclient.Folder(name='folder1', parent=new_syn_project))
+    syn_folder2 = syn_client.store(synapseclient.Folder(name='folder2', parent=syn_folder1))
+    syn_files = [syn_client.store(synapseclient.File(path=mk_tempfile(), name='file{0}'.format(i), parent=syn_folder2))
+                 for i in range(3)]
+    return new_syn_project, syn_folder1, syn_folder2, syn_files
+
+
+def test_it_gets_the_path_from_the_project(syn_client, syn_tree):
+    syn_project, syn_folder1, syn_folder2, syn_files = syn_tree
+    resolver = SynapseEntityPathResolver()
+
+    path = resolver.get_path(syn_client, syn_files[0].id)
+    assert [header.get('id') for header in path] == [syn_project.id, syn_folder1.id, syn_folder2.id, syn_files[0].id]
+    assert [header.get('name') for header in path] == [syn_project.name, 'folder1', 'folder2', 'file0']
+    assert path[0].get('type') == SynapseEntityPathResolver.PROJECT_TYPE
+
+    assert resolver.get_path(syn_client, syn_project.id) == path[:1]
+
+
+def test_it_caches_the_ancestors(syn_client, syn_tree, mocker):
+    syn_project, syn_folder1, syn_folder2, syn_files = syn_tree
+    resolver = SynapseEntityPathResolver()
+    mocker.spy(syn_client, 'restGET')
+
+    resolver.get_path(syn_client, syn_folder2.id)
+    assert resolver.get_path(syn_client, syn_folder1.id)[-1].get('id') == syn_folder1.id
+
+    # Entities whose parent has been resolved do not need a request.
+    for syn_file in syn_files:
+        assert resolver.get_path(syn_client, syn_file)[-1].get('id') == syn_file.id
+
+    assert syn_client.restGET.call_count == 1
+    assert resolver.requests == 1
+
+
+def test_get_remote_path(syn_tree):
+    syn_project, syn_folder1, syn_folder2, syn_files = syn_tree
+    adapter = SynapseAdapter()
+
+    assert adapter._get_remote_path(syn_project) == ''
+    assert adapter._get_remote_path(syn_folder1) == 'folder1'
+    for syn_file in syn_files:
+        assert adapter._get_remote_path(syn_file) == os.path.join('folder1', 'folder2', syn_file.name)
+    assert adapter._path_resolver.requests == 2
@@ -0,0 +1,97 @@
+import pytest
+from src.kitools.data_adapters import SynapseAdapter
+from src.kitools.data_adapters.synapse import SynapseFolderCache
+import synapseclient
+from synapseclient.exceptions import SynapseHTTPError
+
+
+@pytest.fixture()
+def syn_parent(syn_client, new_syn_project):
+    syn_client.store(synapseclient.Folder(name='folder1', parent=new_syn_project))
+    syn_client.store(synapseclient.Folder(name='folder2', parent=new_syn_project))
+    return new_syn_project
+
+
+def test_it_lists_a_parent_once(syn_client, syn_parent, mocker):
+    cache = SynapseFolderCache()
+    mocker.spy(syn_client, 'getChildren')
+
+    assert cache.find(syn_client, syn_parent.id, 'folder1').get('name') == 'folder1'
+    assert cache.find(syn_client, syn_parent.id, 'folder2').get('name') == 'folder2'
+    assert cache.find(syn_client, syn_parent.id, 'folder3') is None
+    assert syn_client.getChildren.call_count == 1
+    assert cache.listings == 1
+
+
+def test_it_lists_a_parent_again_when_invalidated(syn_client, syn_parent):
+    cache = SynapseFolderCache()
+    assert cache.find(syn_client, syn_parent.id, 'folder3') is None
+
+    syn_folder = syn_client.store(synapseclient.Folder(name='folder3', parent=syn_parent))
+    assert cache.find(syn_client, syn_parent.id, 'folder3') is None
+
+    cache.invalidate(syn_parent.id)
+    assert cache.find(syn_client, syn_parent.id, 'folder3').get('id') == syn_folder.id
+    assert cache.listings == 2
+
+
+def test_it_adds_created_folders(syn_client, syn_parent):
+    cache = SynapseFolderCache()
+    assert cache.find(syn_client, syn_parent.id, 'folder3') is None
+
+    syn_folder = syn_client.store(synapseclient.Folder(name='folder3', parent=syn_parent))
+    cache.add(syn_parent.id, syn_folder, SynapseAdapter.SYN_FOLDER_TYPE)
+    cache.add_empty(syn_folder.id)
+
+    assert cache.find(syn_client, syn_parent.id, 'folder3').get('id') == syn_folder.id
+    assert cache.find(syn_client, syn_folder.id, 'anything') is None
+    assert cache.listings == 1
+
+
+def test_find_or_create_syn_folder_uses_the_cache(syn_client, syn_parent, mocker):
+    adapter = SynapseAdapter()
+    mocker.spy(SynapseAdapter.client(), 'getChildren')
+    mocker.spy(SynapseAdapter.client(), 'findEntityId')
+
+    assert adapter._find_or_create_syn_folder(syn_parent, 'folder1').name == 'folder1'
+    assert adapter._find_or_create_syn_folder(syn_parent, 'folder2').name == 'folder2'
+
+    syn_folder = adapter._find_or_create_syn_folder(syn_parent, 'folder3')
+    assert syn_client.get(syn_folder.id).name == 'folder3'
+    assert adapter._find_or_create_syn_folder(syn_parent, 'folder3').id == syn_folder.id
+
+    assert SynapseAdapter.client().getChildren.call_count == 1
+    assert SynapseAdapter.client().findEntityId.call_count == 0
+
+
+def test_find_or_create_syn_folder_finds_folders_created_after_listing(syn_client, syn_parent):
+    adapter = SynapseAdapter()
+    assert adapter._find_or_create_syn_folder(syn_parent, 'folder1')
+
+    # Created by someone else after the parent was listed.
+    syn_folder = syn_client.store(synapseclient.Folder(name='folder3', parent=syn_parent))
+    assert adapter._find_or_create_syn_folder(syn_parent, 'folder3').id == syn_folder.id
+
+
+def test_find_or_create_syn_folder_lists_the_parent_once_more_on_a_conflict(syn_client, syn_parent, mocker):
+    adapter = SynapseAdapter()
+    syn_client.store(synapseclient.Folder(name='folder3', parent=syn_parent))
+
+    # The listings do not show the folder yet (they are eventually consistent).
+    mocker.patch.object(SynapseFolderCache, 'find', return_value=None)
+    mocker.spy(SynapseAdapter.client(), 'store')
+
+    with pytest.raises(SynapseHTTPError) as ex:
+        adapter._find_or_create_syn_folder(syn_parent, 'folder3')
+    assert ex.value.response.status_code == 409
+
+    assert SynapseAdapter.client().store.call_count == 1
+    assert SynapseFolderCache.find.call_count == 2
+
+
+def test_find_or_create_syn_folder_raises_when_the_name_is_taken(syn_client, syn_parent, mk_tempfile):
+    syn_file = syn_client.store(synapseclient.File(path=mk_tempfile(), name='file1', parent=syn_parent))
+
+    with pytest.raises(Exception) as ex:
+        SynapseAdapter()._find_or_create_syn_folder(syn_parent, 'file1')
+    assert 'already taken by another entity: {0}'.format(syn_file.id) in str(ex.value)
@@ -0,0 +1,67 @@
+import pytest
+from src.kitools.data_adapters import SynapseAdapter
+from src.kitools.data_adapters.synapse import SynapseRemoteTree
+import synapseclient
+
+
+@pytest.fixture()
+def syn_tree(syn_client, new_syn_project, mk_tempfile):
+    syn_folder1 = syn_client.store(synapseclient.Folder(name='folder1', parent=new_syn_project))
+    syn_folder2 = syn_client.store(synapseclient.Folder(name='folder2', parent=syn_folder1))
+    syn_file1 = syn_client.store(synapseclient.File(path=mk_tempfile(content='file1'), name='file1',
+                                                      parent=syn_folder1))
+    syn_file2 = syn_client.store(synapseclient.File(path=mk_tempfile(content='file2'), name='file2',
+                                                      parent=syn_folder2))
+    return new_syn_project, syn_folder1, syn_folder2, syn_file1, syn_file2
+
+
+def test_it_lists_the_whole_tree(syn_tree):
+    syn_project, syn_folder1, syn_folder2, syn_file1, syn_file2 = syn_tree
+    tree = SynapseRemoteTree.build(SynapseAdapter.checkout_client, syn_project.id)
+
+    assert tree.root_id == syn_project.id
+    assert len(tree) == 4
+    assert [e.get('id') for e in tree.folders] == [syn_folder1.id, syn_folder2.id]
+    assert sorted(e.get('id') for e in tree.files) == sorted([syn_file1.id, syn_file2.id])
+
+    assert tree.get(syn_folder2.id).get('path') == 'folder1/folder2'
+    assert tree.get(syn_folder2.id).get('parentId') == syn_folder1.id
+    assert tree.get(syn_file2.id).get('path') == 'folder1/folder2/file2'
+    assert tree.get(syn_file2.id).get('versionNumber') == syn_file2.versionNumber
+    assert tree.get(syn_file2.id).get('md5') is None
+
+    assert [e.get('id') for e in tree.get_children(syn_folder2.id)] == [syn_file2.id]
+    assert tree.get_children(syn_file2.id) == []
+
+
+def test_it_lists_parents_before_their_children(syn_tree):
+    syn_project, syn_folder1, syn_folder2, _, _ = syn_tree
+    tree = SynapseRemoteTree.build(SynapseAdapter.checkout_client, syn_project.id, max_workers=4)
+
+    listed = [syn_project.id]
+    for syn_parent_id, syn_children in tree.iter_children():
+        assert syn_parent_id in listed
+        listed += [e.get('id') for e in syn_children]
+    assert listed.index(syn_folder1.id) < listed.index(syn_folder2.id)
+
+
+def test_it_gets_the_file_handles(syn_tree):
+    syn_project, _, _, syn_file1, syn_file2 = syn_tree
+    tree = SynapseRemoteTree.build(SynapseAdapter.checkout_client,
+                                   syn_project.id,
+                                   max_workers=4,
+                                   include_file_handles=True)
+
+    for syn_file in [syn_file1, syn_file2]:
+        entity = tree.get(syn_file.id)
+        assert entity.get('md5') == syn_file._file_handle.get('contentMd5')
+        assert entity.get('size') == len(syn_file.name)
+
+
+def test_it_lists_the_same_tree_concurrently(syn_tree):
+    syn_project = syn_tree[0]
+    serial = SynapseRemoteTree.build(SynapseAdapter.checkout_client, syn_project.id)
+    concurrent = SynapseRemoteTree.build(SynapseAdapter.checkout_client, syn_project.id, max_workers=8)
+
+    assert sorted((e.get('id'), e.get('path')) for e in serial.entities) == \
+           sorted((e.get('id'), e.get('path')) for e in concurrent.entities)
@@ -0,0 +1,191 @@
+import pytest
+import os
+import re
+import hashlib
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from src.kitools.data_adapters.segmented_download import SegmentedDownload
+
+
+class FakeFileServer(ThreadingMixIn, HTTPServer):
+    """A local server that serves a file with byte ranges.
+
+    Requests for the URLs in expired_paths get a 403. When fail_after is set a response is cut off after that many
+    bytes. When ranges is False the Range header is ignored.
+    """
+    daemon_threads = True
+
+    def __init__(self, content, ranges=True):
+        super(FakeFileServer, self).__init__(('127.0.0.1', 0), FakeFileHandler)
+        self.content = content
+        self.ranges = ranges
+        self.expired_paths = set()
+        self.fail_after = None
+        self.lock = threading.Lock()
+        self.requests = []
+        self.bytes_sent = 0
+
+    def url(self, path='file'):
+        return 'http://127.0.0.1:{0}/{1}'.format(self.server_address[1], path)
+
+
+class FakeFileHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+        range_header = self.headers.get('Range')
+
+        with server.lock:
+            server.requests.append(range_header)
+
+        if self.path.lstrip('/') in server.expired_paths:
+            self.send_response(403)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        match = re.match(r'bytes=(\d+)-(\d+)', range_header or '')
+        if match and server.ranges:
+            start, end = int(match.group(1)), int(match.group(2)) + 1
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {0}-{1}/{2}'.format(start, end - 1, len(server.content)))
+        else:
+            start, end = 0, len(server.content)
+            self.send_response(200)
+
+        body = server.content[start:end]
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        if server.fail_after is not None:
+            body = body[:server.fail_after]
+
+        self.wfile.write(body)
+        with server.lock:
+            server.bytes_sent += len(body)
+
+        if server.fail_after is not None:
+            # Cut the response off.
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def mk_fake_file_server():
+    servers = []
+
+    def _mk(*args, **kwargs):
+        server = FakeFileServer(*args, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield _mk
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def content():
+    return os.urandom(1024 * 1024 + 123)
+
+
+def _md5(content):
+    return hashlib.md5(content).hexdigest()
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_it_downloads_the_file_in_segments(mk_fake_file_server, mk_tempdir, content):
+    server = mk_fake_file_server(content)
+    path = os.path.join(mk_tempdir(), 'large.bin')
+
+    download = SegmentedDownload(lambda: server.url(), path, len(content), _md5(content), 4)
+    assert download.download() == path
+
+    assert _read(path) == content
+    assert len(server.requests) == 4
+    assert all(segment[2] == segment[1] - segment[0] for segment in download.segments)
+    assert not os.path.exists(path + SegmentedDownload.PART_SUFFIX)
+    assert not os.path.exists(path + SegmentedDownload.STATE_SUFFIX)
+
+
+def test_it_resumes_partial_segments(mk_fake_file_server, mk_tempdir, content):
+    server = mk_fake_file_server(content)
+    path = os.path.join(mk_tempdir(), 'large.bin')
+
+    # Each segment is cut off part of the way through.
+    server.fail_after = 100 * 1024
+    with pytest.raises(Exception):
+        SegmentedDownload(lambda: server.url(), path, len(content), _md5(content), 4, max_retries=0).download()
+
+    assert os.path.exists(path + SegmentedDownload.PART_SUFFIX)
+    assert os.path.exists(path + SegmentedDownload.STATE_SUFFIX)
+    assert not os.path.exists(path)
+
+    server.fail_after = None
+    server.bytes_sent = 0
+
+    download = SegmentedDownload(lambda: server.url(), path, len(content), _md5(content), 4)
+    download.download()
+
+    assert _read(path) == content
+    assert download.resumed_bytes > 0
+    assert server.bytes_sent == len(content) - download.resumed_bytes
+
+
+def test_it_retries_segments_that_were_cut_off(mk_fake_file_server, mk_tempdir, content):
+    server = mk_fake_file_server(content)
+    path = os.path.join(mk_tempdir(), 'large.bin')
+    server.fail_after = 400 * 1024
+
+    download = SegmentedDownload(lambda: server.url(), path, len(content), _md5(content), 2, max_retries=5)
+    download.download()
+
+    assert _read(path) == content
+    assert len(server.requests) > 2
+
+
+def test_it_gets_a_new_url_when_the_url_expires(mk_fake_file_server, mk_tempdir, content):
+    server = mk_fake_file_server(content)
+    server.expired_paths.add('expired')
+    path = os.path.join(mk_tempdir(), 'large.bin')
+    urls = [server.url('expired'), server.url('file')]
+
+    def _get_url():
+        return urls.pop(0)
+
+    SegmentedDownload(_get_url, path, len(content), _md5(content), 4).download()
+
+    assert _read(path) == content
+    assert urls == []
+
+
+def test_it_checks_the_md5(mk_fake_file_server, mk_tempdir, content):
+    server = mk_fake_file_server(content)
+    path = os.path.join(mk_tempdir(), 'large.bin')
+
+    with pytest.raises(Exception) as ex:
+        SegmentedDownload(lambda: server.url(), path, len(content), _md5(b'other'), 4).download()
+    assert 'MD5' in str(ex.value)
+
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + SegmentedDownload.PART_SUFFIX)
+    assert not os.path.exists(path + SegmentedDownload.STATE_SUFFIX)
+
+
+def test_it_requires_ranged_downloads(mk_fake_file_server, mk_tempdir, content):
+    server = mk_fake_file_server(content, ranges=False)
+    path = os.path.join(mk_tempdir(), 'large.bin')
+
+    with pytest.raises(Exception) as ex:
+        SegmentedDownload(lambda: server.url(), path, len(content), _md5(content), 4).download()
+    assert 'ranged downloads' in str(ex.value)
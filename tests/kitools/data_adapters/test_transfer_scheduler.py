@@ -0,0 +1,317 @@
+import pytest
+import time
+import threading
+import requests
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from src.kitools.data_adapters.transfer_scheduler import TransferScheduler
+
+
+class FakeServer(ThreadingMixIn, HTTPServer):
+    """A local server that can handle `capacity` requests at a time, each taking `service_time` seconds.
+
+    When throttle is True requests over the capacity get a 429 (with retry_after as the Retry-After if set),
+    otherwise they are queued (so their latency grows).
+    """
+    daemon_threads = True
+
+    def __init__(self, capacity, service_time, throttle=True, retry_after=None):
+        super(FakeServer, self).__init__(('127.0.0.1', 0), FakeHandler)
+        self.capacity = capacity
+        self.service_time = service_time
+        self.throttle = throttle
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.semaphore = threading.Semaphore(capacity)
+        self.active = 0
+        self.served = 0
+        self.throttled = 0
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{0}/'.format(self.server_address[1])
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+
+        if server.throttle:
+            with server.lock:
+                over_capacity = server.active >= server.capacity
+                if over_capacity:
+                    server.throttled += 1
+                else:
+                    server.active += 1
+
+            if over_capacity:
+                self.send_response(429)
+                if server.retry_after is not None:
+                    self.send_header('Retry-After', str(server.retry_after))
+                self.end_headers()
+                return
+
+            time.sleep(server.service_time)
+            with server.lock:
+                server.active -= 1
+                server.served += 1
+        else:
+            with server.semaphore:
+                time.sleep(server.service_time)
+            with server.lock:
+                server.served += 1
+
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def mk_fake_server():
+    servers = []
+
+    def _mk(*args, **kwargs):
+        server = FakeServer(*args, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield _mk
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _get(url):
+    response = requests.get(url)
+    response.raise_for_status()
+    return response
+
+
+def _drive(scheduler, url, workers, duration, kind=None):
+    """Calls the URL from many threads for a duration.
+
+    Returns:
+        Tuple: (successful calls, list of the scheduler's concurrency sampled over the second half)
+    """
+    stop_at = time.monotonic() + duration
+    successes = []
+    samples = []
+
+    def _work():
+        count = 0
+        while time.monotonic() < stop_at:
+            scheduler.run(_get, url, kind=kind)
+            count += 1
+        successes.append(count)
+
+    threads = [threading.Thread(target=_work) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    half_at = time.monotonic() + duration / 2
+    while time.monotonic() < stop_at:
+        if time.monotonic() >= half_at:
+            samples.append(scheduler.concurrency)
+        time.sleep(0.01)
+
+    for thread in threads:
+        thread.join()
+
+    return sum(successes), samples
+
+
+def test_it_validates_the_limits():
+    with pytest.raises(ValueError):
+        TransferScheduler(min_concurrency=0)
+    with pytest.raises(ValueError):
+        TransferScheduler(max_concurrency=1, min_concurrency=2)
+    with pytest.raises(ValueError):
+        TransferScheduler(decrease_factor=1)
+
+
+def _fixed_throughput(mk_fake_server, capacity, service_time, duration, **kwargs):
+    """Gets the throughput of calling a fake server at exactly its capacity (the best a scheduler can do)."""
+    server = mk_fake_server(capacity, service_time, **kwargs)
+    scheduler = TransferScheduler(max_concurrency=capacity, min_concurrency=capacity, latency_factor=None)
+    successes, _ = _drive(scheduler, server.url, workers=32, duration=duration)
+    return successes / duration
+
+
+def test_it_converges_to_the_throttling_limit(mk_fake_server):
+    capacity, service_time, duration = 8, 0.02, 2
+    server = mk_fake_server(capacity, service_time)
+    scheduler = TransferScheduler(max_concurrency=32, initial_concurrency=1, retry_wait=0.005, max_retries=100)
+
+    successes, samples = _drive(scheduler, server.url, workers=32, duration=duration, kind='request')
+
+    # It grows from 1 and settles around the server's capacity.
+    average = sum(samples) / len(samples)
+    assert capacity * 0.5 <= average <= capacity * 1.5
+    assert scheduler.throttles > 0
+
+    # Most of the server's sustainable throughput is used.
+    max_throughput = _fixed_throughput(mk_fake_server, capacity, service_time, duration)
+    assert successes / duration >= max_throughput * 0.6
+
+
+def test_it_converges_on_latency(mk_fake_server):
+    capacity, service_time, duration = 4, 0.02, 2
+    server = mk_fake_server(capacity, service_time, throttle=False)
+    scheduler = TransferScheduler(max_concurrency=32, latency_factor=2.0)
+
+    successes, samples = _drive(scheduler, server.url, workers=32, duration=duration, kind='request')
+
+    # Requests over the capacity are queued by the server so their latency grows and the limit is kept well
+    # below the maximum.
+    average = sum(samples) / len(samples)
+    assert average <= capacity * 4
+    assert scheduler.throttles == 0
+
+    max_throughput = _fixed_throughput(mk_fake_server, capacity, service_time, duration, throttle=False)
+    assert successes / duration >= max_throughput * 0.6
+
+
+def test_it_honors_retry_after(mk_fake_server):
+    server = mk_fake_server(1, 0.3, retry_after=1)
+    scheduler = TransferScheduler(max_concurrency=2)
+
+    holder = threading.Thread(target=scheduler.run, args=(_get, server.url))
+    holder.start()
+    time.sleep(0.1)
+
+    # Throttled with a Retry-After of 1 second so it is retried after the pause.
+    started_at = time.monotonic()
+    scheduler.run(_get, server.url)
+    assert time.monotonic() - started_at >= 1
+    assert scheduler.retries == 1
+    assert scheduler.throttles == 1
+
+    holder.join()
+
+
+def test_it_gives_up_after_max_retries(mk_fake_server):
+    server = mk_fake_server(0, 0)
+    scheduler = TransferScheduler(max_retries=2, retry_wait=0.01)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        scheduler.run(_get, server.url)
+
+    assert scheduler.retries == 2
+    assert scheduler.throttles == 3
+
+
+def test_it_leaves_retries_to_the_outer_run(mk_fake_server):
+    server = mk_fake_server(0, 0)
+    scheduler = TransferScheduler(max_retries=2, retry_wait=0.01)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        scheduler.run(scheduler.run, _get, server.url)
+
+    # Only the outer run retried the call and its slot was given up while it waited.
+    assert server.throttled == 3
+    assert scheduler.retries == 2
+    assert scheduler.running == 0
+
+
+def test_it_does_not_count_observed_throttles_again(mk_fake_server):
+    server = mk_fake_server(0, 0)
+    scheduler = TransferScheduler(max_retries=0)
+
+    def _get_observed(url):
+        response = requests.get(url, hooks={'response': scheduler.observe_response})
+        response.raise_for_status()
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        scheduler.run(_get_observed, server.url)
+
+    assert scheduler.throttles == 1
+
+
+def test_it_cuts_the_limit_once_per_window_on_errors():
+    scheduler = TransferScheduler(max_concurrency=16)
+
+    class ServerError(Exception):
+        response = type('Response', (), {'status_code': 500, 'headers': {}})()
+
+    barrier = threading.Barrier(4)
+
+    def _fail():
+        with pytest.raises(ServerError):
+            with scheduler.slot():
+                barrier.wait(timeout=5)
+                raise ServerError()
+
+    threads = [threading.Thread(target=_fail) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # The calls all started before the first failure so the limit is only cut once.
+    assert scheduler.errors == 4
+    assert scheduler.concurrency == 8
+
+    # Errors that are not from the remote service don't cut it.
+    with pytest.raises(ValueError):
+        with scheduler.slot():
+            raise ValueError()
+    assert scheduler.concurrency == 8
+
+
+def test_it_observes_throttled_responses():
+    scheduler = TransferScheduler(max_concurrency=16)
+    response = requests.Response()
+    response.status_code = 429
+    response.headers['Retry-After'] = '0.2'
+
+    scheduler.observe_response(response)
+
+    assert scheduler.throttles == 1
+    assert scheduler.concurrency == 8
+
+    # New calls wait for the Retry-After.
+    started_at = time.monotonic()
+    with scheduler.slot():
+        pass
+    assert time.monotonic() - started_at >= 0.15
+
+
+def test_it_exposes_the_queue_depth():
+    scheduler = TransferScheduler(max_concurrency=1)
+    release = threading.Event()
+
+    def _hold():
+        with scheduler.slot():
+            release.wait(timeout=5)
+
+    threads = [threading.Thread(target=_hold) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+
+    while scheduler.queue_depth < 2:
+        time.sleep(0.01)
+
+    assert scheduler.running == 1
+    assert scheduler.queue_depth == 2
+
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert scheduler.running == 0
+    assert scheduler.queue_depth == 0
+
+
+def test_a_thread_does_not_wait_for_its_own_slot():
+    scheduler = TransferScheduler(max_concurrency=1)
+
+    with scheduler.slot():
+        with scheduler.slot():
+            assert scheduler.running == 1
+
+    assert scheduler.running == 0
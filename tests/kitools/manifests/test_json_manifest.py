@@ -0,0 +1,60 @@
+import pytest
+import json
+from src.kitools import KiProject
+
+
+@pytest.fixture()
+def json_kiproject(mk_kiproject):
+    return mk_kiproject(with_fake_project_files=True,
+                        with_fake_project_files_count=3,
+                        with_non_root_project_files=True,
+                        with_non_root_project_files_count=2)
+
+
+def test_it_does_not_load_the_resources_until_they_are_found(json_kiproject):
+    root = json_kiproject.find_project_resources_by(root_id=None)[0]
+
+    loaded = KiProject(json_kiproject.local_path)
+    assert not loaded.resources.loaded
+
+    found = loaded.find_project_resource_by(remote_uri=root.remote_uri)
+    assert found.to_json() == root.to_json()
+    assert loaded.find_project_resource_by(remote_uri=root.remote_uri) is found
+    assert not loaded.resources.loaded
+
+    assert len(loaded.resources) == len(json_kiproject.resources)
+    assert loaded.resources.loaded
+
+
+def test_it_finds_resources_by_serialized_and_non_serialized_attributes(json_kiproject):
+    child = json_kiproject.find_project_resources_by(root_id=None)[0]
+    child = json_kiproject.find_project_resources_by(root_id=child.id)[0]
+
+    loaded = KiProject(json_kiproject.local_path)
+    assert loaded.find_project_resource_by(rel_path=child.rel_path).id == child.id
+    assert loaded.find_project_resource_by(abs_path=child.abs_path).id == child.id
+    assert loaded.find_project_resource_by(data_type=child.data_type.name, name=child.name).id == child.id
+    assert not loaded.resources.loaded
+
+    # Attributes that are not serialized load all the resources.
+    roots = loaded.find_project_resources_by(root_resource=None)
+    assert len(roots) == len(json_kiproject.find_project_resources_by(root_id=None))
+    assert loaded.resources.loaded
+
+
+def test_it_saves_without_loading_all_the_resources(json_kiproject):
+    with open(json_kiproject._config_path) as f:
+        expected_names = sorted(r['name'] for r in json.load(f)['resources'])
+
+    loaded = KiProject(json_kiproject.local_path)
+    resource = loaded.find_project_resources_by(root_id=None)[0]
+    expected_names[expected_names.index(resource.name)] = 'new name'
+    loaded.data_change(resource, name='new name')
+    assert not loaded.resources.loaded
+
+    with open(json_kiproject._config_path) as f:
+        assert sorted(r['name'] for r in json.load(f)['resources']) == sorted(expected_names)
+
+    reloaded = KiProject(json_kiproject.local_path)
+    assert reloaded.find_project_resource_by(id=resource.id).name == 'new name'
+    assert len(reloaded.resources) == len(json_kiproject.resources)
@@ -0,0 +1,109 @@
+import pytest
+import os
+import json
+from src.kitools import KiProject
+from src.kitools.manifests import JsonManifest, SqliteManifest
+
+
+@pytest.fixture()
+def sqlite_kiproject(mk_kiproject):
+    kiproject = mk_kiproject(with_fake_project_files=True,
+                             with_fake_project_files_count=3,
+                             with_non_root_project_files=True,
+                             with_non_root_project_files_count=2)
+    return KiProject(kiproject.local_path, manifest='sqlite')
+
+
+def assert_matches_resources(kiprojectA, kiprojectB):
+    assert len(kiprojectA.resources) == len(kiprojectB.resources)
+    for resourceA in kiprojectA.resources:
+        resourceB = kiprojectB.find_project_resource_by(id=resourceA.id)
+        assert resourceB
+        assert resourceB.to_json() == resourceA.to_json()
+
+
+def test_it_converts_a_json_kiproject_to_sqlite(mk_kiproject):
+    kiproject = mk_kiproject(with_fake_project_files=True, with_fake_project_files_count=3)
+    converted = KiProject(kiproject.local_path, manifest='sqlite')
+
+    assert isinstance(converted._manifest, SqliteManifest)
+    assert os.path.isfile(converted._manifest.path)
+    assert not os.path.isfile(kiproject._config_path)
+
+    loaded = KiProject(kiproject.local_path)
+    assert isinstance(loaded._manifest, SqliteManifest)
+    assert loaded.title == kiproject.title
+    assert loaded.project_uri == kiproject.project_uri
+    assert loaded.data_ignores == kiproject.data_ignores
+    assert_matches_resources(kiproject, loaded)
+
+
+def test_it_converts_a_sqlite_kiproject_to_json(sqlite_kiproject):
+    converted = KiProject(sqlite_kiproject.local_path, manifest='json')
+
+    assert isinstance(converted._manifest, JsonManifest)
+    assert not os.path.isfile(sqlite_kiproject._manifest.path)
+    assert_matches_resources(sqlite_kiproject, KiProject(sqlite_kiproject.local_path))
+
+
+def test_it_only_loads_the_resources_that_are_found(sqlite_kiproject):
+    root = sqlite_kiproject.find_project_resources_by(root_id=None)[0]
+
+    loaded = KiProject(sqlite_kiproject.local_path)
+    found = loaded.find_project_resource_by(remote_uri=root.remote_uri)
+    assert found.to_json() == root.to_json()
+    assert loaded.find_project_resource_by(remote_uri=root.remote_uri) is found
+
+    # The full list has not been loaded.
+    assert loaded.resources._source is not None
+    assert len(loaded.resources) == len(sqlite_kiproject.resources)
+    assert loaded.resources._source is None
+    assert found in loaded.resources
+
+
+def test_it_saves_resource_changes(sqlite_kiproject, mk_uniq_string):
+    root = sqlite_kiproject.find_project_resources_by(root_id=None)[0]
+    children = sqlite_kiproject.find_project_resources_by(root_id=root.id)
+    assert children
+
+    new_name = mk_uniq_string()
+    sqlite_kiproject.data_change(children[0], name=new_name)
+    sqlite_kiproject.data_remove(root)
+
+    loaded = KiProject(sqlite_kiproject.local_path)
+    assert loaded.find_project_resource_by(id=root.id) is None
+    assert loaded.find_project_resources_by(root_id=root.id) == []
+    assert loaded.find_project_resource_by(name=new_name) is None
+    assert_matches_resources(sqlite_kiproject, loaded)
+
+
+def test_it_finds_records_by_indexed_columns(sqlite_kiproject):
+    manifest = sqlite_kiproject._manifest
+
+    for resource in sqlite_kiproject.resources:
+        jresource = resource.to_json()
+        assert manifest.find_records(id=resource.id) == [jresource]
+        assert manifest.find_records(abs_path=resource.abs_path) == [jresource]
+        assert manifest.find_records(rel_path=resource.rel_path) == [jresource]
+        assert jresource in manifest.find_records(root_id=resource.root_id)
+        assert jresource in manifest.find_records(data_type=resource.data_type)
+        assert jresource in manifest.find_records(operator='or', name='not a name', remote_uri=resource.remote_uri)
+
+    assert manifest.find_records(root_path='not a column') is None
+
+
+def test_it_imports_and_exports_json(sqlite_kiproject, mk_tempdir):
+    json_path = os.path.join(mk_tempdir(), JsonManifest.FILENAME)
+    sqlite_kiproject._manifest.export_json(json_path)
+
+    with open(json_path) as f:
+        jconfig = json.load(f)
+
+    assert jconfig['title'] == sqlite_kiproject.title
+    assert jconfig['project_uri'] == sqlite_kiproject.project_uri
+    assert len(jconfig['resources']) == len(sqlite_kiproject.resources)
+
+    manifest = SqliteManifest(mk_tempdir())
+    manifest.import_json(json_path)
+    assert manifest.load()['title'] == sqlite_kiproject.title
+    assert list(manifest.iter_records()) == jconfig['resources']
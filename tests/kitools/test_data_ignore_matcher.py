@@ -0,0 +1,64 @@
+import pytest
+import os
+from src.kitools import KiProject
+from src.kitools.data_ignore_matcher import DataIgnoreMatcher
+
+
+@pytest.fixture()
+def default_matcher():
+    return DataIgnoreMatcher(KiProject.DEFAULT_DATA_IGNORES)
+
+
+def assert_matches(matcher, rel_path, is_dir=False, expected=True):
+    abs_path = os.path.join(os.sep, 'project', 'data', rel_path)
+    assert matcher.matches(abs_path, rel_path, is_dir) is expected
+
+
+def test_it_matches_names_at_any_depth(default_matcher):
+    for rel_path in ['.DS_Store', 'a/.DS_Store', 'a/b/.DS_Store', 'file.csv~', '._file.csv', 'a/shortcut.lnk']:
+        assert_matches(default_matcher, rel_path)
+
+    for rel_path in ['file.csv', 'a/b/file.csv', 'DS_Store', 'lnk']:
+        assert_matches(default_matcher, rel_path, expected=False)
+
+
+def test_it_matches_character_sets(default_matcher):
+    assert_matches(default_matcher, 'desktop.ini')
+    assert_matches(default_matcher, 'Desktop.ini')
+
+    matcher = DataIgnoreMatcher(['[!a]x.csv'])
+    assert_matches(matcher, 'bx.csv')
+    assert_matches(matcher, 'ax.csv', expected=False)
+
+
+def test_it_matches_directory_only_patterns(default_matcher):
+    assert_matches(default_matcher, '$RECYCLE.BIN', is_dir=True)
+    assert_matches(default_matcher, 'a/$RECYCLE.BIN', is_dir=True)
+    assert_matches(default_matcher, '$RECYCLE.BIN', is_dir=False, expected=False)
+
+
+def test_it_matches_paths_relative_to_the_root():
+    matcher = DataIgnoreMatcher(['raw/*.tmp', 'a/**/b'])
+    assert_matches(matcher, 'raw/file.tmp')
+    assert_matches(matcher, 'other/raw/file.tmp', expected=False)
+    assert_matches(matcher, 'raw/sub/file.tmp', expected=False)
+    assert_matches(matcher, 'a/b')
+    assert_matches(matcher, 'a/x/y/b')
+
+
+def test_it_matches_absolute_paths():
+    abs_path = os.path.join(os.sep, 'project', 'data', 'file.csv')
+    matcher = DataIgnoreMatcher([abs_path])
+    assert matcher.matches(abs_path, 'file.csv', False)
+    assert not matcher.matches(abs_path + '2', 'file.csv2', False)
+
+
+def test_it_walks_and_prunes_ignored_directories(default_matcher, mk_tempdir, write_file):
+    root = mk_tempdir()
+    for rel_path in ['a/1.csv', 'a/.DS_Store', '$RECYCLE.BIN/junk/x.csv', 'b/c/2.csv', 'b/c/.nfs1', 'z.csv']:
+        write_file(os.path.join(root, rel_path), 'test')
+
+    walked = [os.path.relpath(path, start=root) for path, _ in default_matcher.walk(root)]
+
+    assert walked == ['a', 'b', 'z.csv', os.path.join('a', '1.csv'), os.path.join('b', 'c'),
+                      os.path.join('b', 'c', '2.csv')]
@@ -0,0 +1,54 @@
+import pytest
+import os
+from src.kitools import DataType
+from src.kitools.data_type_trie import DataTypeTrie
+
+
+@pytest.fixture()
+def project_path():
+    return os.path.join(os.sep, 'tmp', 'project')
+
+
+@pytest.fixture()
+def data_types(project_path):
+    return [
+        DataType(project_path, 'core', os.path.join('data', 'core')),
+        DataType(project_path, 'nested', os.path.join('data', 'core', 'nested')),
+        DataType(project_path, 'results', 'results')
+    ]
+
+
+def test_it_finds_the_longest_matching_data_type(project_path, data_types):
+    trie = DataTypeTrie(data_types)
+    core, nested, results = data_types
+
+    assert trie.find(core.abs_path) == core
+    assert trie.find(os.path.join(core.abs_path, 'file.csv')) == core
+    assert trie.find(os.path.join(nested.abs_path, 'folder', 'file.csv')) == nested
+    assert trie.find(os.path.join(results.abs_path, 'file.csv')) == results
+    assert trie.find(os.path.join(project_path, 'data')) is None
+    assert trie.find(os.path.join(os.sep, 'other', 'data', 'core')) is None
+
+
+def test_it_matches_on_path_components(project_path, data_types):
+    trie = DataTypeTrie(data_types)
+    core = data_types[0]
+
+    assert trie.find(os.path.join(project_path, 'data', 'core2', 'file.csv')) is None
+    assert trie.find(os.path.join(core.abs_path, 'nested2', 'file.csv')) == core
+
+
+def test_it_finds_many(project_path, data_types):
+    trie = DataTypeTrie(data_types)
+    core, nested, results = data_types
+
+    paths = [
+        os.path.join(core.abs_path, 'a.csv'),
+        os.path.join(core.abs_path, 'nested'),
+        os.path.join(core.abs_path, 'b.csv'),
+        os.path.join(project_path, 'data', 'core2'),
+        os.path.join(results.abs_path, 'c.csv')
+    ]
+
+    assert trie.find_many(paths) == [core, nested, core, None, results]
+    assert trie.find_many(paths) == [trie.find(path) for path in paths]
@@ -3,11 +3,14 @@ import os
 import json as JSON
 import uuid
 import shutil
+import asyncio
 from random import sample
 import synapseclient
 from collections import deque
 from src.kitools import KiProject, KiProjectResource, DataUri, SysPath, DataType, DataTypeTemplate
-from src.kitools import NotADataTypePathError, DataTypeMismatchError
+from src.kitools import NotADataTypePathError, DataTypeMismatchError, OfflineModeError
+from src.kitools.data_adapters import SynapseAdapter
+from src.kitools.ki_project_pull_index import KiProjectPullIndex
 
 
 @pytest.fixture(scope='session')
@@ -781,6 +784,309 @@ def test_it_pulls_a_folder_matching_the_data_structure(mk_kiproject, syn_data):
         # TODO: check that file/folders exist locally
 
 
+def test_it_pulls_a_folder_concurrently(mk_kiproject, syn_data, syn_client):
+    syn_project, syn_folders, syn_files = syn_data
+
+    serial_kiproject = mk_kiproject()
+    concurrent_kiproject = mk_kiproject()
+
+    for syn_folder in syn_folders:
+        syn_folder_uri = DataUri('syn', syn_folder.id).uri
+
+        serial_kiproject.data_pull(serial_kiproject.data_add(syn_folder_uri), max_workers=1)
+        resource = concurrent_kiproject.data_pull(concurrent_kiproject.data_add(syn_folder_uri), max_workers=4)
+        assert resource
+        assert os.path.isdir(resource.abs_path)
+
+    # The same resources are added and the same files are downloaded.
+    for serial_resource in serial_kiproject.resources:
+        resource = concurrent_kiproject.find_project_resource_by(remote_uri=serial_resource.remote_uri)
+        assert resource
+        assert resource.rel_path == serial_resource.rel_path
+        assert resource.data_type.name == serial_resource.data_type.name
+        assert os.path.exists(resource.abs_path)
+
+    assert len(concurrent_kiproject.resources) == len(serial_kiproject.resources)
+
+    # The resources are saved.
+    assert len(KiProject(concurrent_kiproject.local_path).resources) == len(serial_kiproject.resources)
+
+
+def test_it_pulls_asynchronously(mk_kiproject, syn_data):
+    syn_project, syn_folders, syn_files = syn_data
+
+    serial_kiproject = mk_kiproject()
+    async_kiproject = mk_kiproject()
+
+    for syn_entity in syn_folders + syn_files:
+        syn_uri = DataUri('syn', syn_entity.id).uri
+        serial_kiproject.data_add(syn_uri)
+        async_kiproject.data_add(syn_uri)
+
+    serial_kiproject.data_pull(max_workers=1)
+    results = asyncio.get_event_loop().run_until_complete(async_kiproject.adata_pull(max_workers=8))
+    assert len(results) == len(syn_folders) + len(syn_files)
+
+    # The same resources are added and the same files are downloaded.
+    for serial_resource in serial_kiproject.resources:
+        resource = async_kiproject.find_project_resource_by(remote_uri=serial_resource.remote_uri)
+        assert resource
+        assert resource.rel_path == serial_resource.rel_path
+        assert os.path.exists(resource.abs_path)
+
+    # The resources are saved.
+    assert len(KiProject(async_kiproject.local_path).resources) == len(serial_kiproject.resources)
+
+
+def test_it_pulls_all_the_resources_together(mk_kiproject, syn_data, mocker):
+    syn_project, syn_folders, syn_files = syn_data
+
+    kiproject = mk_kiproject()
+    for syn_entity in syn_folders + syn_files:
+        kiproject.data_add(DataUri('syn', syn_entity.id).uri)
+
+    mocker.spy(SynapseAdapter, 'data_pull_many')
+    mocker.spy(SynapseAdapter, 'data_pull')
+    results = kiproject.data_pull()
+    assert len(results) == len(syn_folders) + len(syn_files)
+
+    # All the resources are pulled by one call to the data adapter.
+    assert SynapseAdapter.data_pull_many.call_count == 1
+    assert SynapseAdapter.data_pull.call_count == 0
+
+    for resource in kiproject.resources:
+        assert os.path.exists(resource.abs_path)
+
+
+def test_it_fetches_the_metadata_once_per_file(mk_kiproject, syn_data, mocker):
+    syn_project, syn_folders, syn_files = syn_data
+    syn_folder_uri = DataUri('syn', syn_folders[0].id).uri
+
+    for max_workers in [1, 4]:
+        kiproject = mk_kiproject()
+        kiproject.data_add(syn_folder_uri)
+
+        mocker.spy(synapseclient.Synapse, '_getEntityBundle')
+        kiproject.data_pull(syn_folder_uri, max_workers=max_workers)
+
+        file_resources = [r for r in kiproject.resources if os.path.isfile(r.abs_path)]
+        assert file_resources
+
+        # One for the folder and one for each file.
+        assert synapseclient.Synapse._getEntityBundle.call_count == len(file_resources) + 1
+        mocker.stopall()
+
+
+def test_it_caches_the_metadata_between_sessions(mk_kiproject, syn_data, mocker):
+    syn_project, syn_folders, syn_files = syn_data
+    syn_folder_uri = DataUri('syn', syn_folders[0].id).uri
+
+    kiproject = mk_kiproject()
+    kiproject.data_add(syn_folder_uri)
+    kiproject.data_pull(syn_folder_uri)
+    assert kiproject._metadata_cache.exists
+
+    # Within the TTL the folder's metadata is not fetched again.
+    kiproject = KiProject(kiproject.local_path)
+    mocker.spy(synapseclient.Synapse, '_getEntityBundle')
+    kiproject.data_pull(syn_folder_uri)
+    assert synapseclient.Synapse._getEntityBundle.call_count == 0
+    assert kiproject._metadata_cache.hits == 1
+    mocker.stopall()
+
+    # After the TTL the folder's metadata is revalidated.
+    kiproject = KiProject(kiproject.local_path, metadata_ttl=0)
+    mocker.spy(synapseclient.Synapse, '_getEntityBundle')
+    kiproject.data_pull(syn_folder_uri)
+    assert synapseclient.Synapse._getEntityBundle.call_count == 0
+    assert kiproject._metadata_cache.revalidations == 1
+    mocker.stopall()
+
+
+def test_it_works_from_the_metadata_cache_in_offline_mode(mk_kiproject, syn_data, mocker):
+    syn_project, syn_folders, syn_files = syn_data
+    syn_file_uri = DataUri('syn', syn_files[0].id).uri
+    syn_folder_uri = DataUri('syn', syn_folders[0].id).uri
+
+    kiproject = mk_kiproject()
+    kiproject.data_add(syn_file_uri)
+    kiproject.data_add(syn_folder_uri)
+    kiproject.data_pull(syn_file_uri)
+
+    mocker.spy(SynapseAdapter, 'client')
+    kiproject = KiProject(kiproject.local_path, offline=True, metadata_ttl=0)
+    assert kiproject.offline is True
+
+    # Current files are pulled from the cached metadata.
+    assert kiproject.data_pull(syn_file_uri)
+    kiproject.data_list()
+    assert SynapseAdapter.client.call_count == 0
+
+    # Anything that needs a transfer fails.
+    with pytest.raises(OfflineModeError) as ex:
+        kiproject.data_pull(syn_folder_uri)
+    assert 'Cannot pull {0} in offline mode.'.format(syn_folder_uri) in str(ex.value)
+
+    with pytest.raises(OfflineModeError):
+        kiproject.data_push(syn_file_uri)
+
+    assert SynapseAdapter.client.call_count == 0
+    mocker.stopall()
+
+
+def test_it_uses_the_offline_environment_variable(mk_kiproject, monkeypatch):
+    kiproject = mk_kiproject()
+    assert kiproject.offline is False
+
+    monkeypatch.setenv('KITOOLS_OFFLINE', 'true')
+    assert KiProject(kiproject.local_path).offline is True
+    assert KiProject(kiproject.local_path, offline=False).offline is False
+
+
+@pytest.fixture()
+def trust_new_files(monkeypatch):
+    # Trust the signatures of files that were just pulled or pushed instead of waiting for them to age
+    # (see KiProjectPullIndex.is_racy).
+    monkeypatch.setattr(KiProjectPullIndex, 'RACY_SECONDS', -1)
+
+
+def test_it_does_not_download_unchanged_files_again(mk_kiproject, syn_data, write_file, read_file, mocker,
+                                                    trust_new_files):
+    kiproject = mk_kiproject()
+    syn_project, syn_folders, syn_files = syn_data
+
+    for syn_folder in syn_folders:
+        kiproject.data_add(DataUri('syn', syn_folder.id).uri)
+    kiproject.data_pull()
+    assert kiproject._pull_index.exists
+
+    file_resources = [r for r in kiproject.resources if os.path.isfile(r.abs_path)]
+    assert file_resources
+
+    for max_workers in [1, 4]:
+        kiproject = KiProject(kiproject.local_path)
+        mocker.spy(SynapseAdapter, '_download_syn_file')
+
+        kiproject.data_pull(max_workers=max_workers)
+        assert kiproject._pull_index.skips == len(file_resources)
+        assert SynapseAdapter._download_syn_file.call_count == 0
+        mocker.stopall()
+
+    # Changed local files are downloaded again.
+    changed_resource = file_resources[0]
+    expected_content = read_file(changed_resource.abs_path)
+    write_file(changed_resource.abs_path, 'changed')
+
+    kiproject = KiProject(kiproject.local_path)
+    kiproject.data_pull()
+    assert kiproject._pull_index.skips == len(file_resources) - 1
+    assert read_file(changed_resource.abs_path) == expected_content
+
+
+def test_it_resumes_an_interrupted_pull(mk_kiproject, syn_data, mocker, trust_new_files):
+    kiproject = mk_kiproject()
+    syn_project, syn_folders, syn_files = syn_data
+
+    for syn_folder in syn_folders:
+        kiproject.data_add(DataUri('syn', syn_folder.id).uri)
+
+    # The process is killed after a few files are downloaded (before the pull index is saved).
+    download_syn_file = SynapseAdapter._download_syn_file
+    downloaded = []
+
+    def _download_then_die(self, *args):
+        if len(downloaded) == 3:
+            raise KeyboardInterrupt()
+        downloaded.append(args)
+        return download_syn_file(self, *args)
+
+    mocker.patch.object(SynapseAdapter, '_download_syn_file', _download_then_die)
+    mocker.patch.object(KiProjectPullIndex, 'save', return_value=False)
+    with pytest.raises(KeyboardInterrupt):
+        kiproject.data_pull(max_workers=1)
+    mocker.stopall()
+
+    assert kiproject._transfer_journal.exists
+    assert not kiproject._pull_index.exists
+
+    # The downloaded files are not downloaded again.
+    kiproject = KiProject(kiproject.local_path)
+    mocker.spy(SynapseAdapter, '_download_syn_file')
+    kiproject.data_pull(max_workers=1)
+
+    file_resources = [r for r in kiproject.resources if os.path.isfile(r.abs_path)]
+    assert kiproject._pull_index.skips == len(downloaded)
+    assert SynapseAdapter._download_syn_file.call_count == len(file_resources) - len(downloaded)
+    assert not kiproject._transfer_journal.exists
+    mocker.stopall()
+
+
+def test_it_checks_a_started_download_in_the_download_task(mk_kiproject, syn_data, mocker, trust_new_files):
+    kiproject = mk_kiproject()
+    syn_project, syn_folders, syn_files = syn_data
+
+    for syn_folder in syn_folders:
+        kiproject.data_add(DataUri('syn', syn_folder.id).uri)
+
+    # The process is killed after the first file is downloaded but before it is recorded.
+    mocker.patch.object(SynapseAdapter, '_pulled_file', side_effect=KeyboardInterrupt())
+    with pytest.raises(KeyboardInterrupt):
+        kiproject.data_pull(max_workers=1)
+    mocker.stopall()
+
+    kiproject = KiProject(kiproject.local_path)
+    started = [r for r in kiproject.resources
+               if r.abs_path and kiproject._transfer_journal.get_started('pull', r.abs_path)]
+    assert len(started) == 1
+
+    # The file is hashed by its download task (after planning) and is not downloaded again.
+    signature = KiProjectPullIndex.get_signature(started[0].abs_path)
+    calls = []
+    is_pulled_file_current = SynapseAdapter._is_pulled_file_current
+    is_local_file = SynapseAdapter._is_local_file
+
+    def _is_pulled_file_current(self, *args, **kwargs):
+        calls.append('plan')
+        return is_pulled_file_current(self, *args, **kwargs)
+
+    def _is_local_file(self, *args):
+        calls.append('hash')
+        return is_local_file(self, *args)
+
+    mocker.patch.object(SynapseAdapter, '_is_pulled_file_current', _is_pulled_file_current)
+    mocker.patch.object(SynapseAdapter, '_is_local_file', _is_local_file)
+    kiproject.data_pull(max_workers=1)
+    mocker.stopall()
+
+    assert calls[-1] == 'hash' and calls.count('hash') == 1
+    assert kiproject._transfer_journal.resumes == 1
+    assert KiProjectPullIndex.get_signature(started[0].abs_path) == signature
+    assert kiproject._pull_index.get_entry(started[0].abs_path)
+
+
+def test_it_checks_files_that_were_pulled_too_recently_to_trust(mk_kiproject, syn_data, mocker):
+    kiproject = mk_kiproject()
+    syn_project, syn_folders, syn_files = syn_data
+
+    for syn_folder in syn_folders:
+        kiproject.data_add(DataUri('syn', syn_folder.id).uri)
+    kiproject.data_pull()
+
+    file_resources = [r for r in kiproject.resources if os.path.isfile(r.abs_path)]
+    assert all(kiproject._pull_index.is_racy(r.abs_path) for r in file_resources)
+
+    # The files are hashed instead of trusting their signatures but are not downloaded again.
+    kiproject = KiProject(kiproject.local_path)
+    mocker.spy(SynapseAdapter, '_is_local_file')
+    mocker.spy(SynapseAdapter, '_get_with_syn_bundle')
+    kiproject.data_pull()
+
+    assert kiproject._pull_index.skips == 0
+    assert SynapseAdapter._is_local_file.call_count == len(file_resources)
+    assert all(call[0][3] is None for call in SynapseAdapter._get_with_syn_bundle.call_args_list)
+    mocker.stopall()
+
+
 def test_it_pulls_a_file_not_matching_the_data_structure(mk_kiproject, syn_non_data, syn_client):
     kiproject = mk_kiproject()
     syn_parent, syn_folders, syn_files = syn_non_data
@@ -929,6 +1235,143 @@ def test_it_pushes_a_folder_matching_the_data_structure(mk_kiproject, mk_local_d
         # TODO: check that file/folders were pushed
 
 
+def test_it_pushes_a_folder_concurrently(mk_kiproject, mk_local_data_dir, syn_client, mocker):
+    kiproject = mk_kiproject()
+
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject)
+
+    for folder_path in local_data_folders:
+        ki_project_resource = kiproject.data_add(folder_path)
+        resource = kiproject.data_push(ki_project_resource, max_workers=4)
+        assert resource
+
+        # The folder and its children were pushed.
+        for child_resource in kiproject.find_project_resources_by(root_id=resource.id):
+            assert child_resource.remote_uri
+            syn_entity = syn_client.get(DataUri.parse(child_resource.remote_uri).id, downloadFile=False)
+            assert syn_entity.name == child_resource.name
+
+    # The files have not changed so they are not uploaded again.
+    mocker.spy(synapseclient.client, 'upload_file_handle')
+    for folder_path in local_data_folders:
+        kiproject.data_push(folder_path, max_workers=4)
+    assert synapseclient.client.upload_file_handle.call_count == 0
+
+
+def test_it_pushes_asynchronously(mk_kiproject, mk_local_data_dir, syn_client, mocker):
+    kiproject = mk_kiproject()
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject)
+
+    for local_path in local_data_files + local_data_folders:
+        kiproject.data_add(local_path)
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(kiproject.adata_push(max_workers=8))
+
+    for resource in kiproject.resources:
+        assert resource.remote_uri
+        syn_entity = syn_client.get(DataUri.parse(resource.remote_uri).id, downloadFile=False)
+        assert syn_entity.name == resource.name
+
+    # The resources are saved.
+    assert all(r.remote_uri for r in KiProject(kiproject.local_path).resources)
+
+    # The files have not changed so they are not uploaded again.
+    mocker.spy(synapseclient.client, 'upload_file_handle')
+    for folder_path in local_data_folders:
+        loop.run_until_complete(kiproject.adata_push(folder_path))
+    assert synapseclient.client.upload_file_handle.call_count == 0
+
+
+def test_it_pushes_all_the_resources_together(mk_kiproject, mk_local_data_dir, syn_client, mocker):
+    kiproject = mk_kiproject()
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject)
+
+    for local_path in local_data_files + local_data_folders:
+        kiproject.data_add(local_path)
+
+    mocker.spy(SynapseAdapter, 'data_push_many')
+    mocker.spy(SynapseAdapter, 'data_push')
+    kiproject.data_push()
+
+    # All the resources are pushed by one call to the data adapter.
+    assert SynapseAdapter.data_push_many.call_count == 1
+    assert SynapseAdapter.data_push.call_count == 0
+
+    for resource in kiproject.resources:
+        assert resource.remote_uri
+        syn_entity = syn_client.get(DataUri.parse(resource.remote_uri).id, downloadFile=False)
+        assert syn_entity.name == resource.name
+
+
+def test_it_does_not_push_unchanged_files_again(mk_kiproject, mk_local_data_dir, write_file, mocker, trust_new_files):
+    kiproject = mk_kiproject()
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject)
+
+    for local_path in local_data_files + local_data_folders:
+        kiproject.data_add(local_path)
+    kiproject.data_push()
+
+    file_resources = [r for r in kiproject.resources if os.path.isfile(r.abs_path)]
+
+    for max_workers in [1, 4]:
+        kiproject = KiProject(kiproject.local_path)
+        mocker.spy(SynapseAdapter, '_hash_file')
+        mocker.spy(SynapseAdapter.client(), 'store')
+
+        for resource in kiproject.find_project_resources_by(root_id=None):
+            kiproject.data_push(resource, max_workers=max_workers)
+
+        assert SynapseAdapter._hash_file.call_count == 0
+        assert SynapseAdapter.client().store.call_count == 0
+        mocker.stopall()
+
+    # Changed files are pushed.
+    changed_resource = file_resources[0]
+    write_file(changed_resource.abs_path, 'changed')
+
+    kiproject = KiProject(kiproject.local_path)
+    mocker.spy(SynapseAdapter.client(), 'store')
+    kiproject.data_push(changed_resource.abs_path)
+    assert SynapseAdapter.client().store.call_count == 1
+
+
+def test_it_does_not_record_a_file_that_changed_while_it_was_pushed(mk_kiproject, mk_local_data_dir, syn_client,
+                                                                   write_file, read_file, mocker, trust_new_files):
+    kiproject = mk_kiproject()
+    local_data_folders, _ = mk_local_data_dir(kiproject)
+    folder_path = local_data_folders[0]
+    file_paths = sorted(entry.path for entry in os.scandir(folder_path))
+    changed_path = file_paths[0]
+    kiproject.data_add(folder_path)
+
+    # The file changes after it is hashed and uploaded but before its Synapse File is stored.
+    store_syn_file = SynapseAdapter._store_syn_file
+
+    def _store_syn_file(self, path, syn_parent_id, file_handle):
+        if path == changed_path:
+            write_file(path, 'changed while pushed')
+        return store_syn_file(self, path, syn_parent_id, file_handle)
+
+    mocker.patch.object(SynapseAdapter, '_store_syn_file', _store_syn_file)
+    kiproject.data_push(folder_path, max_workers=4)
+    mocker.stopall()
+
+    assert kiproject._pull_index.get_entry(changed_path) is None
+    assert kiproject._transfer_journal.get_completed(changed_path) is None
+    for file_path in file_paths[1:]:
+        assert kiproject._pull_index.get_entry(file_path)
+
+    # The changes are pushed next time.
+    kiproject = KiProject(kiproject.local_path)
+    kiproject.data_push(folder_path, max_workers=4)
+    assert kiproject._pull_index.get_entry(changed_path)
+
+    changed_resource = kiproject.find_project_resource_by(abs_path=changed_path)
+    syn_entity = syn_client.get(DataUri.parse(changed_resource.remote_uri).id, downloadFile=True)
+    assert read_file(syn_entity.path) == 'changed while pushed'
+
+
 def test_it_pushes_a_file_to_a_different_remote_project(syn_client, mk_kiproject, mk_syn_project, mk_syn_files,
                                                         write_file, read_file):
     kiproject = mk_kiproject()
@@ -1139,6 +1582,27 @@ def test_data_type_from_project_path(kiproject):
             assert kiproject.get_data_type_from_path(new_path).name == data_type.name
 
 
+def test_data_type_from_project_path_matches_path_components(kiproject):
+    data_type = kiproject.data_types[0]
+    assert kiproject.get_data_type_from_path(data_type.abs_path + '2') is None
+
+    new_data_type = DataType(kiproject.local_path, 'new_data_type', data_type.rel_path + '2')
+    kiproject.data_types.append(new_data_type)
+    assert kiproject.get_data_type_from_path(os.path.join(new_data_type.abs_path, 'file.csv')) == new_data_type
+    assert kiproject.get_data_type_from_path(os.path.join(data_type.abs_path, 'file.csv')) == data_type
+
+
+def test_data_types_from_project_paths(kiproject):
+    paths = []
+    for data_type in kiproject.data_types:
+        paths.append(os.path.join(data_type.abs_path, 'file.csv'))
+        paths.append(os.path.join(data_type.rel_path, 'folder', 'file.csv'))
+    paths.append(kiproject.local_path)
+
+    assert kiproject.get_data_types_from_paths(paths) == [kiproject.get_data_type_from_path(p) for p in paths]
+    assert kiproject.get_data_types_from_paths(paths)[-1] is None
+
+
 def test_is_project_data_type_path(kiproject, mk_tempdir):
     temp_dir = mk_tempdir()
 
@@ -1271,6 +1735,20 @@ def test_it_excludes_local_files_and_folders_from_the_manifest(mk_kiproject, mk_
             kiproject.remove_data_ignore(pattern)
 
 
+def test_it_excludes_everything_in_ignored_directories(mk_kiproject, write_file):
+    kiproject = mk_kiproject()
+
+    ignored_dir = os.path.join(kiproject.data_types[0].abs_path, 'ignored_dir')
+    ignored_file = os.path.join(ignored_dir, 'sub', 'file.csv')
+    write_file(ignored_file, 'test')
+    assert ignored_file in kiproject.find_missing_resources()
+
+    kiproject.add_data_ignore('ignored_dir/')
+    missing = kiproject.find_missing_resources()
+    assert ignored_dir not in missing
+    assert ignored_file not in missing
+
+
 def test_it_can_add_and_remove_a_data_ignore_pattern(kiproject):
     pattern = 'test.txt'
     assert pattern not in kiproject.data_ignores
@@ -1282,3 +1760,68 @@ def test_it_can_add_and_remove_a_data_ignore_pattern(kiproject):
     kiproject.remove_data_ignore(pattern)
     assert pattern not in kiproject.data_ignores
     assert_matches_config(kiproject)
+
+
+def test_it_defers_saving_within_a_batch(mk_kiproject, mk_local_data_dir, mocker):
+    kiproject = mk_kiproject()
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject)
+
+    mocker.spy(kiproject, '_save')
+
+    with kiproject.batch():
+        for path in local_data_files:
+            kiproject.data_add(path)
+        assert kiproject._save.call_count == 0
+
+    assert kiproject._save.call_count == 1
+    assert_matches_config(kiproject)
+
+    # Nothing changed so nothing is saved.
+    with kiproject.batch():
+        pass
+    assert kiproject._save.call_count == 1
+
+
+def test_it_saves_a_batch_every_n_changes(mk_kiproject, mk_local_data_dir, mocker):
+    kiproject = mk_kiproject()
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject, return_all=True)
+    assert len(local_data_files) > 4
+
+    mocker.spy(kiproject, '_save')
+
+    with kiproject.batch(flush_every=2):
+        # Nested batches use the outermost batch's settings.
+        with kiproject.batch():
+            for path in local_data_files[:4]:
+                kiproject.data_add(path)
+        assert kiproject._save.call_count == 2
+
+    assert kiproject._save.call_count == 2
+
+
+def test_it_saves_a_batch_when_an_exception_is_raised(mk_kiproject, mk_local_data_dir):
+    kiproject = mk_kiproject()
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject)
+
+    with pytest.raises(ValueError):
+        with kiproject.batch():
+            kiproject.data_add(local_data_files[0])
+            raise ValueError()
+
+    assert_matches_config(kiproject)
+    assert KiProject(kiproject.local_path).find_project_resource_by(abs_path=local_data_files[0])
+
+
+def test_it_shares_data_adapters_within_a_batch(mk_kiproject):
+    kiproject = mk_kiproject()
+    data_uri = DataUri.parse(kiproject.project_uri)
+
+    assert kiproject._get_data_adapter(data_uri) is not kiproject._get_data_adapter(data_uri)
+
+    with kiproject.batch():
+        data_adapter = kiproject._get_data_adapter(data_uri)
+        with kiproject.batch():
+            assert kiproject._get_data_adapter(data_uri) is data_adapter
+
+    with kiproject.batch():
+        assert kiproject._get_data_adapter(data_uri) is not data_adapter
@@ -0,0 +1,126 @@
+import pytest
+import os
+from src.kitools import KiProject
+from src.kitools.manifests import JsonManifest
+
+
+@pytest.fixture()
+def journaled_kiproject(mk_kiproject):
+    kiproject = mk_kiproject()
+    return KiProject(kiproject.local_path, journal=True)
+
+
+def test_it_appends_resource_changes_to_the_journal(journaled_kiproject, mk_local_data_dir, read_file):
+    kiproject = journaled_kiproject
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject)
+
+    config = read_file(kiproject._config_path)
+
+    for path in local_data_files:
+        kiproject.data_add(path)
+
+    # The config file is not rewritten.
+    assert read_file(kiproject._config_path) == config
+    assert kiproject._manifest.journal.entry_count == len(local_data_files)
+
+    resource = kiproject.resources[0]
+    kiproject.data_change(resource, name='new name')
+    kiproject.data_remove(kiproject.resources[1])
+    assert kiproject._manifest.journal.entry_count == len(local_data_files) + 2
+
+    ops = [entry['op'] for entry in kiproject._manifest.journal.read()]
+    assert ops[-2:] == ['update', 'remove']
+
+
+def test_it_replays_the_journal_on_load(journaled_kiproject, mk_local_data_dir):
+    kiproject = journaled_kiproject
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject)
+
+    for path in local_data_files:
+        kiproject.data_add(path)
+    kiproject.data_change(kiproject.resources[0], name='new name')
+    kiproject.data_remove(kiproject.resources[1])
+
+    loaded = KiProject(kiproject.local_path, journal=True)
+    assert len(loaded.resources) == len(kiproject.resources)
+    assert loaded.find_project_resource_by(name='new name')
+    for resource in kiproject.resources:
+        assert loaded.find_project_resource_by(id=resource.id)
+
+
+def test_it_skips_a_partially_written_journal_entry(journaled_kiproject, mk_local_data_dir):
+    kiproject = journaled_kiproject
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject)
+    kiproject.data_add(local_data_files[0])
+
+    with open(kiproject._manifest.journal.path, 'a') as f:
+        f.write('{"op": "add", "resou')
+
+    loaded = KiProject(kiproject.local_path, journal=True)
+    assert len(loaded.resources) == 1
+
+
+def test_it_appends_after_a_partially_written_journal_entry(journaled_kiproject, mk_local_data_dir):
+    kiproject = journaled_kiproject
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject)
+    kiproject.data_add(local_data_files[0])
+
+    with open(kiproject._manifest.journal.path, 'a') as f:
+        f.write('{"op": "add", "resou')
+
+    # The next entry is not joined onto the partial entry.
+    kiproject.data_add(local_data_files[1])
+
+    loaded = KiProject(kiproject.local_path, journal=True)
+    assert len(loaded.resources) == 2
+    assert len(loaded._manifest.journal.read()) == 2
+
+
+def test_it_compacts_the_journal(journaled_kiproject, mk_local_data_dir, mocker):
+    kiproject = journaled_kiproject
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject, return_all=True)
+
+    mocker.patch.object(JsonManifest, 'JOURNAL_COMPACT_ENTRIES', 3)
+
+    kiproject.data_add(local_data_files[0])
+    kiproject.data_add(local_data_files[1])
+    assert kiproject._manifest.journal.exists
+
+    kiproject.data_add(local_data_files[2])
+    assert not kiproject._manifest.journal.exists
+
+    # Project level changes are always written to the config file.
+    kiproject.data_add(local_data_files[3])
+    assert kiproject._manifest.journal.exists
+    kiproject.add_data_ignore('*.tmp')
+    assert not kiproject._manifest.journal.exists
+
+    loaded = KiProject(kiproject.local_path)
+    assert len(loaded.resources) == 4
+    assert '*.tmp' in loaded.data_ignores
+
+
+def test_it_compacts_the_journal_when_loaded_without_journaling(journaled_kiproject, mk_local_data_dir):
+    kiproject = journaled_kiproject
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject)
+    kiproject.data_add(local_data_files[0])
+    assert kiproject._manifest.journal.exists
+
+    loaded = KiProject(kiproject.local_path)
+    assert not os.path.isfile(kiproject._manifest.journal.path)
+    assert len(loaded.resources) == 1
+
+
+def test_it_keeps_the_config_file_and_journal_when_compacting_fails(journaled_kiproject, mk_local_data_dir, mocker):
+    kiproject = journaled_kiproject
+    local_data_folders, local_data_files = mk_local_data_dir(kiproject)
+    kiproject.data_add(local_data_files[0])
+
+    mocker.patch('src.kitools.manifests.json_manifest.json.dump', side_effect=OSError('No space left on device'))
+    with pytest.raises(OSError):
+        kiproject._manifest.compact(kiproject)
+    mocker.stopall()
+
+    assert kiproject._manifest.journal.exists
+    loaded = KiProject(kiproject.local_path, journal=True)
+    assert len(loaded.resources) == 1
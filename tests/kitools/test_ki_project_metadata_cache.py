@@ -0,0 +1,101 @@
+import pytest
+import os
+import time
+from src.kitools.ki_project_metadata_cache import KiProjectMetadataCache
+
+
+@pytest.fixture()
+def cached_entry(mk_tempdir):
+    local_path = mk_tempdir()
+
+    metadata_cache = KiProjectMetadataCache(local_path)
+    metadata_cache.put('syn:bundle:syn1:latest', {'entity': {'id': 'syn1'}}, validator='etag1')
+    metadata_cache.save()
+    return local_path
+
+
+def test_it_writes_the_cache(cached_entry):
+    metadata_cache = KiProjectMetadataCache(cached_entry)
+    assert metadata_cache.exists
+    assert os.path.dirname(metadata_cache.path) == os.path.join(cached_entry, KiProjectMetadataCache.DIRNAME)
+
+
+def test_it_gets_entries_within_the_ttl(cached_entry):
+    metadata_cache = KiProjectMetadataCache(cached_entry)
+
+    def revalidate():
+        raise AssertionError('Should not revalidate within the TTL.')
+
+    assert metadata_cache.get('syn:bundle:syn1:latest', revalidate=revalidate) == {'entity': {'id': 'syn1'}}
+    assert metadata_cache.get('syn:bundle:syn2:latest') is None
+    assert metadata_cache.hits == 1
+    assert metadata_cache.misses == 1
+
+
+def test_it_returns_copies(cached_entry):
+    metadata_cache = KiProjectMetadataCache(cached_entry)
+    metadata_cache.get('syn:bundle:syn1:latest')['entity']['id'] = 'changed'
+    assert metadata_cache.get('syn:bundle:syn1:latest') == {'entity': {'id': 'syn1'}}
+
+
+def test_it_revalidates_entries_older_than_the_ttl(cached_entry):
+    metadata_cache = KiProjectMetadataCache(cached_entry, ttl=0)
+
+    assert metadata_cache.get('syn:bundle:syn1:latest', revalidate=lambda: 'etag1') == {'entity': {'id': 'syn1'}}
+    assert metadata_cache.revalidations == 1
+
+    assert metadata_cache.get('syn:bundle:syn1:latest', revalidate=lambda: 'etag2') is None
+    assert metadata_cache.get('syn:bundle:syn1:latest', revalidate=lambda: 'etag1') is None
+    assert metadata_cache.misses == 2
+
+
+def test_it_drops_entries_older_than_the_ttl_that_cannot_be_revalidated(mk_tempdir):
+    metadata_cache = KiProjectMetadataCache(mk_tempdir(), ttl=0.01)
+    metadata_cache.put('syn:path:syn1:latest', ['syn1'])
+    metadata_cache.put('syn:bundle:syn1:latest', {}, validator='etag1')
+    assert metadata_cache.get('syn:path:syn1:latest') == ['syn1']
+
+    time.sleep(0.02)
+    assert metadata_cache.get('syn:path:syn1:latest') is None
+    assert metadata_cache.get('syn:bundle:syn1:latest') is None
+
+
+def test_it_does_not_revalidate_entries_in_offline_mode(cached_entry):
+    metadata_cache = KiProjectMetadataCache(cached_entry, ttl=0, offline=True)
+
+    def revalidate():
+        raise AssertionError('Should not revalidate in offline mode.')
+
+    assert metadata_cache.get('syn:bundle:syn1:latest', revalidate=revalidate) == {'entity': {'id': 'syn1'}}
+    assert metadata_cache.hits == 1
+
+
+def test_it_removes_entries(cached_entry):
+    metadata_cache = KiProjectMetadataCache(cached_entry)
+    metadata_cache.remove('syn:bundle:syn1:latest')
+    metadata_cache.save()
+    assert KiProjectMetadataCache(cached_entry).get('syn:bundle:syn1:latest') is None
+
+
+def test_it_keeps_the_cache_when_a_save_fails(cached_entry, mocker):
+    metadata_cache = KiProjectMetadataCache(cached_entry)
+    metadata_cache.remove('syn:bundle:syn1:latest')
+
+    mocker.patch('src.kitools.ki_project_metadata_cache.json.dump', side_effect=OSError('No space left on device'))
+    metadata_cache.save()
+    mocker.stopall()
+
+    assert KiProjectMetadataCache(cached_entry).get('syn:bundle:syn1:latest') == {'entity': {'id': 'syn1'}}
+
+
+def test_it_clears_the_cache(cached_entry):
+    metadata_cache = KiProjectMetadataCache(cached_entry)
+    metadata_cache.clear()
+    assert not metadata_cache.exists
+    assert metadata_cache.get('syn:bundle:syn1:latest') is None
+
+
+def test_it_validates_the_ttl(mk_tempdir):
+    with pytest.raises(ValueError) as ex:
+        KiProjectMetadataCache(mk_tempdir(), ttl=-1)
+    assert 'ttl must be greater than or equal to 0.' in str(ex.value)
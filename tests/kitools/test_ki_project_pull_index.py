@@ -0,0 +1,144 @@
+import pytest
+import os
+import time
+import hashlib
+from src.kitools.ki_project_pull_index import KiProjectPullIndex
+
+
+@pytest.fixture()
+def pulled_file(mk_tempdir, write_file):
+    local_path = mk_tempdir()
+    abs_path = os.path.join(local_path, 'data', 'core', 'file.csv')
+    write_file(abs_path, 'test')
+
+    # The file was written long enough before it was recorded to trust its signature.
+    old_time = time.time() - (KiProjectPullIndex.RACY_SECONDS * 10)
+    os.utime(abs_path, (old_time, old_time))
+
+    pull_index = KiProjectPullIndex(local_path)
+    pull_index.record(abs_path, 'syn1', 2, 'md5', 4)
+    pull_index.save()
+    return local_path, abs_path
+
+
+def test_it_writes_the_index(pulled_file):
+    local_path, abs_path = pulled_file
+    pull_index = KiProjectPullIndex(local_path)
+    assert pull_index.exists
+    assert os.path.dirname(pull_index.path) == os.path.join(local_path, KiProjectPullIndex.DIRNAME)
+
+
+def test_it_is_current_when_nothing_changed(pulled_file):
+    local_path, abs_path = pulled_file
+    pull_index = KiProjectPullIndex(local_path)
+
+    assert pull_index.is_current(abs_path, 'syn1', 2)
+    assert pull_index.is_current(abs_path, 'syn1', '2', md5='md5')
+    assert pull_index.skips == 2
+
+
+def test_it_is_not_current_when_the_remote_file_changed(pulled_file):
+    local_path, abs_path = pulled_file
+    pull_index = KiProjectPullIndex(local_path)
+
+    assert not pull_index.is_current(abs_path, 'syn2', 2)
+    assert not pull_index.is_current(abs_path, 'syn1', 3)
+    assert not pull_index.is_current(abs_path, 'syn1', 2, md5='other')
+
+
+def test_it_is_not_current_when_the_local_file_changed(pulled_file, write_file):
+    local_path, abs_path = pulled_file
+    time.sleep(0.01)
+    write_file(abs_path, 'changed')
+    assert not KiProjectPullIndex(local_path).is_current(abs_path, 'syn1', 2)
+
+    os.remove(abs_path)
+    assert not KiProjectPullIndex(local_path).is_current(abs_path, 'syn1', 2)
+
+
+def test_it_is_not_current_when_the_file_was_not_recorded(pulled_file):
+    local_path, abs_path = pulled_file
+    other_path = os.path.join(os.path.dirname(abs_path), 'other.csv')
+    assert not KiProjectPullIndex(local_path).is_current(other_path, 'syn1', 2)
+
+
+def test_it_clears_the_index(pulled_file):
+    local_path, abs_path = pulled_file
+    pull_index = KiProjectPullIndex(local_path)
+    pull_index.clear()
+    assert not pull_index.exists
+    assert not pull_index.is_current(abs_path, 'syn1', 2)
+
+
+def test_it_gets_the_entry_when_the_local_file_has_not_changed(pulled_file, write_file):
+    local_path, abs_path = pulled_file
+    pull_index = KiProjectPullIndex(local_path)
+
+    entry = pull_index.get_entry(abs_path)
+    assert entry['id'] == 'syn1'
+    assert entry['version'] == '2'
+    assert entry['md5'] == 'md5'
+    assert entry['size'] == 4
+
+    time.sleep(0.01)
+    write_file(abs_path, 'changed')
+    assert pull_index.get_entry(abs_path) is None
+
+
+def test_it_does_not_trust_a_signature_read_too_close_to_the_mtime(pulled_file, write_file):
+    local_path, abs_path = pulled_file
+    write_file(abs_path, 'same')
+
+    # The file could be written again without changing its signature.
+    pull_index = KiProjectPullIndex(local_path)
+    pull_index.record(abs_path, 'syn1', 2, 'md5', 4)
+    assert pull_index.is_racy(abs_path)
+    assert pull_index.get_entry(abs_path) is None
+    assert not pull_index.is_current(abs_path, 'syn1', 2)
+
+    # Once the file is older its signature is trusted.
+    signed_at = time.time() + KiProjectPullIndex.RACY_SECONDS
+    pull_index.record(abs_path, 'syn1', 2, 'md5', 4, signed=(KiProjectPullIndex.get_signature(abs_path), signed_at))
+    assert not pull_index.is_racy(abs_path)
+    assert pull_index.is_current(abs_path, 'syn1', 2)
+
+
+def test_it_keeps_the_index_when_a_save_fails(pulled_file, mocker):
+    local_path, abs_path = pulled_file
+    pull_index = KiProjectPullIndex(local_path)
+    pull_index.record(abs_path, 'syn2', 1, 'md5', 4)
+
+    mocker.patch('src.kitools.ki_project_pull_index.json.dump', side_effect=OSError('No space left on device'))
+    assert pull_index.save() is False
+    mocker.stopall()
+
+    assert KiProjectPullIndex(local_path).is_current(abs_path, 'syn1', 2)
+
+
+def test_it_verifies_a_racy_signature(pulled_file, write_file):
+    local_path, abs_path = pulled_file
+    write_file(abs_path, 'same')
+    md5 = hashlib.md5(b'same').hexdigest()
+
+    pull_index = KiProjectPullIndex(local_path)
+    pull_index.record(abs_path, 'syn1', 2, md5, 4)
+    assert not pull_index.is_current(abs_path, 'syn1', 2)
+
+    # The file is hashed.
+    assert pull_index.is_current(abs_path, 'syn1', 2, verify=True)
+    assert not pull_index.is_current(abs_path, 'syn1', 2, md5='other', verify=True)
+
+    # Its signature is trusted once the file is old enough.
+    old_time = time.time() - (KiProjectPullIndex.RACY_SECONDS * 10)
+    os.utime(abs_path, (old_time, old_time))
+    pull_index.record(abs_path, 'syn1', 2, md5, 4, signed=(KiProjectPullIndex.get_signature(abs_path), old_time))
+    assert pull_index.is_racy(abs_path)
+
+    assert pull_index.is_current(abs_path, 'syn1', 2, verify=True)
+    assert not pull_index.is_racy(abs_path)
+    assert pull_index.is_current(abs_path, 'syn1', 2)
+
+    # A file that does not match its entry is not current.
+    pull_index.record(abs_path, 'syn1', 2, 'other', 4, signed=(KiProjectPullIndex.get_signature(abs_path), old_time))
+    assert not pull_index.is_current(abs_path, 'syn1', 2, verify=True)
+    assert pull_index.is_racy(abs_path)
@@ -72,6 +72,30 @@ def test_it_json_serializes_rel_path_as_posix_path(kiproject, fake_uri, file_abs
     assert '/' in json['rel_path']
 
 
+def test_it_caches_the_paths_until_the_path_changes(kiproject, fake_uri, file_abs_path, write_file):
+    resource = KiProjectResource(kiproject=kiproject, remote_uri=fake_uri, local_path=file_abs_path)
+    assert resource.abs_path is resource.abs_path
+    assert resource.posix_rel_path is resource.posix_rel_path
+
+    other_path = os.path.join(kiproject.data_types[-1].abs_path, 'other.csv')
+    write_file(other_path, 'other file')
+    resource.abs_path = other_path
+    assert resource.abs_path == other_path
+    assert resource.rel_path == os.path.relpath(other_path, start=kiproject.local_path)
+    assert resource.data_type == kiproject.data_types[-1]
+
+    resource.rel_path = None
+    assert resource.abs_path is None
+    assert resource.posix_rel_path is None
+
+
+def test_it_does_not_have_an_instance_dict(kiproject, fake_uri, file_abs_path):
+    resource = KiProjectResource(kiproject=kiproject, remote_uri=fake_uri, local_path=file_abs_path)
+    assert not hasattr(resource, '__dict__')
+    with pytest.raises(AttributeError):
+        resource.not_an_attribute = True
+
+
 def assert___str__(ki_project_resource):
     details = str(ki_project_resource)
 
@@ -0,0 +1,91 @@
+import pytest
+from src.kitools import KiProjectResourceList
+
+
+@pytest.fixture()
+def kiproject(mk_kiproject):
+    return mk_kiproject(with_fake_project_files=True,
+                        with_fake_project_files_count=3,
+                        with_non_root_project_files=True,
+                        with_non_root_project_files_count=2)
+
+
+def test_it_is_the_kiproject_resources_list(kiproject):
+    assert isinstance(kiproject.resources, KiProjectResourceList)
+
+    kiproject.resources = []
+    assert isinstance(kiproject.resources, KiProjectResourceList)
+
+
+def test_it_indexes_appended_resources(kiproject, mk_fake_project_file):
+    resource = mk_fake_project_file(kiproject)
+    assert kiproject.find_project_resource_by(id=resource.id) is None
+
+    kiproject.resources.append(resource)
+    assert kiproject.find_project_resource_by(id=resource.id) == resource
+    assert kiproject.find_project_resource_by(abs_path=resource.abs_path) == resource
+    assert kiproject.find_project_resource_by(remote_uri=resource.remote_uri) == resource
+
+
+def test_it_unindexes_removed_resources(kiproject):
+    resource = kiproject.resources[0]
+    kiproject.resources.remove(resource)
+
+    assert resource not in kiproject.resources
+    assert kiproject.find_project_resource_by(id=resource.id) is None
+    assert resource not in kiproject.find_project_resources_by(data_type=resource.data_type.name)
+
+    kiproject.resources.clear()
+    assert kiproject.find_project_resources_by(root_id=None) == []
+
+
+def test_it_reindexes_changed_attributes(kiproject, mk_fake_uri, mk_uniq_string):
+    resource = kiproject.find_project_resources_by(root_id=None)[0]
+    old_name = resource.name
+    old_remote_uri = resource.remote_uri
+
+    resource.name = mk_uniq_string()
+    resource.remote_uri = mk_fake_uri()
+
+    assert resource not in kiproject.find_project_resources_by(name=old_name)
+    assert resource not in kiproject.find_project_resources_by(remote_uri=old_remote_uri)
+    assert kiproject.find_project_resource_by(name=resource.name) == resource
+    assert kiproject.find_project_resource_by(remote_uri=resource.remote_uri) == resource
+
+    child = kiproject.find_project_resources_by(root_id=resource.id)[0]
+    child.root_id = None
+    assert child not in kiproject.find_project_resources_by(root_id=resource.id)
+    assert child in kiproject.find_project_resources_by(root_id=None)
+
+
+def test_it_finds_by_the_and_or_operators(kiproject):
+    root_resources = kiproject.find_project_resources_by(root_id=None)
+    resource1 = root_resources[0]
+    resource2 = root_resources[1]
+
+    assert kiproject.find_project_resources_by(id=resource1.id, name=resource2.name) == []
+    assert kiproject.find_project_resources_by(id=resource1.id, name=resource1.name) == [resource1]
+
+    found = kiproject.find_project_resources_by(operator='or', id=resource1.id, name=resource2.name)
+    assert found == [resource1, resource2]
+
+
+def test_it_returns_results_in_list_order(kiproject):
+    expected = [r for r in kiproject.resources if r.root_id is None]
+    assert kiproject.find_project_resources_by(root_id=None) == expected
+
+    kiproject.resources.reverse()
+    expected.reverse()
+    assert kiproject.find_project_resources_by(root_id=None) == expected
+
+
+def test_it_finds_by_non_indexed_attributes(kiproject):
+    for resource in kiproject.resources:
+        assert resource in kiproject.find_project_resources_by(version=resource.version)
+        assert resource in kiproject.find_project_resources_by(rel_path=resource.rel_path)
+
+
+def test_it_raises_on_invalid_attributes(kiproject):
+    with pytest.raises(ValueError) as ex:
+        kiproject.find_project_resources_by(not_an_attribute=True)
+    assert 'does not have attribute: not_an_attribute' in str(ex.value)
@@ -0,0 +1,78 @@
+import pytest
+import os
+import time
+from src.kitools import KiProject
+from src.kitools.ki_project_scan_cache import KiProjectScanCache
+
+
+@pytest.fixture()
+def scanned_kiproject(mk_kiproject, write_file):
+    kiproject = mk_kiproject()
+
+    for data_type in kiproject.data_types:
+        write_file(os.path.join(data_type.abs_path, 'folder', 'file.csv'), 'test')
+
+    # Make the directories old enough to be cached.
+    old_time = time.time() - (KiProjectScanCache.RACY_SECONDS * 10)
+    for dirpath, _, _ in os.walk(kiproject.local_path):
+        os.utime(dirpath, (old_time, old_time))
+
+    kiproject.find_missing_resources()
+    return kiproject
+
+
+def test_it_writes_the_scan_cache(scanned_kiproject):
+    assert scanned_kiproject._scan_cache.exists
+    assert os.path.dirname(scanned_kiproject._scan_cache.path) == os.path.join(scanned_kiproject.local_path,
+                                                                               KiProjectScanCache.DIRNAME)
+
+
+def test_it_does_not_read_unchanged_directories(scanned_kiproject):
+    expected = scanned_kiproject.find_missing_resources()
+
+    kiproject = KiProject(scanned_kiproject.local_path)
+    assert kiproject._scan_cache.hits > 0
+    assert kiproject._scan_cache.misses == 0
+    assert kiproject.find_missing_resources() == expected
+
+
+def test_it_reads_changed_directories(scanned_kiproject, write_file):
+    new_file = os.path.join(scanned_kiproject.data_types[0].abs_path, 'folder', 'new_file.csv')
+    write_file(new_file, 'test')
+
+    kiproject = KiProject(scanned_kiproject.local_path)
+    assert kiproject._scan_cache.misses == 1
+    assert new_file in kiproject.find_missing_resources()
+
+
+def test_it_reads_all_directories_on_a_full_scan(scanned_kiproject):
+    kiproject = KiProject(scanned_kiproject.local_path, scan=KiProject.SCAN_FULL)
+    assert kiproject._scan_cache.hits == 0
+    assert kiproject._scan_cache.misses > 0
+
+
+def test_it_does_not_scan_when_scan_is_off(scanned_kiproject, mocker):
+    mocker.spy(KiProject, 'find_missing_resources')
+    kiproject = KiProject(scanned_kiproject.local_path, scan=KiProject.SCAN_OFF)
+    assert KiProject.find_missing_resources.call_count == 0
+
+    # It can still be called directly.
+    assert kiproject.find_missing_resources() == scanned_kiproject.find_missing_resources()
+
+
+def test_it_validates_the_scan_mode(scanned_kiproject):
+    with pytest.raises(ValueError) as ex:
+        KiProject(scanned_kiproject.local_path, scan='not-a-mode')
+    assert 'scan must be one of' in str(ex.value)
+
+
+def test_it_keeps_the_scan_cache_when_a_save_fails(scanned_kiproject, mocker):
+    with open(scanned_kiproject._scan_cache.path) as f:
+        expected = f.read()
+
+    mocker.patch('src.kitools.ki_project_scan_cache.json.dump', side_effect=OSError('No space left on device'))
+    scanned_kiproject.find_missing_resources()
+    mocker.stopall()
+
+    with open(scanned_kiproject._scan_cache.path) as f:
+        assert f.read() == expected
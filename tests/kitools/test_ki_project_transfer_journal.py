@@ -0,0 +1,156 @@
+import pytest
+import os
+import time
+from src.kitools.ki_project_transfer_journal import KiProjectTransferJournal
+from src.kitools.ki_project_pull_index import KiProjectPullIndex
+
+
+@pytest.fixture()
+def local_file(mk_tempdir, write_file):
+    local_path = mk_tempdir()
+    abs_path = os.path.join(local_path, 'data', 'core', 'file.csv')
+    write_file(abs_path, 'test')
+
+    # The file was written long enough ago to trust its signature (see KiProjectPullIndex.is_racy).
+    old_time = time.time() - (KiProjectPullIndex.RACY_SECONDS * 10)
+    os.utime(abs_path, (old_time, old_time))
+    return local_path, abs_path
+
+
+def test_it_writes_the_journal(local_file):
+    local_path, abs_path = local_file
+    journal = KiProjectTransferJournal(local_path)
+    assert not journal.exists
+
+    journal.plan('pull', [(abs_path, 'syn1', 2, 'md5', 4)])
+    assert journal.exists
+    assert os.path.dirname(journal.path) == os.path.join(local_path, KiProjectTransferJournal.DIRNAME)
+
+    entry = KiProjectTransferJournal(local_path).get_entry(abs_path)
+    assert entry['state'] == KiProjectTransferJournal.PLANNED
+    assert entry['op'] == 'pull'
+    assert entry['path'] == 'data/core/file.csv'
+    assert entry['id'] == 'syn1'
+    assert entry['version'] == '2'
+    assert entry['md5'] == 'md5'
+    assert entry['size'] == 4
+
+
+def test_it_starts_with_the_planned_details(local_file):
+    local_path, abs_path = local_file
+    journal = KiProjectTransferJournal(local_path)
+
+    journal.plan('pull', [(abs_path, 'syn1', 2, None, None)])
+    journal.start('pull', abs_path, md5='md5')
+
+    entry = KiProjectTransferJournal(local_path).get_started('pull', abs_path)
+    assert entry['id'] == 'syn1'
+    assert entry['version'] == '2'
+    assert entry['md5'] == 'md5'
+    assert journal.get_started('push', abs_path) is None
+    assert journal.pending_count == 1
+
+
+def test_it_gets_started_pushes_while_the_file_has_not_changed(local_file, write_file):
+    local_path, abs_path = local_file
+    journal = KiProjectTransferJournal(local_path)
+
+    journal.start('push', abs_path, md5='md5', parent_id='syn2')
+    entry = journal.get_started('push', abs_path)
+    assert entry['md5'] == 'md5'
+    assert entry['parent'] == 'syn2'
+
+    time.sleep(0.01)
+    write_file(abs_path, 'changed')
+    assert journal.get_started('push', abs_path) is None
+
+
+def test_it_keeps_the_signature_from_before_the_file_was_hashed(local_file, write_file):
+    local_path, abs_path = local_file
+    journal = KiProjectTransferJournal(local_path)
+
+    # The file changes while it is hashed.
+    signed = KiProjectPullIndex.sign(abs_path)
+    write_file(abs_path, 'changed')
+
+    journal.start('push', abs_path, md5='md5', parent_id='syn2', signed=signed)
+    assert journal.get_entry(abs_path)['local'] == signed[0]
+    assert journal.get_started('push', abs_path) is None
+
+
+def test_it_gets_completed_transfers_while_the_file_has_not_changed(local_file, write_file):
+    local_path, abs_path = local_file
+    journal = KiProjectTransferJournal(local_path)
+
+    journal.start('pull', abs_path, remote_id='syn1', version=2)
+    journal.complete('pull', abs_path, 'syn1', 2, 'md5', 4, parent_id='syn2')
+
+    journal = KiProjectTransferJournal(local_path)
+    assert journal.get_started('pull', abs_path) is None
+    assert journal.get_completed(abs_path)['parent'] == 'syn2'
+    assert journal.completed() == [(abs_path, journal.get_entry(abs_path))]
+    assert journal.pending_count == 0
+
+    time.sleep(0.01)
+    write_file(abs_path, 'changed')
+    assert journal.get_completed(abs_path) is None
+    assert journal.completed() == []
+
+
+def test_it_compacts_the_journal(local_file, write_file):
+    local_path, abs_path = local_file
+    other_path = os.path.join(os.path.dirname(abs_path), 'other.csv')
+    write_file(other_path, 'other')
+    journal = KiProjectTransferJournal(local_path)
+
+    journal.plan('pull', [(abs_path, 'syn1', 1, None, None), (other_path, 'syn2', 1, None, None)])
+    journal.complete('pull', abs_path, 'syn1', 1, 'md5', 4)
+    journal.start('pull', other_path)
+
+    # The completed transfer is dropped.
+    journal.compact()
+    journal = KiProjectTransferJournal(local_path)
+    assert journal.get_entry(abs_path) is None
+    assert journal.get_started('pull', other_path)['id'] == 'syn2'
+
+    # The journal is deleted when nothing is left.
+    journal.complete('pull', other_path, 'syn2', 1, 'md5', 5)
+    journal.compact()
+    assert not journal.exists
+
+
+def test_it_skips_a_partially_written_entry(local_file):
+    local_path, abs_path = local_file
+    journal = KiProjectTransferJournal(local_path)
+    journal.plan('pull', [(abs_path, 'syn1', 1, None, None)])
+
+    with open(journal.path, 'a') as f:
+        f.write('{"state": "done", "op": "pu')
+
+    entry = KiProjectTransferJournal(local_path).get_entry(abs_path)
+    assert entry['state'] == KiProjectTransferJournal.PLANNED
+
+
+def test_it_clears_the_journal(local_file):
+    local_path, abs_path = local_file
+    journal = KiProjectTransferJournal(local_path)
+    journal.plan('pull', [(abs_path, 'syn1', 1, None, None)])
+
+    journal.clear()
+    assert not journal.exists
+    assert journal.get_entry(abs_path) is None
+
+
+def test_it_appends_after_a_partially_written_entry(local_file):
+    local_path, abs_path = local_file
+    journal = KiProjectTransferJournal(local_path)
+    journal.plan('pull', [(abs_path, 'syn1', 1, None, None)])
+
+    with open(journal.path, 'a') as f:
+        f.write('{"state": "started", "op": "pu')
+
+    journal = KiProjectTransferJournal(local_path)
+    journal.complete('pull', abs_path, 'syn1', 1, 'md5', 4)
+
+    entry = KiProjectTransferJournal(local_path).get_entry(abs_path)
+    assert entry['state'] == KiProjectTransferJournal.DONE
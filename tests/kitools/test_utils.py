@@ -0,0 +1,16 @@
+import os
+from src.kitools import Utils
+
+
+def test_append_lines(mk_tempdir, read_file):
+    path = os.path.join(mk_tempdir(), 'file.log')
+
+    Utils.append_lines(path, ['a', 'b'])
+    Utils.append_lines(path, [], sync=True)
+    assert read_file(path) == 'a\nb\n'
+
+    # A partially written line is ended before appending.
+    with open(path, 'a') as f:
+        f.write('{"partial')
+    Utils.append_lines(path, ['c'], sync=True)
+    assert read_file(path) == 'a\nb\n{"partial\nc\n'